@@ -0,0 +1,181 @@
+"""Benchmarks dos pontos críticos dos simuladores, totalmente offline.
+
+Uso:
+    python benchmarks/executar.py                      # grava benchmarks/resultados/<commit>.json
+    python benchmarks/executar.py --filtro momentum    # apenas os benchmarks que contêm o texto
+    python benchmarks/executar.py --comparar antes.json depois.json
+
+Os preços são gerados por movimento browniano geométrico com semente fixa
+(src/app/dados/sinteticos.py), em séries de 1, 10 e 50 anos de pregões e
+universos de 10, 100 e 1000 ativos.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / 'src' / 'app'))
+
+import numpy as np
+import pandas as pd
+
+from dados.sinteticos import DIAS_UTEIS_ANO, gerar_historico, gerar_universo
+from estrategias.cruzamento import estrategia_cruzamento, inicios_moveis
+from estrategias.momentum import simular_momentum
+from estrategias.opcoes import protective_put, simular_bull_call
+from estrategias.passivo import simular_passivo
+from estrategias.rolagem import rolar_protective_put
+
+DIRETORIO_RESULTADOS = RAIZ / 'benchmarks' / 'resultados'
+ANOS = (1, 10, 50)
+UNIVERSOS = (10, 100, 1000)
+
+BENCHMARKS = []
+
+
+# Registra um benchmark: `preparar(tamanho)` monta os dados fora da
+# medição e devolve a função medida, sem argumentos
+def benchmark(nome, tamanhos):
+    def registrar(preparar):
+        BENCHMARKS.append((nome, tamanhos, preparar))
+        return preparar
+    return registrar
+
+
+def _historico(anos):
+    return gerar_historico('BENCH', anos * DIAS_UTEIS_ANO)
+
+
+def _mensal(anos):
+    return pd.DataFrame(_historico(anos)['Close'].resample('ME').last())
+
+
+@benchmark('simular_passivo', ANOS)
+def _passivo(anos):
+    return lambda: simular_passivo(500, 500, anos, 8)
+
+
+@benchmark('estrategia_cruzamento', ANOS)
+def _cruzamento(anos):
+    df = _historico(anos)
+    return lambda: estrategia_cruzamento(df, 10_000)
+
+
+@benchmark('inicios_moveis_mensal', ANOS)
+def _inicios_moveis(anos):
+    close = _historico(anos)['Close']
+    return lambda: inicios_moveis(close, 10_000)
+
+
+@benchmark('resample_mensal', ANOS)
+def _resample(anos):
+    close = _historico(anos)['Close']
+    return lambda: close.resample('ME').last()
+
+
+@benchmark('resample_mensal_universo_10y', UNIVERSOS)
+def _resample_universo(ativos):
+    precos = gerar_universo(ativos, 10 * DIAS_UTEIS_ANO)
+    return lambda: precos.resample('ME').last()
+
+
+@benchmark('simular_momentum_10y', UNIVERSOS)
+def _momentum(ativos):
+    precos = gerar_universo(ativos, 10 * DIAS_UTEIS_ANO).resample('ME').last()
+    return lambda: simular_momentum(precos, 500)
+
+
+@benchmark('protective_put', ANOS)
+def _protective_put(anos):
+    df = _mensal(anos)
+    return lambda: protective_put(df.copy(), 500, 'BRL', 5, 2)
+
+
+@benchmark('simular_bull_call', ANOS)
+def _bull_call(anos):
+    df = _mensal(anos)
+    return lambda: simular_bull_call(df.copy(), 500, 'BRL', 5, 5, 8, 3)
+
+
+@benchmark('rolagem_protective_put_diaria', ANOS)
+def _rolagem(anos):
+    close = _historico(anos)['Close']
+    return lambda: rolar_protective_put(close, 500, 5, 'b3', 'diarias')
+
+
+def medir(funcao, tempo_minimo=0.2, repeticoes=5):
+    temporizador = timeit.Timer(funcao)
+    numero, _ = temporizador.autorange()
+    numero = max(1, int(numero * tempo_minimo / 0.2))
+    tempos = [t / numero for t in temporizador.repeat(repeat=repeticoes, number=numero)]
+    return {'min_s': min(tempos), 'mediana_s': float(np.median(tempos)), 'execucoes': numero * repeticoes}
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return 'desconhecido'
+
+
+def executar(filtro=None):
+    resultados = {}
+    for nome, tamanhos, preparar in BENCHMARKS:
+        for tamanho in tamanhos:
+            chave = '{}[{}]'.format(nome, tamanho)
+            if filtro and filtro not in chave:
+                continue
+            resultados[chave] = medir(preparar(tamanho))
+            print('{:<40} {:>12.6f} s'.format(chave, resultados[chave]['min_s']))
+
+    return {
+        'commit': _commit(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'resultados': resultados,
+    }
+
+
+def comparar(antes, depois, tolerancia=0.10):
+    antes = json.loads(Path(antes).read_text())
+    depois = json.loads(Path(depois).read_text())
+    print('{:<40} {:>12} {:>12} {:>8}'.format('benchmark', antes['commit'], depois['commit'], 'razão'))
+    regressoes = 0
+    for chave, resultado in depois['resultados'].items():
+        if chave not in antes['resultados']:
+            continue
+        razao = resultado['min_s'] / antes['resultados'][chave]['min_s']
+        marca = ' <- regressão' if razao > 1 + tolerancia else ''
+        regressoes += bool(marca)
+        print('{:<40} {:>12.6f} {:>12.6f} {:>7.2f}x{}'.format(
+            chave, antes['resultados'][chave]['min_s'], resultado['min_s'], razao, marca))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks offline dos simuladores.')
+    parser.add_argument('--filtro', help='executa apenas benchmarks cujo nome contém este texto')
+    parser.add_argument('--saida', help='arquivo JSON de saída (padrão: benchmarks/resultados/<commit>.json)')
+    parser.add_argument('--comparar', nargs=2, metavar=('ANTES', 'DEPOIS'), help='compara dois arquivos JSON')
+    args = parser.parse_args()
+
+    if args.comparar:
+        sys.exit(1 if comparar(*args.comparar) else 0)
+
+    relatorio = executar(args.filtro)
+    saida = Path(args.saida) if args.saida else DIRETORIO_RESULTADOS / '{}.json'.format(relatorio['commit'])
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(relatorio, indent=2))
+    print('Resultados gravados em {}'.format(saida))
+
+
+if __name__ == '__main__':
+    main()
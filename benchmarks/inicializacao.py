@@ -0,0 +1,147 @@
+"""Tempo até a primeira pintura de cada página, sem acesso à rede.
+
+Uso:
+    python benchmarks/inicializacao.py                    # todas as páginas, orçamento de 300 ms
+    python benchmarks/inicializacao.py --orcamento 500    # outro orçamento, em ms
+    python benchmarks/inicializacao.py --pagina Home.py   # apenas uma página
+
+Cada página roda em processos novos com o Streamlit já importado, como em
+um servidor já no ar, em três situações:
+
+- processo novo: a primeira sessão depois do deploy, que paga todas as
+  importações (inclusive pandas e NumPy);
+- container aquecido: a pilha comum a todas as páginas (NumPy, pandas,
+  Parquet e Altair) já carregada por qualquer sessão anterior, então a
+  página só paga as importações e o trabalho próprios dela;
+- sessão seguinte: segunda execução da página no mesmo processo.
+
+O orçamento vale para o container aquecido. Os processos rodam com
+`python -X importtime` e o relatório lista as importações mais lentas
+feitas pela página no processo novo. Sai com código 1 se alguma página
+passar do orçamento.
+
+Por padrão usa o provedor sintético e a fonte de cotações simulada, para
+não depender da rede; as variáveis SIMULADOR_PROVEDOR e SIMULADOR_COTACOES
+já definidas no ambiente têm precedência. As coletas em segundo plano
+(earnings e lista de ativos) ficam desligadas com SIMULADOR_ATUALIZACOES=0.
+Cada filho grava o resultado em um arquivo temporário próprio, separado
+da saída padrão da página.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+APP = RAIZ / 'src' / 'app'
+PAGINAS = ['Home.py'] + sorted(p.relative_to(APP).as_posix() for p in (APP / 'pages').glob('*.py'))
+ORCAMENTO_MS = 300
+
+# Módulos que todas as páginas usam (os gráficos e o cache em Parquet) e que
+# já estão na memória de um container aquecido
+PRE_CARREGADOS = ['numpy', 'pandas', 'pyarrow.parquet', 'altair']
+
+
+# Executado no processo filho: mede as duas execuções da página e grava em
+# `resultado` um JSON com os tempos e os pacotes importados pela página
+def medir_pagina(pagina, resultado, aquecido=False):
+    from streamlit.testing.v1 import AppTest
+
+    if aquecido:
+        for modulo in PRE_CARREGADOS:
+            __import__(modulo)
+        # Verificação feita uma vez por processo no primeiro elemento enviado
+        # (inspect.stack() sobre todos os módulos carregados), já paga pela
+        # primeira sessão de um servidor no ar
+        from streamlit import delta_generator
+        delta_generator._maybe_print_use_warning()
+    sys.path.insert(0, str(APP))
+    antes = set(sys.modules)
+    tempos = []
+    for _ in range(2):
+        teste = AppTest.from_file(str(APP / pagina), default_timeout=60)
+        inicio = time.perf_counter()
+        teste.run()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    erros = [str(e.value) for e in teste.exception]
+    novos = sorted({nome.split('.')[0] for nome in sys.modules} - {nome.split('.')[0] for nome in antes})
+    Path(resultado).write_text(json.dumps({'fria_ms': tempos[0], 'quente_ms': tempos[1], 'erros': erros, 'novos': novos}))
+
+
+# Tempo acumulado (ms) de cada pacote de primeiro nível importado pela página
+def _importacoes(saida_importtime, novos):
+    tempos = {}
+    for linha in saida_importtime.splitlines():
+        if not linha.startswith('import time:') or '|' not in linha:
+            continue
+        _, acumulado, nome = linha.split('|')
+        nome = nome.strip()
+        if nome in novos and acumulado.strip().isdigit():
+            tempos[nome] = max(tempos.get(nome, 0), int(acumulado) / 1000)
+    return sorted(tempos.items(), key=lambda item: -item[1])
+
+
+def executar(paginas, orcamento, importacoes):
+    ambiente = dict(os.environ)
+    ambiente.setdefault('SIMULADOR_PROVEDOR', 'sintetico')
+    ambiente.setdefault('SIMULADOR_COTACOES', 'simulada')
+    ambiente['SIMULADOR_ATUALIZACOES'] = '0'
+
+    def rodar(pagina, *extras):
+        with tempfile.TemporaryDirectory() as diretorio:
+            resultado = Path(diretorio) / 'resultado.json'
+            processo = subprocess.run(
+                [sys.executable, '-X', 'importtime', __file__, '--filho', pagina, '--resultado', str(resultado), *extras],
+                cwd=APP, env=ambiente, capture_output=True, text=True,
+            )
+            if processo.returncode != 0 or not resultado.exists():
+                raise RuntimeError(processo.stderr[-2000:])
+            return json.loads(resultado.read_text()), processo.stderr
+
+    print('{:<40} {:>14} {:>20} {:>17}'.format('Página', 'Processo novo', 'Container aquecido', 'Sessão seguinte'))
+    estourou = False
+    for pagina in paginas:
+        try:
+            novo, importtime = rodar(pagina)
+            aquecido, _ = rodar(pagina, '--aquecido')
+        except RuntimeError as e:
+            print('{:<40} falhou:\n{}'.format(pagina, e))
+            estourou = True
+            continue
+
+        dentro = aquecido['fria_ms'] <= orcamento
+        estourou |= not dentro
+        print('{:<40} {:>11.0f} ms {:>17.0f} ms {:>14.0f} ms   {}'.format(
+            pagina, novo['fria_ms'], aquecido['fria_ms'], aquecido['quente_ms'],
+            'ok' if dentro else 'ACIMA DO ORÇAMENTO'))
+        for erro in novo['erros']:
+            print('    erro na página: {}'.format(erro))
+        for nome, ms in _importacoes(importtime, set(novo['novos']))[:importacoes]:
+            print('    {:<36} {:>7.0f} ms'.format(nome, ms))
+
+    print('Orçamento no container aquecido: {:.0f} ms'.format(orcamento))
+    return 1 if estourou else 0
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Mede o tempo até a primeira pintura de cada página.')
+    parser.add_argument('--pagina', action='append', help='página a medir (padrão: todas)')
+    parser.add_argument('--orcamento', type=float, default=ORCAMENTO_MS, help='orçamento no container aquecido, em ms')
+    parser.add_argument('--importacoes', type=int, default=8, help='importações mais lentas listadas por página')
+    parser.add_argument('--filho', help=argparse.SUPPRESS)
+    parser.add_argument('--resultado', help=argparse.SUPPRESS)
+    parser.add_argument('--aquecido', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argumentos)
+
+    if args.filho:
+        medir_pagina(args.filho, args.resultado, args.aquecido)
+        return 0
+    return executar(args.pagina or PAGINAS, args.orcamento, args.importacoes)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
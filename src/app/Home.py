@@ -1,8 +1,12 @@
-from datetime import datetime
+from datetime import date, datetime
 import streamlit as st
-import yfinance as yf
-import matplotlib.pyplot as plt
-from earnings.earnings import empresas
+from componentes.ticker import campo_ticker
+from earnings.earnings import JANELA, data_divulgacao, obter_empresas, periodo_coletado
+from dados import cotacoes, metadados, provedores
+from dados.armazenamento import historico_precos
+from graficos.exibicao import grafico_linhas, exibir
+from instrumentacao.medicao import medir
+from instrumentacao.painel import iniciar_medicoes, exibir_medicoes
 
  # Lista de périodo predefinidas
 opcao = ['1d', '5d', '1mo', '3mo', '6mo', '1y',
@@ -14,17 +18,15 @@ opcoes_dic = dict(zip(legenda, opcao))
 
 def baixar_dados(ticker):
     try:
-        dados = yf.Ticker(ticker)
+        dados = provedores.ticker(ticker)
     except:
         raise ValueError("Erro ao procurar o ativo {}. Confira o nome ou substitua por outro.".format(ticker))
     
     return dados
 
-def dados_historicos(dados, periodo):
-    df_dados_historicos = dados.history(periodo)
+def dados_historicos(ticker, periodo):
+    df_dados_historicos = historico_precos(ticker, periodo)
     df_dados_historicos.index.names = ['Data'] # Renomeando 'Date' por 'Data'
-    # Formatando data para dd/mm/yyyy
-    df_dados_historicos.index = df_dados_historicos.index.strftime('%d/%m/%Y')
     df_dados_historicos = df_dados_historicos.rename(columns={
         'Open': 'Abertura',
         'High': 'Alta',
@@ -35,18 +37,40 @@ def dados_historicos(dados, periodo):
     return df_dados_historicos
 
 def criar_gráfico(df_dados_historicos):
-    # Geração do gráfico do preço das ações
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(df_dados_historicos.index, df_dados_historicos[['Fechamento']], label="Saldo Acumulado", color='green')
-    ax.set_title("Evolução das Cotações")
-    ax.set_ylabel("Valor ({})".format(moeda))
-    ax.grid(True)
-    plt.xticks(rotation=270)
-
-    return fig
+    # Geração do gráfico do preço das ações (mínimos e máximos preservados na redução)
+    return grafico_linhas(df_dados_historicos[['Fechamento']], "Evolução das Cotações", "Valor ({})".format(moeda),
+                          estilos={'Fechamento': {'cor': 'green'}}, metodo='min_max')
+
+# Só este trecho é reexecutado a cada intervalo: a cotação vem do serviço
+# compartilhado, sem baixar de novo o resto da página
+@st.fragment(run_every=cotacoes.INTERVALO_COTACOES)
+def exibir_cotacao(ticker, moeda):
+    # A primeira pintura não espera a consulta ao vivo: até ela chegar,
+    # mostra o último fechamento do histórico local
+    cotacao = cotacoes.cotacao(ticker, espera=0)
+    if cotacao is None or cotacao['preco'] is None:
+        fechamentos = historico_precos(ticker, '5d')['Close'].to_numpy()
+        if not len(fechamentos):
+            st.write('**Cotação Atual ({}):** carregando...'.format(moeda))
+        else:
+            anterior = fechamentos[-2] if len(fechamentos) > 1 else fechamentos[-1]
+            st.metric('Último Fechamento ({})'.format(moeda), '{:,.2f}'.format(fechamentos[-1]),
+                      '{:+.2f}%'.format((fechamentos[-1] / anterior - 1) * 100))
+        # A primeira consulta ao vivo falhou: mostra o erro em vez de prometer a cotação
+        if cotacao is not None and cotacao['erro']:
+            st.caption('Falha ao consultar a cotação ao vivo: {}'.format(cotacao['erro']))
+        else:
+            st.caption('A cotação ao vivo aparece na próxima atualização')
+        return
+    st.metric('Cotação Atual ({})'.format(moeda), '{:,.2f}'.format(cotacao['preco']),
+              '{:+.2f}%'.format(cotacao['variacao']))
+    st.caption('Atualizada às {}'.format(datetime.fromtimestamp(cotacao['momento']).strftime('%H:%M:%S')))
+    if cotacao['erro']:
+        st.caption('Falha na última atualização: {}'.format(cotacao['erro']))
 
 # -------------- Streamlit
 st.set_page_config(page_title='Simulador', layout='centered')
+iniciar_medicoes('Home')
 
 # Título
 titulo = 'Pagina Inicial'
@@ -61,26 +85,48 @@ Esta página permite visualizar o calendário de divulgação de resultados (ear
 
 hoje = datetime.now().strftime('%d/%m/%Y')
 st.subheader('Próximas Divulgações dos Resultados (Earnings)'.format(hoje))
-st.dataframe(empresas)
+col1, col2 = st.columns(2)
+with col1:
+    periodo_earnings = st.date_input('Período', value=(date.today(), date.today() + JANELA), format='DD/MM/YYYY')
+with col2:
+    busca = st.text_input('Buscar por sigla ou empresa', placeholder='ex: AAPL, Apple')
+# Enquanto o usuário escolhe o fim do período, o date_input devolve só o início
+inicio_earnings, fim_earnings = (tuple(periodo_earnings) + (None,))[:2]
+
+with medir('earnings'):
+    empresas = obter_empresas(inicio_earnings, fim_earnings, busca)
+if empresas.empty:
+    if busca:
+        st.info('Nenhuma divulgação encontrada para "{}" no período.'.format(busca))
+    elif periodo_coletado(inicio_earnings, fim_earnings):
+        st.info('Nenhuma divulgação encontrada no período.')
+    else:
+        st.info('Carregando a lista de divulgações, ela aparecerá na próxima atualização da página.')
+else:
+    st.caption('{} divulgações'.format(len(empresas)))
+    st.dataframe(empresas, hide_index=True, column_config={'Data': st.column_config.DateColumn(format='DD/MM/YYYY')})
 
 st.markdown("""
 ### Pesquisa de Ações
 Digite o ticker (ex: AAPL, MSFT, AMZN, PETR4.SA, VALE3.SA) e veja o preço atual e o calendário de resultados.
 """)
 
-#Entrada de ticker
-ticker = st.text_input(
+#Entrada de ticker, validada pela lista local de ativos antes de consultar o provedor
+ticker = campo_ticker(
     'Digite o ticker da ação (ex: AAPL, MSFT, PETR4.SA):',
-    value="PETR4.SA" # Valor Inicial
+    valor="PETR4.SA", # Valor Inicial
+    chave='ticker_home'
 )
 
 if ticker:
     with st.spinner("Carregando dados..."):
         try:
             ticker = ticker.upper()
-            dados = baixar_dados(ticker)
+            with medir('download'):
+                dados = baixar_dados(ticker)
             # Informações Gerais
-            info = dados.get_info()
+            with medir('informacoes'):
+                info = metadados.info_ticker(ticker)
 
             st.write('**Nome da Empresa:**', info.get('longName', 'N/A'))
             col1, col2, col3 = st.columns(3)
@@ -89,18 +135,19 @@ if ticker:
             with col2:
                 st.write('**Site:**', info.get('website', 'N/A'))
             with col3:
-                #Preço atual
-                historico = dados.history('5d')
-                preco = historico['Close'].iloc[-1]
-                moeda = dados.get_info()['currency']   
-
-                st.write('**Cotação Atual ({}):** {}'.format(moeda, round(preco, 2)))         
+                #Preço atual, atualizado em segundo plano
+                with medir('informacoes'):
+                    moeda = metadados.moeda(ticker)   
+                with medir('cotacao'):
+                    exibir_cotacao(ticker, moeda)
             
-            # Earnings
+            # Earnings: primeiro a tabela local, depois o calendário do provedor
             try:
-                calendario = dados.calendar
-                data = calendario['Earnings Date']
-                data = data[0].strftime('%d/%m/%Y')
+                with medir('calendario'):
+                    data = data_divulgacao(ticker)
+                    if data is None:
+                        data = metadados.calendario(ticker)['Earnings Date'][0]
+                data = data.strftime('%d/%m/%Y')
                 st.write('**Data próximo balanço da {}:** {}'.format(ticker, data))
             except:
                 st.warning('Não foi possivel obter o calendário de earnings')
@@ -115,20 +162,22 @@ if ticker:
             )
 
             #Obtendo dados historicos das cotações      
-            df_dados_historicos = dados_historicos(dados, opcoes_dic[periodo]) 
+            with medir('historico'):
+                df_dados_historicos = dados_historicos(ticker, opcoes_dic[periodo]) 
 
             #Impressão do Dataframe
-            st.dataframe(df_dados_historicos[
-                ['Abertura', 'Alta', 'Baixa', 'Fechamento']
-            ])
+            tabela = df_dados_historicos[['Abertura', 'Alta', 'Baixa', 'Fechamento']]
+            # Formatando data para dd/mm/yyyy
+            st.dataframe(tabela.set_axis(tabela.index.strftime('%d/%m/%Y')).rename_axis('Data'))
 
             # Geração do gráfico do preço das ações
-            grafico = criar_gráfico(df_dados_historicos)
-            st.pyplot(grafico)
+            with medir('grafico'):
+                grafico = criar_gráfico(df_dados_historicos)
+                exibir(grafico)
         except Exception as e:
             st.warning(e)
 
-else:
+elif not st.session_state.ticker_home.strip():
     st.info('Digite um ticker para iniciar a pesquisa.')
 
 st.markdown("""
@@ -139,3 +188,5 @@ A consulta de ações utiliza dados da biblioteca [yfinance](https://pypi.org/pr
 Já os dados de balanços (earnings) são obtidos a partir do [TradingView](https://www.tradingview.com/markets/stocks-usa/earnings/).
         
 """)
+
+exibir_medicoes()
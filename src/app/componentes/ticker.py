@@ -0,0 +1,42 @@
+import streamlit as st
+
+from dados import simbolos
+
+
+def _escolher(chave, simbolo):
+    st.session_state[chave] = simbolo
+
+
+# Botões "Você quis dizer" com as sugestões do diretório de símbolos.
+# Cada botão chama `ao_escolher(simbolo)` antes da próxima execução.
+def exibir_sugestoes(ticker, ao_escolher, chave):
+    indice = simbolos.obter_indice()
+    sugestoes = indice.sugerir(ticker)
+    if not sugestoes:
+        st.warning('Ativo {} não encontrado na lista de ativos da B3 e dos EUA. Confira o nome.'.format(ticker))
+        return
+    st.warning('Ativo {} não encontrado na lista de ativos da B3 e dos EUA. Você quis dizer:'.format(ticker))
+    for coluna, sugestao in zip(st.columns(len(sugestoes)), sugestoes):
+        coluna.button(sugestao, key='{}_sugestao_{}'.format(chave, sugestao), help=indice.nome(sugestao),
+                      on_click=ao_escolher, args=(sugestao,), use_container_width=True)
+
+
+# Opção de consultar um ticker fora da lista assim mesmo
+def forcar_ticker(ticker, chave):
+    return st.checkbox('Consultar {} mesmo assim'.format(ticker), key='{}_forcar'.format(chave))
+
+
+# Campo de ticker validado pelo diretório local de símbolos, sem consultar
+# o provedor: devolve o ticker em maiúsculas ou None se estiver vazio ou
+# fora da lista. Fora da lista, mostra as sugestões (completar e parecidos)
+# e a opção de consultar o ticker assim mesmo.
+def campo_ticker(rotulo, valor='', chave=None):
+    chave = chave or 'ticker_{}'.format(rotulo)
+    if chave not in st.session_state:
+        st.session_state[chave] = valor
+    ticker = st.text_input(rotulo, key=chave).strip().upper()
+    if not ticker or simbolos.obter_indice().valido(ticker):
+        return ticker or None
+
+    exibir_sugestoes(ticker, lambda sugestao: _escolher(chave, sugestao), chave)
+    return ticker if forcar_ticker(ticker, chave) else None
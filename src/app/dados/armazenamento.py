@@ -0,0 +1,173 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dados import provedores
+
+# Diretório local onde ficam os históricos (um arquivo Parquet por ticker)
+DIRETORIO_CACHE = Path(os.environ.get(
+    'SIMULADOR_CACHE', Path.home() / '.cache' / 'simulador-tcc'
+))
+DIRETORIO_PRECOS = DIRETORIO_CACHE / 'precos'
+
+# Intervalo mínimo entre duas consultas ao yfinance para o mesmo ticker
+VALIDADE_ATUALIZACAO = timedelta(hours=1)
+
+# Períodos aceitos pelo yfinance convertidos em deslocamentos de calendário.
+# '1d' e '5d' são contados em pregões, 'ytd' e 'max' são tratados à parte.
+_pregoes = {'1d': 1, '5d': 5}
+_deslocamentos = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+_travas = {}
+_trava_global = threading.Lock()
+
+# Últimos históricos lidos do disco, com o mtime do Parquet: cada reexecução
+# de uma página (e a cotação da Home, que lê o mesmo ticker) não relê o
+# arquivo enquanto ele não mudar. Limitado para não segurar um universo inteiro.
+HISTORICOS_EM_MEMORIA = 32
+_lidos = OrderedDict()
+
+
+# Lê um arquivo Parquet inteiro pelo ParquetFile: pd.read_parquet passa pelo
+# pyarrow.dataset, que custa ~50 ms de importação na primeira pintura
+def ler_parquet(arquivo):
+    import pyarrow.parquet as pq
+
+    return pq.ParquetFile(arquivo).read().to_pandas()
+
+
+def _trava(ticker):
+    with _trava_global:
+        return _travas.setdefault(ticker, threading.Lock())
+
+
+def _arquivo(ticker):
+    return provedores.subdiretorio(DIRETORIO_PRECOS) / '{}.parquet'.format(ticker.upper())
+
+
+def _ler(ticker):
+    arquivo = _arquivo(ticker)
+    try:
+        modificacao = arquivo.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _trava_global:
+        lido = _lidos.get(arquivo)
+        if lido is not None and lido[0] == modificacao:
+            _lidos.move_to_end(arquivo)
+            return lido[1]
+    df = ler_parquet(arquivo)
+    with _trava_global:
+        _lidos[arquivo] = (modificacao, df)
+        while len(_lidos) > HISTORICOS_EM_MEMORIA:
+            _lidos.popitem(last=False)
+    return df
+
+
+def _gravar(ticker, df):
+    arquivo = _arquivo(ticker)
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    # Grava em arquivo temporário e troca, para que leituras concorrentes
+    # nunca vejam um Parquet pela metade
+    temporario = arquivo.with_suffix('.parquet.tmp{}'.format(threading.get_ident()))
+    df.to_parquet(temporario)
+    os.replace(temporario, arquivo)
+
+
+def _desatualizado(ticker):
+    arquivo = _arquivo(ticker)
+    modificacao = datetime.fromtimestamp(arquivo.stat().st_mtime)
+    return datetime.now() - modificacao > VALIDADE_ATUALIZACAO
+
+
+# As barras novas só podem ser emendadas às gravadas se estiverem na mesma
+# base de ajuste. Um dividendo ou desdobramento novo reajusta todo o
+# histórico anterior: o fechamento do pregão de referência baixado de novo
+# muda, e a coluna de eventos traz o valor diferente de zero.
+def _mesma_base(df, novos, referencia):
+    if referencia not in novos.index:
+        return False
+    if not np.isclose(df.at[referencia, 'Close'], novos.at[referencia, 'Close'], rtol=1e-6):
+        return False
+    for coluna in ('Dividends', 'Stock Splits'):
+        if coluna not in novos.columns:
+            continue
+        eventos = novos.loc[novos.index > referencia, coluna].fillna(0)
+        gravados = df[coluna].reindex(eventos.index).fillna(0) if coluna in df.columns else 0
+        if ((eventos != 0) & (eventos != gravados)).any():
+            return False
+    return True
+
+
+def atualizar(ticker, forcar=False):
+    ticker = ticker.upper()
+    with _trava(ticker):
+        df = _ler(ticker)
+        if df is not None and not forcar and not _desatualizado(ticker):
+            return df
+
+        if df is None or df.empty:
+            # Primeira consulta: baixa o histórico completo uma única vez
+            df = provedores.ticker(ticker).history('max')
+            if df.empty:
+                raise ValueError("Sem dados históricos para o ativo {}.".format(ticker))
+        else:
+            # Baixa apenas as barras a partir do penúltimo pregão armazenado:
+            # o último pode ter sido gravado ainda durante o pregão, e o
+            # penúltimo serve de referência para conferir a base de ajuste
+            referencia = df.index[-2] if len(df) > 1 else df.index[-1]
+            try:
+                novos = provedores.ticker(ticker).history(start=referencia.strftime('%Y-%m-%d'))
+                completo = None
+                if not novos.empty and not _mesma_base(df, novos, referencia):
+                    # Base de ajuste mudou: o histórico inteiro é baixado de novo
+                    completo = provedores.ticker(ticker).history('max')
+            except Exception:
+                # Sem conexão: segue com o histórico local
+                return df
+            if completo is not None:
+                if completo.empty:
+                    return df
+                df = completo
+            elif not novos.empty:
+                novos = novos.reindex(columns=df.columns.union(novos.columns, sort=False))
+                df = pd.concat([df[df.index < novos.index[0]], novos])
+
+        _gravar(ticker, df)
+        return df
+
+
+def fatiar_periodo(df, periodo):
+    if periodo == 'max' or df.empty:
+        return df
+    if periodo in _pregoes:
+        return df.iloc[-_pregoes[periodo]:]
+
+    ultimo = df.index[-1]
+    if periodo == 'ytd':
+        inicio = ultimo.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif periodo in _deslocamentos:
+        inicio = ultimo.normalize() - _deslocamentos[periodo]
+    else:
+        raise ValueError("Período {} não suportado.".format(periodo))
+    return df[df.index >= inicio]
+
+
+# Substitui dados.history(periodo): serve qualquer período como fatia local
+# do histórico completo armazenado em disco
+def historico_precos(ticker, periodo='max'):
+    df = atualizar(ticker)
+    return fatiar_periodo(df, periodo).copy()
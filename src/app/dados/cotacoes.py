@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from dados import provedores
+from dados.download import MAX_CONEXOES
+from dados.segundo_plano import ATRASO_ATUALIZACOES
+
+# Intervalo, em segundos, entre duas consultas de cada ticker acompanhado
+INTERVALO_COTACOES = float(os.environ.get('SIMULADOR_INTERVALO_COTACOES', 15))
+
+# Tickers que nenhuma sessão lê por esse tempo deixam de ser consultados
+ABANDONO = 5 * 60
+
+# Fonte das cotações ao vivo. Opções: provedor, simulada
+FONTE_PADRAO = 'provedor'
+
+
+# Último preço e fechamento anterior pelo provedor de dados ativo
+class FonteProvedor:
+    nome = 'provedor'
+
+    def consultar(self, ticker):
+        historico = provedores.ticker(ticker).history(period='5d')
+        if historico.empty:
+            raise ValueError("Ativo {} sem cotações recentes.".format(ticker))
+        fechamentos = historico['Close'].to_numpy()
+        anterior = fechamentos[-2] if len(fechamentos) > 1 else fechamentos[-1]
+        return float(fechamentos[-1]), float(anterior)
+
+
+# Fonte local para testes e demonstrações: parte do último fechamento do
+# provedor e anda aleatoriamente a cada consulta, sem acessar a rede
+class FonteSimulada:
+    nome = 'simulada'
+
+    def __init__(self, volatilidade=0.002, semente=None):
+        self.volatilidade = volatilidade
+        self._aleatorio = np.random.default_rng(semente)
+        self._precos = {}
+
+    def consultar(self, ticker):
+        if ticker not in self._precos:
+            try:
+                fechamento = FonteProvedor().consultar(ticker)[0]
+            except Exception:
+                fechamento = 100.0
+            self._precos[ticker] = (fechamento, fechamento)
+        preco, anterior = self._precos[ticker]
+        preco *= float(np.exp(self._aleatorio.normal(0, self.volatilidade)))
+        self._precos[ticker] = (preco, anterior)
+        return preco, anterior
+
+
+FONTES = {
+    'provedor': FonteProvedor,
+    'simulada': FonteSimulada,
+}
+
+
+# Uma única thread em segundo plano consulta os tickers acompanhados e
+# guarda a última cotação de cada um. As sessões só leem esse registro,
+# então N sessões olhando o mesmo ticker geram uma consulta por intervalo.
+# Um ticker pedido sem espera só é consultado depois de `atraso`, para não
+# disputar a CPU com a primeira pintura da sessão que o pediu.
+class ServicoCotacoes:
+    def __init__(self, fonte, intervalo=INTERVALO_COTACOES, abandono=ABANDONO, atraso=ATRASO_ATUALIZACOES):
+        self.fonte = fonte
+        self.intervalo = intervalo
+        self.abandono = abandono
+        self.atraso = atraso
+        self._cotacoes = {}
+        self._leituras = {}
+        self._condicao = threading.Condition()
+        self._acordar = threading.Event()
+        self._thread = None
+
+    def _iniciar_thread(self, atraso):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._executar, args=(atraso,), name='cotacoes', daemon=True)
+            self._thread.start()
+
+    def _consultar(self, ticker):
+        try:
+            preco, anterior = self.fonte.consultar(ticker)
+            cotacao = {
+                'preco': preco,
+                'variacao': (preco / anterior - 1) * 100 if anterior else 0.0,
+                'momento': time.time(),
+                'erro': None,
+            }
+        except Exception as e:
+            # Mantém o último preço conhecido e registra o erro
+            cotacao = dict(self._cotacoes.get(ticker) or {'preco': None, 'variacao': None, 'momento': None})
+            cotacao['erro'] = str(e) or e.__class__.__name__
+        with self._condicao:
+            self._cotacoes[ticker] = cotacao
+            self._condicao.notify_all()
+
+    def _executar(self, atraso):
+        self._acordar.wait(atraso)
+        self._acordar.clear()
+        while True:
+            agora = time.time()
+            with self._condicao:
+                for ticker, leitura in list(self._leituras.items()):
+                    if agora - leitura > self.abandono:
+                        del self._leituras[ticker]
+                        self._cotacoes.pop(ticker, None)
+                pendentes = [
+                    t for t in self._leituras
+                    if t not in self._cotacoes or self._cotacoes[t]['momento'] is None
+                    or agora - self._cotacoes[t]['momento'] >= self.intervalo
+                ]
+            if pendentes:
+                with ThreadPoolExecutor(max_workers=min(MAX_CONEXOES, len(pendentes))) as executor:
+                    list(executor.map(self._consultar, pendentes))
+            # Dorme até o próximo intervalo ou até uma sessão pedir um ticker novo
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+
+    # Última cotação do ticker ({'preco', 'variacao', 'momento', 'erro'}).
+    # Um ticker novo passa a ser acompanhado e a chamada espera até
+    # `espera` segundos pela primeira consulta; sem ela, devolve None.
+    def cotacao(self, ticker, espera=5.0):
+        ticker = ticker.upper()
+        with self._condicao:
+            novo = ticker not in self._leituras
+            self._leituras[ticker] = time.time()
+            self._iniciar_thread(self.atraso if not espera else 0)
+        if novo and espera:
+            self._acordar.set()
+        elif novo:
+            acordar = threading.Timer(self.atraso, self._acordar.set)
+            acordar.daemon = True
+            acordar.start()
+        with self._condicao:
+            self._condicao.wait_for(lambda: ticker in self._cotacoes, timeout=espera)
+            return self._cotacoes.get(ticker)
+
+    def acompanhados(self):
+        with self._condicao:
+            return sorted(self._leituras)
+
+
+_servico = None
+_trava = threading.Lock()
+
+
+# Serviço compartilhado por todas as sessões do processo, com a fonte
+# escolhida pela variável de ambiente SIMULADOR_COTACOES
+def obter_servico():
+    global _servico
+    with _trava:
+        if _servico is None:
+            nome = os.environ.get('SIMULADOR_COTACOES', FONTE_PADRAO)
+            if nome not in FONTES:
+                raise ValueError("Fonte de cotações {} desconhecida. Opções: {}".format(nome, list(FONTES)))
+            _servico = ServicoCotacoes(FONTES[nome]())
+        return _servico
+
+
+def cotacao(ticker, espera=5.0):
+    return obter_servico().cotacao(ticker, espera)
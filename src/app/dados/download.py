@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from dados import metadados
+from dados.armazenamento import historico_precos
+
+# Número máximo de requisições simultâneas ao provedor de dados
+MAX_CONEXOES = 16
+
+# Lista inicial de ativos das páginas com vários tickers
+ATIVOS_PADRAO = ['PETR4.SA', 'VALE3.SA',
+                 'ITUB4.SA', 'WEGE3.SA',
+                 'BBDC3.SA', 'ABEV3.SA',
+                 'BBAS3.SA', 'BPAC11.SA',
+                 'SANB11.SA', 'ITSA4.SA']
+
+
+def _baixar_ticker(ticker, periodo):
+    moeda = metadados.moeda(ticker)
+    historico = historico_precos(ticker, periodo)
+    return historico, moeda
+
+
+# Baixa histórico e moeda de vários tickers em paralelo.
+# Falhas de um ticker não interrompem os demais: são devolvidas em
+# `falhas` ({ticker: mensagem}) para serem exibidas ao usuário.
+def baixar_varios(tickers, periodo, max_conexoes=MAX_CONEXOES):
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    historicos = {}
+    moedas = {}
+    falhas = {}
+    if not tickers:
+        return historicos, moedas, falhas
+
+    with ThreadPoolExecutor(max_workers=min(max_conexoes, len(tickers))) as executor:
+        futuros = {
+            ticker: executor.submit(_baixar_ticker, ticker, periodo)
+            for ticker in tickers
+        }
+        for ticker, futuro in futuros.items():
+            try:
+                historicos[ticker], moedas[ticker] = futuro.result()
+            except Exception as e:
+                falhas[ticker] = str(e) or e.__class__.__name__
+
+    return historicos, moedas, falhas
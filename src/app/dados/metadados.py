@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+
+from dados import provedores
+from dados.armazenamento import DIRETORIO_CACHE
+from dados.segundo_plano import NOVA_TENTATIVA
+
+DIRETORIO_METADADOS = DIRETORIO_CACHE / 'metadados'
+
+# Tempo de validade das informações de um ticker (moeda, nome, setor e
+# site), configurável em horas por SIMULADOR_VALIDADE_METADADOS
+VALIDADE_METADADOS = timedelta(hours=float(os.environ.get('SIMULADOR_VALIDADE_METADADOS', 24)))
+
+# O calendário de earnings é consultado à parte, só por quem o usa, e vence
+# antes porque as datas são remarcadas (SIMULADOR_VALIDADE_CALENDARIO, em horas)
+VALIDADE_CALENDARIO = timedelta(hours=float(os.environ.get('SIMULADOR_VALIDADE_CALENDARIO', 6)))
+
+CAMPOS_INFO = ['currency', 'longName', 'sector', 'website']
+
+_memoria = {}
+_em_andamento = {}
+_trava = threading.Lock()
+
+log = logging.getLogger(__name__)
+
+
+def _consultar_info(ticker):
+    info = provedores.ticker(ticker).get_info()
+    if 'currency' not in info:
+        raise ValueError("Ativo {} sem informações no provedor.".format(ticker))
+    return {campo: info.get(campo) for campo in CAMPOS_INFO}
+
+
+def _consultar_calendario(ticker):
+    try:
+        return dict(provedores.ticker(ticker).calendar)
+    except Exception:
+        # Muitos ativos não têm calendário de earnings
+        return None
+
+
+# Tipos de registro guardados por ticker: consulta ao provedor, sufixo do
+# arquivo em disco e validade
+TIPOS = {
+    'info': (_consultar_info, '', VALIDADE_METADADOS),
+    'calendario': (_consultar_calendario, '.calendario', VALIDADE_CALENDARIO),
+}
+
+
+def _arquivo(ticker, tipo):
+    return provedores.subdiretorio(DIRETORIO_METADADOS) / '{}{}.json'.format(ticker, TIPOS[tipo][1])
+
+
+def _ler(ticker, tipo):
+    arquivo = _arquivo(ticker, tipo)
+    if not arquivo.exists():
+        return None
+    try:
+        return json.loads(arquivo.read_text(encoding='utf-8'), object_hook=provedores.decodificar_datas)
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar(ticker, tipo, registro):
+    arquivo = _arquivo(ticker, tipo)
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    temporario = arquivo.with_suffix('.json.tmp{}'.format(threading.get_ident()))
+    temporario.write_text(json.dumps(registro, default=provedores.codificar_datas), encoding='utf-8')
+    os.replace(temporario, arquivo)
+
+
+def _valido(registro, tipo):
+    return (registro is not None and tipo in registro
+            and time.time() - registro['momento'] < TIPOS[tipo][2].total_seconds())
+
+
+def _buscar(ticker, tipo):
+    registro = _ler(ticker, tipo)
+    if _valido(registro, tipo):
+        return registro
+    try:
+        novo = {'momento': time.time(), tipo: TIPOS[tipo][0](ticker)}
+    except Exception:
+        # Sem conexão: segue com a cópia vencida, se houver, remarcada para
+        # vencer de novo só depois de NOVA_TENTATIVA (o registro fica na
+        # memória, e cada chamada não volta ao provedor)
+        if registro is not None and tipo in registro:
+            validade = TIPOS[tipo][2].total_seconds()
+            return dict(registro, momento=time.time() - validade + min(NOVA_TENTATIVA, validade))
+        raise
+    try:
+        _gravar(ticker, tipo, novo)
+    except OSError as e:
+        log.warning('Erro ao gravar metadados de %s: %s', ticker, e)
+    return novo
+
+
+# Registro do ticker ({'momento', tipo: valor}), da memória, do disco ou do
+# provedor. Consultas simultâneas ao mesmo registro esperam a primeira em
+# vez de repetir a requisição.
+def metadados(ticker, tipo='info'):
+    ticker = ticker.upper()
+    chave = (provedores.obter_provedor().nome, ticker, tipo)
+    with _trava:
+        registro = _memoria.get(chave)
+        if _valido(registro, tipo):
+            return registro
+        futuro = _em_andamento.get(chave)
+        responsavel = futuro is None
+        if responsavel:
+            futuro = _em_andamento[chave] = Future()
+
+    if not responsavel:
+        return futuro.result()
+
+    registro = None
+    try:
+        registro = _buscar(ticker, tipo)
+    except Exception as e:
+        futuro.set_exception(e)
+        raise
+    else:
+        futuro.set_result(registro)
+        return registro
+    finally:
+        with _trava:
+            if registro is not None:
+                _memoria[chave] = registro
+            del _em_andamento[chave]
+
+
+def info_ticker(ticker):
+    return metadados(ticker)['info']
+
+
+def moeda(ticker):
+    return info_ticker(ticker)['currency']
+
+
+def calendario(ticker):
+    registro = metadados(ticker, 'calendario')['calendario']
+    if registro is None:
+        raise ValueError("Ativo {} sem calendário de earnings.".format(ticker))
+    return registro
+
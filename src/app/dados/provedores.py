@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+
+import pandas as pd
+
+from dados import armazenamento
+from dados.sinteticos import DIAS_UTEIS_ANO, gerar_historico
+
+# Provedor usado quando SIMULADOR_PROVEDOR não está definido.
+# Opções: yahoo, gravar, reproduzir, sintetico
+PROVEDOR_PADRAO = 'yahoo'
+
+# Parâmetros do provedor sintético: séries fixas para execuções determinísticas
+ANOS_SINTETICOS = 30
+FIM_SINTETICO = '2025-06-30'
+
+
+# Recorta uma resposta de history() a partir do histórico completo
+def _fatiar(df, period=None, start=None):
+    if start is not None:
+        return df[df.index >= pd.Timestamp(start).tz_localize(df.index.tz)]
+    return armazenamento.fatiar_periodo(df, period or '1mo')
+
+
+# Datas do calendário de earnings não são serializáveis em JSON
+def codificar_datas(valor):
+    if isinstance(valor, (date, datetime)):
+        return {'__data__': valor.isoformat()}
+    raise TypeError(type(valor).__name__)
+
+
+def decodificar_datas(objeto):
+    if '__data__' in objeto:
+        return date.fromisoformat(objeto['__data__'][:10])
+    return objeto
+
+
+# Dados ao vivo do Yahoo Finance
+class ProvedorYahoo:
+    nome = 'yahoo'
+
+    def ticker(self, simbolo):
+        # Importado só no primeiro uso: o yfinance (com bs4 e curl_cffi) leva
+        # ~0,3 s para importar e nem é usado pelos provedores locais
+        import yfinance as yf
+        return yf.Ticker(simbolo)
+
+
+# A série de cada ticker é fixa: gerada uma vez por processo (~0,15 s cada),
+# para que a consulta de cotações em segundo plano não dispute a CPU com a
+# primeira pintura das páginas
+@lru_cache(maxsize=64)
+def _historico_sintetico(ticker):
+    return gerar_historico(ticker, ANOS_SINTETICOS * DIAS_UTEIS_ANO, fim=FIM_SINTETICO)
+
+
+# Ticker com a mesma interface usada do yf.Ticker (history, get_info,
+# info e calendar), gerado por movimento browniano geométrico
+class TickerSintetico:
+    def __init__(self, simbolo):
+        self.ticker = simbolo.upper()
+
+    def history(self, period=None, start=None, **kwargs):
+        return _fatiar(_historico_sintetico(self.ticker), period, start).copy()
+
+    def get_info(self):
+        return {
+            'currency': 'BRL' if self.ticker.endswith('.SA') else 'USD',
+            'longName': 'Ativo sintético {}'.format(self.ticker),
+            'sector': 'Sintético',
+            'website': 'N/A',
+        }
+
+    @property
+    def info(self):
+        return self.get_info()
+
+    @property
+    def calendar(self):
+        return {'Earnings Date': [(pd.Timestamp(FIM_SINTETICO) + pd.DateOffset(months=1)).date()]}
+
+
+class ProvedorSintetico:
+    nome = 'sintetico'
+
+    def ticker(self, simbolo):
+        return TickerSintetico(simbolo)
+
+
+# Ticker que grava em disco as respostas da origem (modo gravar) ou
+# serve apenas o que já foi gravado, sem acessar a rede (origem=None)
+class TickerGravado:
+    def __init__(self, simbolo, diretorio, origem=None):
+        self.ticker = simbolo.upper()
+        self.diretorio = diretorio / self.ticker
+        self.origem = origem
+
+    def _arquivo(self, nome):
+        return self.diretorio / nome
+
+    def _ausente(self, nome):
+        return ValueError("Ativo {} sem {} gravado em {}. Grave antes com SIMULADOR_PROVEDOR=gravar.".format(
+            self.ticker, nome, self.diretorio))
+
+    def _gravar(self, nome, escrever):
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        arquivo = self._arquivo(nome)
+        temporario = arquivo.with_name('{}.tmp{}'.format(nome, threading.get_ident()))
+        escrever(temporario)
+        os.replace(temporario, arquivo)
+
+    def _json(self, nome, obter):
+        arquivo = self._arquivo(nome)
+        if self.origem is None:
+            if not arquivo.exists():
+                raise self._ausente(nome)
+            return json.loads(arquivo.read_text(encoding='utf-8'), object_hook=decodificar_datas)
+
+        valor = obter()
+        texto = json.dumps(valor, default=codificar_datas)
+        self._gravar(nome, lambda caminho: caminho.write_text(texto, encoding='utf-8'))
+        return valor
+
+    def history(self, period=None, start=None, **kwargs):
+        arquivo = self._arquivo('historico.parquet')
+        if self.origem is None:
+            if not arquivo.exists():
+                raise self._ausente('historico.parquet')
+            return _fatiar(pd.read_parquet(arquivo), period, start)
+
+        # Acumula todas as respostas em um único histórico, que depois é
+        # recortado conforme o period/start de cada chamada
+        novos = self.origem.history(period=period, start=start, **kwargs)
+        if not novos.empty:
+            if arquivo.exists():
+                gravado = pd.read_parquet(arquivo)
+                novos_completo = novos.reindex(columns=gravado.columns.union(novos.columns, sort=False))
+                completo = pd.concat([gravado[gravado.index < novos.index[0]], novos_completo,
+                                      gravado[gravado.index > novos.index[-1]]])
+            else:
+                completo = novos
+            self._gravar('historico.parquet', completo.to_parquet)
+        return novos
+
+    def get_info(self):
+        return self._json('info.json', self.origem.get_info if self.origem else None)
+
+    @property
+    def info(self):
+        return self.get_info()
+
+    @property
+    def calendar(self):
+        return self._json('calendario.json', lambda: self.origem.calendar)
+
+
+class ProvedorGravacao:
+    def __init__(self, reproduzir=False, diretorio=None):
+        self.nome = 'reproduzir' if reproduzir else 'gravar'
+        self.diretorio = diretorio or armazenamento.DIRETORIO_CACHE / 'gravacoes'
+        self.origem = None if reproduzir else ProvedorYahoo()
+
+    def ticker(self, simbolo):
+        origem = self.origem.ticker(simbolo) if self.origem else None
+        return TickerGravado(simbolo, self.diretorio, origem)
+
+
+PROVEDORES = {
+    'yahoo': ProvedorYahoo,
+    'gravar': ProvedorGravacao,
+    'reproduzir': lambda: ProvedorGravacao(reproduzir=True),
+    'sintetico': ProvedorSintetico,
+}
+
+_provedor = None
+
+
+def definir_provedor(nome):
+    global _provedor
+    if nome not in PROVEDORES:
+        raise ValueError("Provedor {} desconhecido. Opções: {}".format(nome, list(PROVEDORES)))
+    _provedor = PROVEDORES[nome]()
+    return _provedor
+
+
+# Provedor ativo, escolhido pela variável de ambiente SIMULADOR_PROVEDOR
+def obter_provedor():
+    if _provedor is None:
+        return definir_provedor(os.environ.get('SIMULADOR_PROVEDOR', PROVEDOR_PADRAO))
+    return _provedor
+
+
+# Cada provedor fora o Yahoo grava em seu próprio subdiretório, para que
+# dados sintéticos ou gravados não se misturem aos reais
+def subdiretorio(base):
+    nome = obter_provedor().nome
+    return base if nome == 'yahoo' else base / nome
+
+
+# Substitui yf.Ticker(simbolo) em todo o aplicativo
+def ticker(simbolo):
+    return obter_provedor().ticker(simbolo)
@@ -0,0 +1,59 @@
+import logging
+import os
+import threading
+import time
+
+# Segundos entre o pedido de uma atualização e o início dela: a sessão que
+# pediu termina a primeira pintura sem disputar a CPU com a coleta
+ATRASO_ATUALIZACOES = float(os.environ.get('SIMULADOR_ATRASO_ATUALIZACOES', 2))
+
+# SIMULADOR_ATUALIZACOES=0 desliga as coletas em segundo plano (execuções
+# totalmente offline, como o benchmark de inicialização)
+ATUALIZACOES_ATIVAS = os.environ.get('SIMULADOR_ATUALIZACOES', '1') != '0'
+
+# Espera, em segundos, antes de tentar de novo depois de uma falha (sem
+# conexão, cada execução de página dispararia uma nova coleta)
+NOVA_TENTATIVA = 10 * 60
+
+log = logging.getLogger(__name__)
+
+
+# Atualização em segundo plano compartilhada por todas as sessões (lista de
+# earnings, lista de ativos): uma execução por vez, adiada por `atraso` e,
+# depois de uma falha, suspensa por `nova_tentativa`. `funcao` indica a
+# falha levantando uma exceção.
+class TarefaSegundoPlano:
+    def __init__(self, nome, funcao, atraso=ATRASO_ATUALIZACOES, nova_tentativa=NOVA_TENTATIVA):
+        self.nome = nome
+        self.funcao = funcao
+        self.atraso = atraso
+        self.nova_tentativa = nova_tentativa
+        self._executando = False
+        self._falha = None
+        self._trava = threading.Lock()
+
+    # Agenda a execução com `argumentos`; devolve False se ela já está em
+    # andamento, em espera depois de uma falha ou desligada
+    def disparar(self, *argumentos):
+        if not ATUALIZACOES_ATIVAS:
+            return False
+        with self._trava:
+            if self._executando or (self._falha is not None and time.time() - self._falha < self.nova_tentativa):
+                return False
+            self._executando = True
+        temporizador = threading.Timer(self.atraso, self._executar, argumentos)
+        temporizador.name = self.nome
+        temporizador.daemon = True
+        temporizador.start()
+        return True
+
+    def _executar(self, *argumentos):
+        falha = None
+        try:
+            self.funcao(*argumentos)
+        except Exception as e:
+            falha = time.time()
+            log.warning('Erro ao atualizar %s: %s', self.nome, e)
+        with self._trava:
+            self._executando = False
+            self._falha = falha
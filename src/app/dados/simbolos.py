@@ -0,0 +1,270 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from difflib import SequenceMatcher
+from urllib.request import Request, urlopen
+
+import numpy as np
+import pandas as pd
+
+from dados.armazenamento import DIRETORIO_CACHE, ler_parquet
+from dados.segundo_plano import TarefaSegundoPlano
+
+# Diretório local de símbolos (B3 e EUA), usado para completar e validar
+# tickers antes de qualquer consulta ao provedor
+ARQUIVO_SIMBOLOS = DIRETORIO_CACHE / 'simbolos.parquet'
+
+# Intervalo entre duas atualizações das listas de ativos, em dias
+VALIDADE_SIMBOLOS = float(os.environ.get('SIMULADOR_VALIDADE_SIMBOLOS', 7)) * 24 * 60 * 60
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+TIMEOUT = 30  # segundos
+
+# Listas oficiais da Nasdaq (Nasdaq, NYSE, NYSE American, NYSE Arca e Cboe)
+URLS_EUA = [
+    'https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt',
+    'https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt',
+]
+# Lista de ações, FIIs, ETFs e BDRs negociados na B3
+URL_B3 = 'https://brapi.dev/api/available'
+
+COLUNAS = ['simbolo', 'nome', 'mercado']
+
+_trava = threading.Lock()
+_indice = None
+
+log = logging.getLogger(__name__)
+
+
+# Mercado coberto pelo diretório: 'B3' para .SA, 'EUA' para símbolos sem
+# sufixo. Índices (^BVSP), câmbio (BRL=X), cripto (BTC-USD) e outras bolsas
+# não estão nas listas e ficam de fora (None), sem validação.
+def mercado(simbolo):
+    if simbolo.endswith('.SA'):
+        return 'B3'
+    if '.' in simbolo or '^' in simbolo or '=' in simbolo or re.search(r'-[A-Z]{3}$', simbolo):
+        return None
+    return 'EUA'
+
+
+# Símbolo sem o sufixo da bolsa: 'PETR4.SA' -> 'PETR4'
+def base(simbolo):
+    return simbolo[:-3] if simbolo.endswith('.SA') else simbolo
+
+
+def _ler_url(url):
+    with urlopen(Request(url, headers=HEADERS), timeout=TIMEOUT) as response:
+        return response.read().decode(response.headers.get_content_charset() or 'utf-8')
+
+
+# Arquivos separados por '|' da Nasdaq. As classes de ações usam '.' na
+# lista (BRK.B) e '-' no Yahoo (BRK-B); emissões de teste ficam de fora.
+def _listas_eua():
+    linhas = []
+    for url in URLS_EUA:
+        tabela = [l.split('|') for l in _ler_url(url).splitlines() if l and not l.startswith('File Creation Time')]
+        cabecalho, registros = tabela[0], tabela[1:]
+        simbolo = cabecalho.index('Symbol' if 'Symbol' in cabecalho else 'ACT Symbol')
+        nome, teste = cabecalho.index('Security Name'), cabecalho.index('Test Issue')
+        linhas += [(r[simbolo].replace('.', '-'), r[nome], 'EUA') for r in registros
+                   if len(r) == len(cabecalho) and r[teste] != 'Y']
+    return linhas
+
+
+def _lista_b3():
+    disponiveis = json.loads(_ler_url(URL_B3))
+    return [(simbolo.upper() + '.SA', None, 'B3') for simbolo in disponiveis.get('stocks', [])]
+
+
+FONTES = {
+    'EUA': _listas_eua,
+    'B3': _lista_b3,
+}
+
+
+def _ler():
+    try:
+        return ler_parquet(ARQUIVO_SIMBOLOS), ARQUIVO_SIMBOLOS.stat().st_mtime
+    except (OSError, ValueError):
+        return pd.DataFrame(columns=COLUNAS), None
+
+
+def _gravar(tabela):
+    ARQUIVO_SIMBOLOS.parent.mkdir(parents=True, exist_ok=True)
+    temporario = ARQUIVO_SIMBOLOS.with_suffix('.parquet.tmp')
+    tabela.to_parquet(temporario, index=False)
+    temporario.replace(ARQUIVO_SIMBOLOS)
+
+
+# Baixa as listas de cada mercado. Um mercado que falhar mantém as linhas
+# da atualização anterior, para que uma fonte fora do ar não esvazie o diretório.
+def atualizar():
+    anterior, _ = _ler()
+    partes, falhas = [], {}
+    for nome, fonte in FONTES.items():
+        try:
+            linhas = fonte()
+            if not linhas:
+                raise ValueError("lista vazia")
+            partes.append(pd.DataFrame(linhas, columns=COLUNAS))
+        except Exception as e:
+            falhas[nome] = e
+            partes.append(anterior[anterior['mercado'] == nome])
+    # Uma mensagem só com as listas que falharam; se todas falharem, a
+    # tarefa em segundo plano registra o erro
+    erros = '; '.join('{}: {}'.format(nome, e) for nome, e in falhas.items())
+    if len(falhas) == len(FONTES):
+        raise ValueError("nenhuma lista de ativos disponível ({})".format(erros))
+    if falhas:
+        log.warning('Erro ao atualizar a lista de ativos: %s', erros)
+    _gravar(pd.concat(partes, ignore_index=True).drop_duplicates('simbolo'))
+
+
+_atualizacao = TarefaSegundoPlano('lista de ativos', atualizar)
+
+
+# Remoções de um caractere de cada palavra: duas palavras a uma edição de
+# distância (troca, inclusão, exclusão ou inversão de vizinhos) têm alguma
+# remoção em comum
+def _remocoes(palavra):
+    return {palavra} | {palavra[:i] + palavra[i + 1:] for i in range(len(palavra))}
+
+
+# Se `a` e `b` estão a no máximo uma edição de distância. Uma remoção em
+# comum não basta: ABA e BAB dividem AB e estão a duas edições.
+def _uma_edicao(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    if len(a) - len(b) > 1:
+        return False
+    i = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), len(b))
+    if len(a) != len(b):
+        return a[i + 1:] == b[i:]
+    return (a[i + 1:] == b[i + 1:]
+            or (i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]))
+
+
+# Índice dos símbolos em arrays ordenados: busca binária (searchsorted) para
+# pertinência e prefixos. As chaves de completar (símbolo, símbolo sem .SA e
+# palavras do nome) e as de semelhança (remoções de um caractere) são
+# montadas no primeiro uso, porque validar só precisa da lista de símbolos.
+class IndiceSimbolos:
+    def __init__(self, tabela):
+        simbolos = tabela['simbolo'].to_numpy(dtype=str)
+        ordem = np.argsort(simbolos)
+        self.simbolos = simbolos[ordem]
+        self.nomes = tabela['nome'].to_numpy(dtype=object)[ordem]
+        self.mercados = set(tabela['mercado'])
+        self._completar = None
+        self._semelhantes = None
+
+    def __len__(self):
+        return len(self.simbolos)
+
+    def _posicao(self, simbolo):
+        i = np.searchsorted(self.simbolos, simbolo)
+        return i if i < len(self.simbolos) and self.simbolos[i] == simbolo else None
+
+    def contem(self, simbolo):
+        return self._posicao(simbolo) is not None
+
+    def nome(self, simbolo):
+        i = self._posicao(simbolo)
+        return None if i is None else self.nomes[i]
+
+    # Símbolos de mercados que o diretório não cobre (ou ainda não carregou)
+    # são aceitos sem validação
+    def valido(self, simbolo):
+        return mercado(simbolo) not in self.mercados or self.contem(simbolo)
+
+    @staticmethod
+    def _ordenar(chaves, posicoes):
+        chaves = np.array(chaves, dtype=str)
+        ordem = np.argsort(chaves, kind='stable')
+        return chaves[ordem], np.array(posicoes, dtype=np.int32)[ordem]
+
+    def _indice_completar(self):
+        if self._completar is None:
+            chaves, posicoes = [], []
+            for i, (simbolo, nome) in enumerate(zip(self.simbolos, self.nomes)):
+                palavras = {simbolo, base(simbolo)}
+                palavras.update(p for p in re.split(r'[^0-9A-Z]+', (nome or '').upper()) if len(p) > 1)
+                chaves += palavras
+                posicoes += [i] * len(palavras)
+            self._completar = self._ordenar(chaves, posicoes)
+        return self._completar
+
+    def _indice_semelhantes(self):
+        if self._semelhantes is None:
+            chaves, posicoes = [], []
+            for i, simbolo in enumerate(self.simbolos):
+                remocoes = _remocoes(base(simbolo))
+                chaves += remocoes
+                posicoes += [i] * len(remocoes)
+            self._semelhantes = self._ordenar(chaves, posicoes)
+        return self._semelhantes
+
+    @staticmethod
+    def _faixa(chaves, inicio, fim):
+        return slice(np.searchsorted(chaves, inicio, 'left'), np.searchsorted(chaves, fim, 'right'))
+
+    # Símbolos cujo código (com ou sem .SA) ou alguma palavra do nome começa
+    # com `prefixo`. Primeiro os códigos, do mais curto ao mais longo.
+    def completar(self, prefixo, limite=10):
+        prefixo = prefixo.strip().upper()
+        if not prefixo:
+            return []
+        chaves, posicoes = self._indice_completar()
+        faixa = self._faixa(chaves, prefixo, prefixo + '\U0010ffff')
+        simbolos = [str(s) for s in self.simbolos[np.unique(posicoes[faixa])]]
+        por_codigo = [s for s in simbolos if base(s).startswith(prefixo) or s.startswith(prefixo)]
+        por_nome = sorted(set(simbolos) - set(por_codigo))
+        return (sorted(por_codigo, key=lambda s: (len(s), s)) + por_nome)[:limite]
+
+    # Símbolos a uma edição de distância do código digitado, do mais
+    # parecido ao menos parecido. Com .SA, os da B3 vêm primeiro.
+    def semelhantes(self, texto, limite=5):
+        texto = texto.strip().upper()
+        if not texto:
+            return []
+        chaves, posicoes = self._indice_semelhantes()
+        candidatos = set()
+        for remocao in _remocoes(base(texto)):
+            candidatos.update(posicoes[self._faixa(chaves, remocao, remocao)])
+        alvo = mercado(texto)
+        ordenados = sorted(
+            (s for s in map(str, self.simbolos[sorted(candidatos)]) if _uma_edicao(base(texto), base(s))),
+            key=lambda s: (alvo is not None and mercado(s) != alvo,
+                           -SequenceMatcher(None, base(texto), base(s)).ratio(), s),
+        )
+        return ordenados[:limite]
+
+    # Sugestões para um texto que não é um símbolo: completar e semelhantes
+    def sugerir(self, texto, limite=6):
+        sugestoes = []
+        for simbolo in self.completar(texto, limite) + self.semelhantes(texto, limite):
+            if simbolo not in sugestoes:
+                sugestoes.append(simbolo)
+        return sugestoes[:limite]
+
+
+# Índice do diretório em disco, refeito quando o arquivo muda. Dispara a
+# atualização em segundo plano se o diretório não existe ou está vencido;
+# até a primeira atualização o índice fica vazio e aceita qualquer símbolo.
+def obter_indice():
+    global _indice
+    try:
+        modificacao = ARQUIVO_SIMBOLOS.stat().st_mtime
+    except OSError:
+        modificacao = None
+    if modificacao is None or time.time() - modificacao > VALIDADE_SIMBOLOS:
+        _atualizacao.disparar()
+
+    with _trava:
+        if _indice is None or _indice[0] != modificacao:
+            tabela, _ = _ler() if modificacao is not None else (pd.DataFrame(columns=COLUNAS), None)
+            _indice = (modificacao, IndiceSimbolos(tabela))
+        return _indice[1]
@@ -0,0 +1,55 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+DIAS_UTEIS_ANO = 252
+
+
+def _semente(ticker, semente):
+    # Semente estável entre execuções (hash() do Python muda a cada processo)
+    return zlib.crc32(ticker.upper().encode()) ^ semente
+
+
+# Fechamentos por movimento browniano geométrico, determinísticos para a
+# mesma semente
+def gerar_fechamentos(n_dias, semente=0, preco_inicial=100.0, retorno_anual=0.08, volatilidade_anual=0.25):
+    rng = np.random.default_rng(semente)
+    dt = 1 / DIAS_UTEIS_ANO
+    choques = rng.normal((retorno_anual - volatilidade_anual ** 2 / 2) * dt,
+                         volatilidade_anual * np.sqrt(dt), n_dias)
+    return preco_inicial * np.exp(np.cumsum(choques))
+
+
+# Histórico diário no mesmo formato do yfinance (Ticker.history):
+# índice 'Date' em pregões, terminando em `fim`.
+# O fuso padrão não tem horário de verão à meia-noite, o que quebraria o resample mensal.
+def gerar_historico(ticker, n_dias, fim='2025-06-30', semente=0, fuso='America/New_York', **kwargs):
+    datas = pd.bdate_range(end=fim, periods=n_dias)
+    datas = pd.DatetimeIndex(datas.tz_localize(fuso, nonexistent='shift_forward'), name='Date')
+    rng = np.random.default_rng(_semente(ticker, semente))
+    fechamento = gerar_fechamentos(n_dias, rng.integers(2 ** 32), **kwargs)
+    abertura = fechamento * np.exp(rng.normal(0, 0.005, n_dias))
+    amplitude = np.abs(rng.normal(0, 0.01, n_dias))
+
+    return pd.DataFrame({
+        'Open': abertura,
+        'High': np.maximum(abertura, fechamento) * (1 + amplitude),
+        'Low': np.minimum(abertura, fechamento) * (1 - amplitude),
+        'Close': fechamento,
+        'Volume': rng.integers(10_000, 10_000_000, n_dias),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=datas)
+
+
+# Fechamentos diários de um universo de ativos (colunas = tickers)
+def gerar_universo(n_ativos, n_dias, fim='2025-06-30', semente=0):
+    datas = pd.bdate_range(end=fim, periods=n_dias)
+    rng = np.random.default_rng(semente)
+    retornos = rng.uniform(-0.05, 0.20, n_ativos)
+    volatilidades = rng.uniform(0.15, 0.50, n_ativos)
+    dt = 1 / DIAS_UTEIS_ANO
+    choques = rng.normal((retornos - volatilidades ** 2 / 2) * dt, volatilidades * np.sqrt(dt), (n_dias, n_ativos))
+    precos = rng.uniform(5, 200, n_ativos) * np.exp(np.cumsum(choques, axis=0))
+    return pd.DataFrame(precos, index=datas, columns=['SINT{:04d}'.format(i) for i in range(n_ativos)])
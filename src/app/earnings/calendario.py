@@ -0,0 +1,134 @@
+import sqlite3
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+
+from dados.armazenamento import DIRETORIO_CACHE
+
+# Tabela local com as divulgações coletadas: consultas por data ou por ticker
+# usam os índices do SQLite, sem raspar a página de novo
+ARQUIVO_CALENDARIO = DIRETORIO_CACHE / 'earnings.sqlite'
+
+COLUNAS = ['Sigla', 'Nome da Empresa', 'Data']
+
+# Linhas sem data (layout sem a coluna de data) ficam com data nula e são
+# substituídas a cada coleta. A chave primária já indexa por ticker.
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS earnings (
+    sigla TEXT NOT NULL,
+    nome TEXT,
+    data TEXT,
+    PRIMARY KEY (sigla, data)
+);
+CREATE INDEX IF NOT EXISTS earnings_data ON earnings (data);
+CREATE TABLE IF NOT EXISTS coletas (
+    inicio TEXT NOT NULL,
+    fim TEXT NOT NULL,
+    momento REAL NOT NULL,
+    linhas INTEGER NOT NULL
+);
+"""
+
+_trava = threading.Lock()
+_criado = set()
+
+
+def _conectar():
+    ARQUIVO_CALENDARIO.parent.mkdir(parents=True, exist_ok=True)
+    conexao = sqlite3.connect(ARQUIVO_CALENDARIO, timeout=30)
+    with _trava:
+        if ARQUIVO_CALENDARIO not in _criado:
+            # WAL: as sessões leem enquanto a atualização em segundo plano grava
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.executescript(ESQUEMA)
+            _criado.add(ARQUIVO_CALENDARIO)
+    return conexao
+
+
+def _iso(valor):
+    if valor is None:
+        return None
+    return pd.Timestamp(valor).strftime('%Y-%m-%d')
+
+
+# Grava uma coleta. A janela [inicio, fim] coletada é a fonte da verdade:
+# divulgações remarcadas ou canceladas dentro dela são apagadas antes.
+# `linhas` são tuplas (sigla, nome, data), com data date, ISO ou None.
+def substituir(linhas, inicio, fim):
+    registros = {}
+    for sigla, nome, data in linhas:
+        registros[(sigla.upper(), _iso(data))] = nome
+    conexao = _conectar()
+    try:
+        with conexao:
+            conexao.execute('DELETE FROM earnings WHERE data BETWEEN ? AND ? OR data IS NULL', (_iso(inicio), _iso(fim)))
+            conexao.executemany(
+                'INSERT OR REPLACE INTO earnings (sigla, nome, data) VALUES (?, ?, ?)',
+                [(sigla, nome, data) for (sigla, data), nome in registros.items()],
+            )
+            conexao.execute('INSERT INTO coletas (inicio, fim, momento, linhas) VALUES (?, ?, ?, ?)',
+                            (_iso(inicio), _iso(fim), time.time(), len(registros)))
+    finally:
+        conexao.close()
+    return len(registros)
+
+
+# Se alguma coleta feita depois de `desde` (epoch; padrão: qualquer uma)
+# cobriu todo o período entre `inicio` e `fim`
+def coberto(inicio, fim, desde=None):
+    conexao = _conectar()
+    try:
+        return conexao.execute(
+            'SELECT 1 FROM coletas WHERE inicio <= ? AND fim >= ? AND momento >= ? LIMIT 1',
+            (_iso(inicio), _iso(fim), desde or 0),
+        ).fetchone() is not None
+    finally:
+        conexao.close()
+
+
+# Divulgações entre `inicio` e `fim` (inclusive), ordenadas por data. `busca`
+# filtra por início da sigla ou trecho do nome, sem diferenciar maiúsculas.
+# Linhas sem data (layout sem a coluna) entram em qualquer período, no fim.
+def consultar(inicio=None, fim=None, busca=None, limite=None):
+    condicoes, parametros = [], []
+    if inicio is not None:
+        condicoes.append('(data >= ? OR data IS NULL)')
+        parametros.append(_iso(inicio))
+    if fim is not None:
+        condicoes.append('(data <= ? OR data IS NULL)')
+        parametros.append(_iso(fim))
+    if busca:
+        busca = busca.strip()
+        condicoes.append("(sigla LIKE ? ESCAPE '\\' OR nome LIKE ? ESCAPE '\\')")
+        padrao = busca.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        parametros += [padrao.upper() + '%', '%' + padrao + '%']
+    sql = 'SELECT sigla, nome, data FROM earnings'
+    if condicoes:
+        sql += ' WHERE ' + ' AND '.join(condicoes)
+    sql += ' ORDER BY data IS NULL, data, sigla'
+    if limite is not None:
+        sql += ' LIMIT {:d}'.format(limite)
+
+    conexao = _conectar()
+    try:
+        linhas = conexao.execute(sql, parametros).fetchall()
+    finally:
+        conexao.close()
+    empresas = pd.DataFrame(linhas, columns=COLUNAS)
+    empresas['Data'] = pd.to_datetime(empresas['Data']).dt.date
+    return empresas
+
+
+# Próxima divulgação do ticker a partir de `a_partir` (padrão: hoje), ou None
+def proxima_data(ticker, a_partir=None):
+    conexao = _conectar()
+    try:
+        data = conexao.execute(
+            'SELECT MIN(data) FROM earnings WHERE sigla = ? AND data >= ?',
+            (ticker.upper(), _iso(a_partir or date.today())),
+        ).fetchone()[0]
+    finally:
+        conexao.close()
+    return None if data is None else date.fromisoformat(data)
@@ -1,33 +1,204 @@
-from html import parser
+import codecs
 import re
-import pandas as pd
-import requests
+import time
+from datetime import date, timedelta
 from html.parser import HTMLParser
+from urllib.parse import urljoin
+from urllib.request import Request, urlopen
 
-empresa = None
-emp = None
+from dados.segundo_plano import TarefaSegundoPlano
+from earnings import calendario
 
-if empresa == None:
-    url = "https://www.tradingview.com/markets/stocks-usa/earnings/"
-    headers = {"User-Agent": "Mozilla/5.0"}
+URL = "https://www.tradingview.com/markets/stocks-usa/earnings/"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+TIMEOUT = 10  # segundos
 
-    response = requests.get(url, headers=headers)
+# Tempo de validade da tabela local antes de uma nova coleta
+VALIDADE = 6 * 60 * 60  # segundos
 
-    # Conteúdo da página (não terá os dados se forem carregados por JS)
-    html = response.text
+# Janela coletada a partir de hoje e limite de páginas seguidas por coleta
+JANELA = timedelta(days=30)
+MAX_PAGINAS = 20
 
-    # Regex para imagem, sigla e nome da empresa
-    # rg = 'crossorigin src="(.+?)" alt="">\s+<div>\s+<a.+?>(.+)</a>\s<span class="tv-screener__description">\s+(.*?)</span>'
+# A resposta é lida e analisada em blocos, sem montar o HTML inteiro na memória
+BLOCO = 64 * 1024
 
-    # Regex sem a imagem
-    rg = 'crossorigin src=".+?" alt="">\s+<div>\s+<a.+?>(.+)</a>\s<span class="tv-screener__description">\s+(.*?)</span>'
-    # Regex para extrair os nomes das empresas
-    emp = re.findall(rg, html)
+# Datas aceitas nas células: 2025-07-24, Jul 24, 2025 (ou July 24 2025) e
+# 24 Jul 2025. Uma regex só, em vez de strptime em cada célula da tabela.
+DATA = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})'
+    r'|([A-Za-z]{3})[a-z]*\.? (\d{1,2}),? (\d{4})'
+    r'|(\d{1,2}) ([A-Za-z]{3})[a-z]* (\d{4})'
+)
+MESES = {nome: numero for numero, nome in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
 
-    psr = HTMLParser()
-    empresas = pd.DataFrame(emp, columns=['Sigla', 'Nome da Empresa'])
 
-    empresas['Nome da Empresa'] = empresas['Nome da Empresa'].str.replace('&amp;', '&', regex=False)
+def _ler_data(texto):
+    achado = DATA.fullmatch(' '.join(texto.split()))
+    if achado is None:
+        return None
+    ano, mes, dia, mes_1, dia_1, ano_1, dia_2, mes_2, ano_2 = achado.groups()
+    try:
+        if ano:
+            return date(int(ano), int(mes), int(dia))
+        if ano_1:
+            return date(int(ano_1), MESES[mes_1.lower()], int(dia_1))
+        return date(int(ano_2), MESES[mes_2.lower()], int(dia_2))
+    except (KeyError, ValueError):
+        return None
 
-else:
-    print('Não precisou pesquisar')
+
+# Parser incremental da tabela de earnings: recebe o HTML em pedaços
+# (feed) e devolve cada linha (sigla, nome, data) assim que a <tr> fecha.
+# Sigla: texto do primeiro link da linha (ou o data-rowkey "BOLSA:SIGLA");
+# nome: elemento com "description" na classe; data: <time datetime> ou a
+# primeira célula cujo texto é uma data. Guarda o link rel="next", se houver.
+class LeitorEarnings(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.linhas = []
+        self.proxima = None
+        self._linha = None
+        self._campo = None
+        self._celula = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ('a', 'link') and 'next' in (attrs.get('rel') or '').split() and attrs.get('href'):
+            self.proxima = attrs['href']
+        if tag == 'tr':
+            chave = attrs.get('data-rowkey') or attrs.get('data-symbol') or ''
+            self._linha = {'sigla': '', 'nome': '', 'data': None, 'chave': chave.rpartition(':')[2]}
+            return
+        if self._linha is None:
+            return
+        if tag == 'td':
+            self._celula = []
+        elif tag == 'time' and attrs.get('datetime'):
+            self._linha['data'] = self._linha['data'] or _ler_data(attrs['datetime'][:10])
+        elif tag == 'a' and not self._linha['sigla'] and self._campo is None:
+            self._campo = ('sigla', tag)
+        elif 'description' in (attrs.get('class') or '') and self._campo is None:
+            self._campo = ('nome', tag)
+
+    def handle_endtag(self, tag):
+        if self._linha is None:
+            return
+        if self._campo is not None and tag == self._campo[1]:
+            self._campo = None
+        elif tag == 'td' and self._celula is not None:
+            if self._linha['data'] is None:
+                self._linha['data'] = _ler_data(''.join(self._celula))
+            self._celula = None
+        elif tag == 'tr':
+            linha, self._linha = self._linha, None
+            sigla = linha['sigla'].strip() or linha['chave']
+            if sigla:
+                self.linhas.append((sigla.upper(), ' '.join(linha['nome'].split()), linha['data']))
+
+    def handle_data(self, texto):
+        if self._linha is None:
+            return
+        if self._celula is not None:
+            self._celula.append(texto)
+        if self._campo is not None:
+            self._linha[self._campo[0]] += texto
+
+    # Esvazia e devolve as linhas completas lidas até aqui
+    def retirar(self):
+        linhas, self.linhas = self.linhas, []
+        return linhas
+
+
+# Lê uma página em blocos e gera as linhas à medida que chegam. Ao final,
+# `leitor.proxima` tem o endereço absoluto da página seguinte (ou None).
+# urllib em vez do requests: a coleta roda em segundo plano durante a
+# primeira pintura da Home, e o requests (com o urllib3) leva ~0,2 s para
+# importar. Respostas 4xx/5xx levantam HTTPError.
+def ler_pagina(url, leitor):
+    with urlopen(Request(url, headers=HEADERS), timeout=TIMEOUT) as response:
+        decodificador = codecs.getincrementaldecoder(response.headers.get_content_charset() or 'utf-8')('replace')
+        while True:
+            bloco = response.read(BLOCO)
+            leitor.feed(decodificador.decode(bloco, final=not bloco))
+            yield from leitor.retirar()
+            if not bloco:
+                break
+    leitor.close()
+    yield from leitor.retirar()
+    if leitor.proxima:
+        leitor.proxima = urljoin(url, leitor.proxima)
+
+
+# Coleta as divulgações entre `inicio` e `fim` seguindo as páginas
+# seguintes. A lista vem em ordem de data: a coleta para quando uma página
+# só traz datas depois de `fim`, não traz linhas ou não tem continuação.
+# Linhas sem data (layout sem a coluna) são mantidas.
+def coletar(inicio=None, fim=None, url=URL, max_paginas=MAX_PAGINAS):
+    inicio = inicio or date.today()
+    fim = fim or inicio + JANELA
+    linhas, visitadas = [], set()
+    for _ in range(max_paginas):
+        if url is None or url in visitadas:
+            break
+        visitadas.add(url)
+        leitor = LeitorEarnings()
+        pagina = list(ler_pagina(url, leitor))
+        linhas += [l for l in pagina if l[2] is None or inicio <= l[2] <= fim]
+        datas = [l[2] for l in pagina if l[2] is not None]
+        if not pagina or (datas and min(datas) > fim):
+            break
+        url = leitor.proxima
+    return linhas, inicio, fim
+
+
+def atualizar(inicio=None, fim=None):
+    linhas, inicio, fim = coletar(inicio, fim)
+    # Uma página vazia indica mudança no layout do TradingView: mantém a tabela anterior
+    if not linhas:
+        raise ValueError("nenhuma divulgação encontrada em {}".format(URL))
+    calendario.substituir(linhas, inicio, fim)
+
+
+_atualizacao = TarefaSegundoPlano('earnings', atualizar)
+
+
+# Período que a coleta consegue cobrir: a página só lista divulgações a
+# partir de hoje. Devolve None se o período já passou.
+def _periodo_futuro(inicio=None, fim=None):
+    hoje = date.today()
+    inicio = max(inicio or hoje, hoje)
+    fim = fim or inicio + JANELA
+    return (inicio, fim) if fim >= inicio else None
+
+
+# Dispara a coleta do período em segundo plano se nenhuma coleta dentro da
+# validade o cobriu (padrão: a janela de hoje em diante)
+def _verificar_validade(inicio=None, fim=None):
+    periodo = _periodo_futuro(inicio, fim)
+    if periodo is not None and not calendario.coberto(*periodo, desde=time.time() - VALIDADE):
+        _atualizacao.disparar(*periodo)
+
+
+# Se o período pedido já foi coletado alguma vez: uma consulta vazia é então
+# um período sem divulgações, e não uma coleta ainda em andamento
+def periodo_coletado(inicio=None, fim=None):
+    periodo = _periodo_futuro(inicio, fim)
+    return periodo is None or calendario.coberto(*periodo)
+
+
+# Devolve imediatamente as divulgações da tabela local (filtros de
+# calendario.consultar) e, se o período pedido não foi coletado dentro da
+# validade, dispara a coleta dele em segundo plano. Antes da primeira coleta
+# concluída devolve uma tabela vazia.
+def obter_empresas(inicio=None, fim=None, busca=None, limite=None):
+    _verificar_validade(inicio, fim)
+    return calendario.consultar(inicio, fim, busca, limite)
+
+
+# Próxima divulgação do ticker pela tabela local, ou None se ele não
+# estiver nela (a Home então recorre ao calendário do provedor)
+def data_divulgacao(ticker):
+    _verificar_validade()
+    return calendario.proxima_data(ticker)
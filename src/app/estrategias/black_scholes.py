@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from dados import provedores
+from dados.armazenamento import HISTORICOS_EM_MEMORIA, historico_precos
+
+DIAS_UTEIS_ANO = 252
+PRAZO_MENSAL = 1 / 12  # vencimento de 30 dias, em anos
+
+# Nos primeiros pregões do histórico a janela ainda não está completa: com
+# pelo menos MINIMO_RETORNOS log-retornos usa o desvio dos que já existem
+# (janela expansível) e, antes disso, a volatilidade fixa abaixo. Nunca usa
+# pregões posteriores à data de montagem.
+MINIMO_RETORNOS = 5
+VOLATILIDADE_PADRAO = 0.30
+
+_volatilidades = OrderedDict()
+_trava = threading.Lock()
+
+
+# Função de distribuição acumulada da normal padrão.
+# Aproximação de Abramowitz & Stegun (7.1.26) para erf, erro < 1.5e-7,
+# para não depender do SciPy.
+def cdf_normal(x):
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    polinomio = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - polinomio * np.exp(-z * z)
+    return 0.5 * (1 + np.sign(x) * erf)
+
+
+def _d1_d2(preco, strike, prazo, taxa, volatilidade):
+    desvio = volatilidade * np.sqrt(prazo)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (np.log(preco / strike) + (taxa + volatilidade ** 2 / 2) * prazo) / desvio
+    return d1, d1 - desvio
+
+
+# Prêmios de Black-Scholes (opções europeias, sem dividendos).
+# Todos os argumentos aceitam arrays; `taxa` e `volatilidade` são anuais
+# em forma decimal (0.10 = 10% a.a.). Com volatilidade zero o prêmio é o
+# valor intrínseco descontado.
+def preco_call(preco, strike, prazo, taxa, volatilidade):
+    preco, strike, volatilidade = np.broadcast_arrays(
+        np.asarray(preco, dtype=float), np.asarray(strike, dtype=float), np.asarray(volatilidade, dtype=float))
+    desconto = np.exp(-taxa * prazo)
+    d1, d2 = _d1_d2(preco, strike, prazo, taxa, volatilidade)
+    premio = preco * cdf_normal(d1) - strike * desconto * cdf_normal(d2)
+    intrinseco = np.maximum(preco - strike * desconto, 0)
+    return np.where(volatilidade * np.sqrt(prazo) > 0, premio, intrinseco)
+
+
+def preco_put(preco, strike, prazo, taxa, volatilidade):
+    # Paridade put-call
+    desconto = np.exp(-taxa * prazo)
+    return preco_call(preco, strike, prazo, taxa, volatilidade) - preco + strike * desconto
+
+
+# Volatilidade realizada anualizada: desvio padrão móvel dos log-retornos
+# diários. Com `minimo`, a janela incompleta do início usa os retornos que
+# já existem em vez de ficar vazia.
+def volatilidade_historica(close, janela=21, minimo=None):
+    log_retornos = np.log(close).diff()
+    return log_retornos.rolling(window=janela, min_periods=minimo).std() * np.sqrt(DIAS_UTEIS_ANO)
+
+
+# Impressão digital barata do histórico: muda com novos pregões e com uma
+# nova base de ajuste (o histórico inteiro baixado de novo muda o primeiro
+# fechamento), sem percorrer a série
+def _versao(close):
+    return len(close), close.index[-1], close.iloc[0], close.iloc[-1]
+
+
+# Série de volatilidade do ticker a partir do histórico completo já baixado.
+# Fica em cache por (provedor, ticker, janela), limitado como os históricos
+# em memória, e é recalculada quando o histórico muda.
+def volatilidade_ticker(ticker, janela=21):
+    close = historico_precos(ticker, 'max')['Close']
+    chave = (provedores.obter_provedor().nome, ticker.upper(), janela)
+    versao = _versao(close)
+    with _trava:
+        em_cache = _volatilidades.get(chave)
+        if em_cache is not None and em_cache[0] == versao:
+            _volatilidades.move_to_end(chave)
+            return em_cache[1]
+
+    volatilidade = volatilidade_historica(close, janela, min(MINIMO_RETORNOS, janela)).fillna(VOLATILIDADE_PADRAO)
+    with _trava:
+        _volatilidades[chave] = (versao, volatilidade)
+        while len(_volatilidades) > HISTORICOS_EM_MEMORIA:
+            _volatilidades.popitem(last=False)
+    return volatilidade
+
+
+# Volatilidade vigente em cada data de montagem (último valor até a data)
+def volatilidade_nas_datas(volatilidade, datas):
+    return volatilidade.reindex(volatilidade.index.union(datas)).ffill().reindex(datas).to_numpy()
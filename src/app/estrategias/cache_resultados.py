@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dados.armazenamento import DIRETORIO_CACHE
+
+# Limites do cache, configuráveis por variáveis de ambiente. O disco só é
+# usado se SIMULADOR_RESULTADOS_DISCO_MB for maior que zero.
+MAX_ITENS = int(os.environ.get('SIMULADOR_RESULTADOS_ITENS', 256))
+MAX_BYTES = int(float(os.environ.get('SIMULADOR_RESULTADOS_MB', 256)) * 2 ** 20)
+MAX_BYTES_DISCO = int(float(os.environ.get('SIMULADOR_RESULTADOS_DISCO_MB', 0)) * 2 ** 20)
+DIRETORIO_RESULTADOS = DIRETORIO_CACHE / 'resultados'
+
+log = logging.getLogger(__name__)
+
+
+# Impressão digital dos dados de entrada: muda sempre que o histórico muda
+def versao_dados(dados):
+    if dados is None:
+        return None
+    if isinstance(dados, (list, tuple)):
+        return tuple(versao_dados(d) for d in dados)
+    if isinstance(dados, (pd.DataFrame, pd.Series)):
+        valores = pd.util.hash_pandas_object(dados, index=True).to_numpy()
+    else:
+        valores = np.ascontiguousarray(dados)
+    return hashlib.sha1(valores.tobytes()).hexdigest()
+
+
+def chave_resultado(estrategia, tickers=(), dados=None, parametros=None):
+    parametros = sorted((parametros or {}).items())
+    texto = repr((estrategia, tuple(t.upper() for t in tickers), versao_dados(dados), parametros))
+    return hashlib.sha1(texto.encode()).hexdigest()
+
+
+# Cache LRU de resultados das simulações, compartilhado por todas as sessões
+# do processo. Os resultados ficam serializados (pickle), o que dá o tamanho
+# exato para o limite de bytes e devolve uma cópia nova a cada acerto, que a
+# página pode alterar à vontade. Itens despejados da memória vão para o
+# disco quando há orçamento de disco. Só são lidos de volta os arquivos
+# gravados por este processo e com o mesmo SHA-256 da gravação: o pickle de
+# um arquivo qualquer do diretório compartilhado executaria código.
+class CacheResultados:
+    def __init__(self, max_itens=MAX_ITENS, max_bytes=MAX_BYTES, max_bytes_disco=MAX_BYTES_DISCO,
+                 diretorio=DIRETORIO_RESULTADOS):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self.max_bytes_disco = max_bytes_disco
+        self.diretorio = diretorio
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._disco = OrderedDict()
+        self._bytes_disco = 0
+        self._trava = threading.Lock()
+        self.contadores = {'acertos': 0, 'acertos_disco': 0, 'faltas': 0, 'despejos': 0}
+
+    def _arquivo(self, chave):
+        return self.diretorio / '{}.pkl'.format(chave)
+
+    def _inserir(self, chave, conteudo):
+        despejados = []
+        with self._trava:
+            if chave in self._itens:
+                self._bytes -= len(self._itens.pop(chave))
+            self._itens[chave] = conteudo
+            self._bytes += len(conteudo)
+            while self._itens and (len(self._itens) > self.max_itens or self._bytes > self.max_bytes):
+                antiga, removido = self._itens.popitem(last=False)
+                self._bytes -= len(removido)
+                self.contadores['despejos'] += 1
+                despejados.append((antiga, removido))
+        for antiga, removido in despejados:
+            self._gravar_disco(antiga, removido)
+
+    def _gravar_disco(self, chave, conteudo):
+        if self.max_bytes_disco <= 0 or len(conteudo) > self.max_bytes_disco:
+            return
+        try:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            arquivo = self._arquivo(chave)
+            temporario = arquivo.with_suffix('.pkl.tmp{}'.format(threading.get_ident()))
+            temporario.write_bytes(conteudo)
+            os.replace(temporario, arquivo)
+        except OSError as e:
+            log.warning('Erro ao gravar resultado em disco: %s', e)
+            return
+
+        # Mantém os arquivos deste processo dentro do orçamento, apagando os
+        # mais antigos
+        antigos = []
+        with self._trava:
+            if chave in self._disco:
+                self._bytes_disco -= self._disco.pop(chave)[0]
+            self._disco[chave] = (len(conteudo), hashlib.sha256(conteudo).digest())
+            self._bytes_disco += len(conteudo)
+            while self._bytes_disco > self.max_bytes_disco:
+                antiga, (tamanho, _) = self._disco.popitem(last=False)
+                self._bytes_disco -= tamanho
+                antigos.append(antiga)
+        for antiga in antigos:
+            self._arquivo(antiga).unlink(missing_ok=True)
+
+    def _ler_disco(self, chave):
+        with self._trava:
+            gravado = self._disco.get(chave)
+        if gravado is None:
+            return None
+        try:
+            conteudo = self._arquivo(chave).read_bytes()
+        except OSError:
+            return None
+        return conteudo if hashlib.sha256(conteudo).digest() == gravado[1] else None
+
+    # Devolve o resultado de `calcular()` (função sem argumentos), calculando
+    # apenas na primeira vez para a mesma estratégia, tickers, dados e parâmetros
+    def obter(self, estrategia, calcular, tickers=(), dados=None, parametros=None):
+        chave = chave_resultado(estrategia, tickers, dados, parametros)
+        with self._trava:
+            conteudo = self._itens.get(chave)
+            if conteudo is not None:
+                self._itens.move_to_end(chave)
+                self.contadores['acertos'] += 1
+        if conteudo is None:
+            conteudo = self._ler_disco(chave)
+            if conteudo is not None:
+                with self._trava:
+                    self.contadores['acertos_disco'] += 1
+                self._inserir(chave, conteudo)
+        if conteudo is not None:
+            return pickle.loads(conteudo)
+
+        with self._trava:
+            self.contadores['faltas'] += 1
+        resultado = calcular()
+        conteudo = pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(conteudo) <= self.max_bytes:
+            self._inserir(chave, conteudo)
+        return resultado
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = sum(self.contadores[c] for c in ('acertos', 'acertos_disco', 'faltas'))
+            return {
+                **self.contadores,
+                'taxa_acerto': (self.contadores['acertos'] + self.contadores['acertos_disco']) / consultas if consultas else 0.0,
+                'itens': len(self._itens),
+                'bytes': self._bytes,
+            }
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+            self._bytes = 0
+
+
+CACHE = CacheResultados()
+
+
+def obter_resultado(estrategia, calcular, tickers=(), dados=None, parametros=None):
+    return CACHE.obter(estrategia, calcular, tickers, dados, parametros)
@@ -0,0 +1,292 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+COMPRA = 1
+VENDA = -1
+
+# Nomes das operações, na ordem dos códigos gravados em OPERACAO['operacao']
+OPERACOES = ['Compra', 'Venda', 'Venda Final']
+TIPO_OPERACOES = pd.CategoricalDtype(OPERACOES)
+
+# Uma linha por operação, em arrays pré-alocados em vez de tuplas
+OPERACAO = np.dtype([('indice', np.int64), ('operacao', np.int8), ('preco', np.float64),
+                     ('quantidade', np.float64), ('capital', np.float64)])
+
+
+# Detecta os cruzamentos entre as médias em uma única passada.
+# Devolve os índices das operações e o tipo de cada uma (COMPRA/VENDA),
+# já alternados: compras só quando zerado, vendas só quando comprado.
+def sinais_cruzamento(mm_curta, mm_longa):
+    diferenca = np.asarray(mm_curta, dtype=float) - np.asarray(mm_longa, dtype=float)
+    anterior, atual = diferenca[:-1], diferenca[1:]
+
+    tipos = np.zeros(len(atual), dtype=np.int8)
+    tipos[(atual > 0) & (anterior <= 0)] = COMPRA
+    tipos[(atual < 0) & (anterior >= 0)] = VENDA
+
+    indices = np.flatnonzero(tipos) + 1
+    tipos = tipos[indices - 1]
+
+    # Após qualquer cruzamento o estado passa a ser o do próprio cruzamento,
+    # então só executa quem muda o estado anterior (inicialmente zerado)
+    executa = tipos != np.concatenate(([VENDA], tipos[:-1]))
+    return indices[executa], tipos[executa]
+
+
+# Calcula quantidade e capital somente nos índices das operações. O capital
+# de cada operação depende da anterior, então só esse laço é sequencial;
+# índices, preços e tipos já vêm como arrays. Devolve um array estruturado
+# OPERACAO (índice, operação, preço, quantidade, capital) e o capital final.
+def executar_operacoes(precos, indices, tipos, capital_inicial):
+    precos = np.asarray(precos, dtype=float)
+    final = len(tipos) > 0 and tipos[-1] == COMPRA
+    operacoes = np.empty(len(indices) + final, dtype=OPERACAO)
+    operacoes['indice'][:len(indices)] = indices
+    operacoes['operacao'][:len(indices)] = np.where(np.asarray(tipos) == COMPRA, 0, 1)
+    if final:
+        operacoes[-1]['indice'] = len(precos) - 1
+        operacoes[-1]['operacao'] = 2
+    operacoes['preco'] = precos[operacoes['indice']]
+
+    capital = capital_inicial
+    qtd_acoes = 0
+    quantidades = operacoes['quantidade']
+    capitais = operacoes['capital']
+    for j, (preco, compra) in enumerate(zip(operacoes['preco'].tolist(), (operacoes['operacao'] == 0).tolist())):
+        if compra:
+            qtd_acoes = capital // preco
+            capital -= qtd_acoes * preco
+        else:
+            capital += qtd_acoes * preco
+        quantidades[j] = qtd_acoes
+        capitais[j] = capital
+        if not compra:
+            qtd_acoes = 0
+
+    return operacoes, capital
+
+
+# Histórico de operações como DataFrame colunar (a operação é categórica;
+# os códigos já vêm válidos de executar_operacoes)
+def tabela_operacoes(operacoes, datas):
+    return pd.DataFrame({
+        'Data': datas[operacoes['indice']],
+        'Operação': pd.Categorical.from_codes(operacoes['operacao'], dtype=TIPO_OPERACOES, validate=False),
+        'Preço': operacoes['preco'],
+        'Quantidade de Ações': operacoes['quantidade'],
+        'Capital Atual': operacoes['capital'],
+    })
+
+
+# Estratégia de cruzamento de médias móveis sobre um DataFrame com 'Close'.
+# Devolve um novo DataFrame com as médias (só os pregões em que as duas
+# estão definidas), o histórico de operações (DataFrame com data, operação,
+# preço, quantidade e capital) e o capital final. O DataFrame recebido não
+# é alterado.
+#
+# Todo o cálculo é feito em arrays: o pandas só entra nas médias móveis e
+# na montagem das duas tabelas de saída, cada uma construída de uma vez a
+# partir das colunas (inserir colunas e chamar dropna no DataFrame custava
+# mais que a estratégia inteira).
+def estrategia_cruzamento(df, capital_inicial, curta=20, longa=50):
+    precos = df['Close'].to_numpy(dtype=float)
+    medias = _medias_moveis(precos, (curta, longa))
+    linhas = np.flatnonzero(~(np.isnan(medias[curta]) | np.isnan(medias[longa])))
+    # Sem lacunas (o caso comum), os pregões válidos são um trecho contínuo
+    if len(linhas) and linhas[-1] - linhas[0] + 1 == len(linhas):
+        linhas = slice(linhas[0], linhas[-1] + 1)
+
+    indices, tipos = sinais_cruzamento(medias[curta][linhas], medias[longa][linhas])
+    operacoes, capital = executar_operacoes(precos[linhas], indices, tipos, capital_inicial)
+
+    colunas = {coluna: df[coluna].to_numpy()[linhas] for coluna in df.columns}
+    colunas['MM{}'.format(curta)] = medias[curta][linhas]
+    colunas['MM{}'.format(longa)] = medias[longa][linhas]
+    datas = df.index[linhas]
+    return pd.DataFrame(colunas, index=datas, copy=False), tabela_operacoes(operacoes, datas), capital
+
+
+def _medias_moveis(precos, janelas):
+    serie = pd.Series(precos)
+    return {janela: serie.rolling(window=janela).mean().to_numpy() for janela in janelas}
+
+
+# Capital final de cada par (curta, longa) de um bloco de janelas curtas.
+# Executada nos processos da varredura: cada bloco calcula as médias
+# longas uma única vez e recebe apenas o array de preços.
+def _capitais_bloco(precos, curtas, longas, capital_inicial):
+    medias = _medias_moveis(precos, set(curtas) | set(longas))
+    capitais = np.full((len(curtas), len(longas)), np.nan)
+
+    for i, curta in enumerate(curtas):
+        for j, longa in enumerate(longas):
+            if longa <= curta or longa > len(precos):
+                continue
+            inicio = longa - 1  # primeiro dia com as duas médias definidas
+            indices, tipos = sinais_cruzamento(medias[curta][inicio:], medias[longa][inicio:])
+            _, capitais[i, j] = executar_operacoes(precos[inicio:], indices, tipos, capital_inicial)
+
+    return capitais
+
+
+# Avalia todos os pares (curta, longa) com curta < longa sobre a mesma série
+# de preços, distribuindo blocos de janelas curtas entre processos.
+# Devolve um DataFrame de capital final (linhas: curta, colunas: longa).
+def varrer_janelas(precos, capital_inicial, curtas, longas, processos=None):
+    precos = np.asarray(precos, dtype=float)
+    curtas = list(curtas)
+    longas = list(longas)
+    processos = processos or os.cpu_count() or 1
+
+    # Intercala as janelas curtas para equilibrar a carga (curtas menores
+    # têm mais janelas longas válidas)
+    blocos = [curtas[k::processos] for k in range(processos) if curtas[k::processos]]
+    with ProcessPoolExecutor(max_workers=len(blocos)) as executor:
+        resultados = executor.map(
+            _capitais_bloco,
+            repeat(precos), blocos, repeat(longas), repeat(capital_inicial),
+        )
+        capitais = np.vstack(list(resultados))
+
+    resultado = pd.DataFrame(capitais, index=[c for bloco in blocos for c in bloco], columns=longas)
+    resultado = resultado.loc[curtas]
+    resultado.index.name = 'Curta'
+    resultado.columns.name = 'Longa'
+    return resultado
+
+
+# Resultado do cruzamento sobre uma série de preços: capital final, número
+# de operações e taxa de acerto (vendas com capital maior que o da compra).
+# Com `com_operacoes`, devolve também as operações (array OPERACAO), com os
+# índices na série original.
+def resumo_cruzamento(precos, capital_inicial, curta=20, longa=50, com_operacoes=False):
+    precos = np.asarray(precos, dtype=float)
+    validos = np.flatnonzero(~np.isnan(precos))
+    precos = precos[validos]
+    if len(precos) <= longa:
+        resumo = (np.nan, 0, np.nan)
+        return (resumo, np.empty(0, dtype=OPERACAO)) if com_operacoes else resumo
+    medias = _medias_moveis(precos, (curta, longa))
+    inicio = longa - 1  # primeiro dia com as duas médias definidas
+    indices, tipos = sinais_cruzamento(medias[curta][inicio:], medias[longa][inicio:])
+    operacoes, capital = executar_operacoes(precos[inicio:], indices, tipos, capital_inicial)
+
+    capitais = np.concatenate(([capital_inicial], operacoes['capital'][operacoes['operacao'] != 0]))
+    acertos = np.diff(capitais) > 0
+    resumo = (capital, len(operacoes), acertos.mean() * 100 if len(acertos) else np.nan)
+    if com_operacoes:
+        operacoes['indice'] = validos[operacoes['indice'] + inicio]
+        return resumo, operacoes
+    return resumo
+
+
+def _resumos_bloco(series, capital_inicial, curta, longa, com_operacoes=False):
+    return [resumo_cruzamento(precos, capital_inicial, curta, longa, com_operacoes) for precos in series]
+
+
+# Roda o cruzamento em cada ticker de um universo ({ticker: preços}),
+# distribuindo os tickers entre processos. Devolve o ranking pelo retorno;
+# tickers com menos pregões que a média longa ficam de fora. Com `registro`
+# (RegistroOperacoes), as operações de todos os tickers são acrescentadas a
+# ele; nesse caso os preços devem ser Series com as datas no índice.
+def varrer_universo(precos, capital_inicial, curta=20, longa=50, processos=None, registro=None):
+    tickers = list(precos)
+    series = [np.asarray(precos[t], dtype=float) for t in tickers]
+    com_operacoes = registro is not None
+    # Cada ticker leva cerca de 1 ms: abrir processos só compensa em universos grandes
+    processos = min(processos or os.cpu_count() or 1, max(len(tickers) // 500, 1))
+
+    if processos == 1:
+        resumos = _resumos_bloco(series, capital_inicial, curta, longa, com_operacoes)
+    else:
+        # Blocos intercalados, como na varredura de janelas, e reordenados no fim
+        blocos = [list(range(k, len(tickers), processos)) for k in range(processos)]
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            resultados = executor.map(
+                _resumos_bloco,
+                ([series[i] for i in bloco] for bloco in blocos),
+                repeat(capital_inicial), repeat(curta), repeat(longa), repeat(com_operacoes),
+            )
+            resumos = [None] * len(tickers)
+            for bloco, resumo in zip(blocos, resultados):
+                for i, linha in zip(bloco, resumo):
+                    resumos[i] = linha
+
+    if com_operacoes:
+        for ticker, (_, operacoes) in zip(tickers, resumos):
+            registro.adicionar(execucao=0, ativo=ticker, data=precos[ticker].index[operacoes['indice']],
+                               operacao=pd.Categorical.from_codes(operacoes['operacao'], dtype=TIPO_OPERACOES),
+                               preco=operacoes['preco'], quantidade=operacoes['quantidade'],
+                               capital=operacoes['capital'])
+        resumos = [resumo for resumo, _ in resumos]
+
+    ranking = pd.DataFrame(resumos, index=pd.Index(tickers, name='Ticker'),
+                           columns=['Capital Final', 'Operações', 'Taxa de Acerto (%)'])
+    ranking.insert(1, 'Retorno (%)', (ranking['Capital Final'] / capital_inicial - 1) * 100)
+    return ranking.dropna(subset=['Capital Final']).sort_values('Retorno (%)', ascending=False)
+
+
+# Capital ao fim de cada pregão (caixa + ações a preço de fechamento), a
+# partir das operações devolvidas por executar_operacoes
+def _patrimonio(precos, operacoes, capital_inicial):
+    if not len(operacoes):
+        return np.full(len(precos), float(capital_inicial))
+    indices = operacoes['indice']
+    caixa = operacoes['capital']
+    quantidades = np.where(operacoes['operacao'] == 0, operacoes['quantidade'], 0)
+
+    ultima = np.searchsorted(indices, np.arange(len(precos)), side='right') - 1
+    antes = ultima < 0
+    ultima[antes] = 0
+    return np.where(antes, capital_inicial, caixa[ultima] + quantidades[ultima] * precos)
+
+
+# Maior queda percentual do patrimônio em relação ao pico anterior
+def drawdown_maximo(patrimonio):
+    picos = np.maximum.accumulate(patrimonio)
+    return float(np.max(1 - patrimonio / picos)) * 100
+
+
+# Backtest com início móvel: roda o cruzamento a partir de cada data de
+# início (primeiro pregão de cada mês ou a cada `passo` pregões) até o fim
+# da série. As médias são calculadas uma única vez sobre a série inteira, então
+# cada início já opera com as médias definidas, sem período de aquecimento.
+# Devolve um DataFrame indexado pela data de início com o capital final, o
+# retorno, o drawdown máximo e o número de operações.
+def inicios_moveis(close, capital_inicial, curta=20, longa=50, passo=None, minimo_pregoes=21):
+    precos = close.to_numpy(dtype=float)
+    medias = _medias_moveis(precos, (curta, longa))
+    primeiro = longa - 1  # primeiro pregão com as duas médias definidas
+    ultimo = len(precos) - minimo_pregoes
+
+    if passo:
+        inicios = np.arange(primeiro, ultimo + 1, passo)
+    else:
+        meses = np.asarray(close.index.year * 12 + close.index.month)
+        inicios = np.flatnonzero(np.concatenate(([True], meses[1:] != meses[:-1])))
+        inicios = inicios[(inicios >= primeiro) & (inicios <= ultimo)]
+
+    linhas = []
+    for inicio in inicios:
+        trecho = precos[inicio:]
+        indices, tipos = sinais_cruzamento(medias[curta][inicio:], medias[longa][inicio:])
+        operacoes, capital = executar_operacoes(trecho, indices, tipos, capital_inicial)
+        linhas.append((capital, (capital / capital_inicial - 1) * 100,
+                       drawdown_maximo(_patrimonio(trecho, operacoes, capital_inicial)), len(operacoes)))
+
+    resultado = pd.DataFrame(linhas, index=close.index[inicios],
+                             columns=['Capital Final', 'Retorno (%)', 'Drawdown Máximo (%)', 'Operações'])
+    resultado.index.name = 'Início'
+    return resultado
+
+
+# Melhores pares de uma varredura, ordenados pelo capital final
+def melhores_pares(resultado, capital_inicial, n=10):
+    pares = resultado.stack().dropna().sort_values(ascending=False).head(n)
+    pares = pares.rename('Capital Final').reset_index()
+    pares['Retorno (%)'] = (pares['Capital Final'] / capital_inicial - 1) * 100
+    return pares
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+
+# Seleciona os k ativos de maior retorno acumulado em cada data de decisão.
+# O retorno da janela que termina no mês anterior à decisão é uma diferença
+# O(1) dos log-preços acumulados, calculados uma única vez.
+# `janela` é o número de fechamentos mensais da janela (2 = último mês).
+# Devolve uma matriz (decisões x k) com as colunas escolhidas, em ordem
+# decrescente de retorno. Ativos sem preço na janela nunca são escolhidos:
+# se menos de k ativos têm preço, as posições que sobram ficam com -1.
+def ranquear_momentum(log_precos, decisoes, janela, k):
+    retornos = log_precos[decisoes - 1] - log_precos[decisoes - janela]
+    retornos = np.where(np.isnan(retornos), -np.inf, retornos)
+
+    k = min(k, retornos.shape[1])
+    escolhidos = np.argpartition(-retornos, k - 1, axis=1)[:, :k]
+    ordem = np.argsort(-np.take_along_axis(retornos, escolhidos, axis=1), axis=1, kind='stable')
+    escolhidos = np.take_along_axis(escolhidos, ordem, axis=1)
+    return np.where(np.isfinite(np.take_along_axis(retornos, escolhidos, axis=1)), escolhidos, -1)
+
+
+# Estratégia de momentum: a cada `manutencao` meses divide o capital entre
+# os k ativos de melhor retorno na janela, vendendo após `manutencao` meses.
+# Se menos de k ativos têm preço na janela, o capital é dividido entre eles.
+# Devolve o histórico de alocações e a recomendação mais recente
+# (data, lista de tickers) para o mês que ainda não pode ser simulado.
+def simular_momentum(df, capital_inicial, k=2, janela=2, manutencao=1):
+    precos = df.to_numpy(dtype=float)
+    ativos = np.asarray(df.columns)
+    n = len(df)
+    if n <= janela:
+        return pd.DataFrame(), None
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_precos = np.log(df.ffill().to_numpy(dtype=float))
+
+    ultima = ranquear_momentum(log_precos, np.array([n - 1]), janela, k)[0]
+    recomendacao = (df.index[-1], ativos[ultima[ultima >= 0]].tolist())
+
+    decisoes = np.arange(janela, n - manutencao, manutencao)
+    if len(decisoes) == 0:
+        return pd.DataFrame(), recomendacao
+
+    escolhidos = ranquear_momentum(log_precos, decisoes, janela, k)
+    validos = escolhidos >= 0
+    por_decisao = validos.sum(axis=1)
+    linhas = np.repeat(decisoes, por_decisao)
+    colunas = escolhidos[validos]
+
+    alocacao = capital_inicial / np.repeat(por_decisao, por_decisao)
+    preco_compra = precos[linhas, colunas]
+    preco_venda = precos[linhas + manutencao, colunas]
+    qtd = alocacao // preco_compra
+    restante = alocacao - (qtd * preco_compra)
+    saldo_venda = qtd * preco_venda
+    saldo_final = restante + saldo_venda
+
+    df_historico = pd.DataFrame({
+        'Data': df.index[linhas],
+        'Ativo': ativos[colunas],
+        'Alocação': np.round(alocacao, 2),
+        'Preço Compra': np.round(preco_compra, 2),
+        'Investimento Real': np.round(qtd * preco_compra, 2),
+        'Qtd': qtd,
+        'Restante Alocação': np.round(restante, 2),
+        'Preço Venda': np.round(preco_venda, 2),
+        'Saldo Venda': np.round(saldo_venda, 2),
+        'Rendimento (em %)': np.round((preco_venda - preco_compra)/preco_compra * 100, 2),
+        'Saldo Final': np.round(saldo_final, 2),
+    })
+    return df_historico, recomendacao
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+# Prêmios percentuais padrão: valores iniciais dos sliders das páginas 4 e 5
+# e padrão dos simuladores de rolagem e do processamento em lote
+PREMIO_PUT_PADRAO = 2
+PREMIO_ITM_PADRAO = 8
+PREMIO_OTM_PADRAO = 3
+
+
+# Simulação da estratégia Protective Put sobre fechamentos mensais.
+# Compra ações e puts no mês i e vende no fechamento do mês i+1;
+# os dois últimos meses ficam de fora, como na versão original.
+# `premio` (por ação, ex.: Black-Scholes) substitui o prêmio percentual.
+def protective_put(df, aporte_mensal, moeda, strike_pct, premio_pct=None, premio=None):
+    close = df['Close'].to_numpy(dtype=float)
+    venda = np.append(close[1:], np.nan)
+
+    df['Strike'] = df['Close'] * (100 - strike_pct)/100
+    df['Premio'] = df['Close'] * (premio_pct)/100 if premio is None else premio
+    df['Qtd_Acoes'] = aporte_mensal // df['Close']
+    df['Custo_Acoes'] = df['Qtd_Acoes'] * df['Close']
+    df['Custo_Put'] = df['Qtd_Acoes'] * df['Premio']
+    df['Custo_Total'] = df['Custo_Acoes'] + df['Custo_Put']
+    df['Preço de Venda ({})'.format(moeda)] = np.round(venda, 2)
+
+    # Se ação caiu abaixo do strike, put gera lucro
+    qtd = df['Qtd_Acoes'].to_numpy()
+    lucro_put = np.maximum(0, df['Strike'].to_numpy() - venda) * qtd
+    valor_acoes = venda * qtd
+
+    df = df.iloc[:-2].copy()
+    df['Valor_Final'] = (valor_acoes + lucro_put)[:len(df)]
+    df['Lucro_Liquido'] = df['Valor_Final'] - df['Custo_Total']
+
+    return df
+
+
+# Cálculos
+# Strike Venda - OTM - Superior
+# Strike Compra - ITM - Inferior
+# Definindo strikes superiores e inferiores da Bull Call Spread
+# strike_compra = preco_compra * 0.95 # ITM - 5% a menos
+# strike_venda = preco_compra * 1.05  # OTM - 5% a mais
+# `premios` (ITM, OTM por ação, ex.: Black-Scholes) substitui os prêmios percentuais.
+def simular_bull_call(df, aporte_mensal, moeda, strike_venda_pct, strike_compra_pct,
+                      premio_itm_pct=None, premio_otm_pct=None, premios=None):
+    close = df['Close'].to_numpy(dtype=float)
+    venda = np.append(close[1:], np.nan)
+
+    df['Strike_OTM'] = df['Close'] * ((100 + strike_venda_pct)/100)
+    df['Strike_ITM'] = df['Close'] * ((100 - strike_compra_pct)/100)
+    df['Spread'] = df['Strike_OTM'] - df['Strike_ITM']
+    if premios is None:
+        df['Premio_ITM'] = df['Strike_ITM'] * (premio_itm_pct)/100
+        df['Premio_OTM'] = df['Strike_OTM'] * (premio_otm_pct)/100
+    else:
+        df['Premio_ITM'], df['Premio_OTM'] = premios
+    df['Custo_Estrategia'] = (df['Premio_ITM'] - df['Premio_OTM'])
+    df['Qtd_Contratos'] = aporte_mensal // (df['Custo_Estrategia'] * 100)
+    df['Custo_Total'] = df['Qtd_Contratos'] * df['Custo_Estrategia'] * 100
+    df['Preco_Venda'] = np.round(venda, 2)
+
+    # Ganho limitado ao spread acima do strike OTM e zero abaixo do strike ITM
+    ganho = np.clip(venda - df['Strike_ITM'].to_numpy(), 0, df['Spread'].to_numpy())
+    df['Lucro_Bruto'] = ganho * 100 * df['Qtd_Contratos'].to_numpy()
+    df['Lucro_Liquido'] = df['Lucro_Bruto'] - df['Custo_Total']
+
+    df = df.iloc[:-2].copy()
+
+    return df
+
+
+# Meses operados: compra no mês i e venda no mês i+1, sem os dois últimos
+def _compra_venda(close):
+    close = np.asarray(close, dtype=float)
+    return close[:-2], close[1:-1]
+
+
+# Avalia todas as combinações strike% x prêmio% da Protective Put em uma
+# única chamada. Devolve uma linha por combinação com os totais do período.
+def grade_protective_put(close, aporte_mensal, strikes_pct, premios_pct):
+    compra, venda = _compra_venda(close)
+    strike_pct = np.asarray(strikes_pct, dtype=float)[:, None, None]
+    premio_pct = np.asarray(premios_pct, dtype=float)[None, :, None]
+
+    qtd = aporte_mensal // compra
+    custo_total = qtd * compra + qtd * (compra * premio_pct / 100)
+    strike = compra * (100 - strike_pct) / 100
+    valor_final = venda * qtd + np.maximum(0, strike - venda) * qtd
+    custo_total, valor_final = np.broadcast_arrays(custo_total, valor_final)
+
+    return _tabela_grade(
+        {'Strike (%)': strike_pct, 'Prêmio (%)': premio_pct},
+        custo_total.sum(axis=-1), valor_final.sum(axis=-1),
+    )
+
+
+# Avalia todas as combinações dos quatro parâmetros da Bull Call Spread
+# (strike de venda, strike de compra, prêmio ITM, prêmio OTM) em uma chamada.
+# Combinações com custo da estratégia <= 0 não são operáveis e ficam NaN.
+def grade_bull_call(close, aporte_mensal, strikes_venda_pct, strikes_compra_pct,
+                    premios_itm_pct, premios_otm_pct):
+    compra, venda = _compra_venda(close)
+    forma = lambda valores, eixo: np.asarray(valores, dtype=float).reshape(
+        [-1 if i == eixo else 1 for i in range(5)])
+    strike_venda_pct = forma(strikes_venda_pct, 0)
+    strike_compra_pct = forma(strikes_compra_pct, 1)
+    premio_itm_pct = forma(premios_itm_pct, 2)
+    premio_otm_pct = forma(premios_otm_pct, 3)
+
+    strike_otm = compra * ((100 + strike_venda_pct) / 100)
+    strike_itm = compra * ((100 - strike_compra_pct) / 100)
+    custo = strike_itm * premio_itm_pct / 100 - strike_otm * premio_otm_pct / 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        qtd = np.where(custo > 0, aporte_mensal // (custo * 100), np.nan)
+    custo_total = qtd * custo * 100
+    ganho = np.clip(venda - strike_itm, 0, strike_otm - strike_itm)
+    lucro_bruto = ganho * 100 * qtd
+
+    return _tabela_grade(
+        {
+            'Strike Venda (%)': strike_venda_pct,
+            'Strike Compra (%)': strike_compra_pct,
+            'Prêmio ITM (%)': premio_itm_pct,
+            'Prêmio OTM (%)': premio_otm_pct,
+        },
+        custo_total.sum(axis=-1), lucro_bruto.sum(axis=-1),
+    )
+
+
+def _tabela_grade(parametros, custo_total, valor_final):
+    forma = custo_total.shape
+    colunas = {
+        nome: np.broadcast_to(valores[..., 0], forma).ravel()
+        for nome, valores in parametros.items()
+    }
+    custo_total = custo_total.ravel()
+    valor_final = valor_final.ravel()
+    lucro = valor_final - custo_total
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rentabilidade = np.where(custo_total != 0, lucro / custo_total * 100, 0)
+
+    return pd.DataFrame({
+        **colunas,
+        'Custo Total': custo_total,
+        'Valor Final': valor_final,
+        'Lucro Líquido': lucro,
+        'Rentabilidade (%)': rentabilidade,
+    })
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+
+def taxa_mensal(taxa_anual):
+    return (1 + np.asarray(taxa_anual, dtype=float) / 100) ** (1 / 12) - 1
+
+
+# Saldo após `meses` meses de juros compostos com aportes mensais no fim
+# de cada mês (fórmula fechada da anuidade). Aceita arrays em qualquer
+# argumento e devolve o resultado com broadcasting do NumPy.
+def saldo_passivo(inicial, mensal, meses, taxa_anual):
+    r = taxa_mensal(taxa_anual)
+    meses = np.asarray(meses)
+    fator = (1 + r) ** meses
+    # Com taxa zero a anuidade degenera no número de meses
+    anuidade = np.where(r == 0, meses, (fator - 1) / np.where(r == 0, 1, r))
+    return inicial * fator + mensal * anuidade
+
+
+# Evolução mês a mês do saldo (mês 0 = aporte inicial)
+def simular_passivo(inicial, mensal, anos, taxa):
+    meses = np.arange(anos * 12 + 1)
+    return np.round(saldo_passivo(inicial, mensal, meses, taxa), 2)
+
+
+# Avalia toda a grade (taxa x anos x aporte mensal) em uma única chamada.
+# Devolve um DataFrame com uma linha por cenário.
+def grade_passivo(inicial, taxas, anos, mensais):
+    taxa, ano, mensal = np.meshgrid(
+        np.asarray(taxas, dtype=float), np.asarray(anos), np.asarray(mensais, dtype=float),
+        indexing='ij',
+    )
+    saldo = saldo_passivo(inicial, mensal, ano * 12, taxa)
+    investido = inicial + mensal * ano * 12
+
+    return pd.DataFrame({
+        'Taxa Anual (%)': taxa.ravel(),
+        'Anos': ano.ravel(),
+        'Aporte Mensal': mensal.ravel(),
+        'Total Investido': investido.ravel(),
+        'Saldo Final': saldo.ravel(),
+        'Ganho': (saldo - investido).ravel(),
+    })
+
+
+# Sorteadores de retornos mensais para o Monte Carlo: recebem o gerador
+# aleatório e o formato (caminhos, meses) e devolvem a matriz de retornos.
+def retornos_normais(taxa_anual, volatilidade_anual):
+    media = taxa_mensal(taxa_anual)
+    desvio = volatilidade_anual / 100 / np.sqrt(12)
+    return lambda rng, formato: rng.normal(media, desvio, formato)
+
+
+def retornos_lognormais(taxa_anual, volatilidade_anual):
+    desvio = volatilidade_anual / 100 / np.sqrt(12)
+    # Ajusta a média do log para que E[1 + r] = 1 + taxa mensal
+    media = np.log1p(taxa_mensal(taxa_anual)) - desvio ** 2 / 2
+    return lambda rng, formato: np.expm1(rng.normal(media, desvio, formato))
+
+
+def retornos_bootstrap(retornos_historicos):
+    retornos_historicos = np.asarray(retornos_historicos, dtype=float)
+    if len(retornos_historicos) == 0:
+        raise ValueError("Sem retornos históricos para o bootstrap.")
+    return lambda rng, formato: rng.choice(retornos_historicos, size=formato)
+
+
+def _saldos(inicial, mensal, retornos):
+    # saldo_t = G_t * (inicial + mensal * soma(1 / G_k)), com G_t = prod(1 + r)
+    crescimento = np.cumprod(1 + retornos, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        saldos = crescimento * (inicial + mensal * np.cumsum(1 / crescimento, axis=1))
+    saldos = np.nan_to_num(saldos, nan=0.0, posinf=0.0, neginf=0.0)
+    return np.hstack([np.full((len(retornos), 1), float(inicial)), saldos])
+
+
+def _percentis_histograma(contagens, limites, percentis):
+    acumulado = np.cumsum(contagens, axis=1)
+    total = acumulado[:, -1:]
+    largura = limites[:, 1:2] - limites[:, 0:1]
+    resultado = {}
+    for q in percentis:
+        alvo = total * q / 100
+        posicao = np.argmax(acumulado >= alvo, axis=1)[:, None]
+        anterior = np.where(posicao > 0, np.take_along_axis(acumulado, np.maximum(posicao - 1, 0), axis=1), 0)
+        no_bin = np.take_along_axis(contagens, posicao, axis=1)
+        fracao = np.where(no_bin > 0, (alvo - anterior) / np.maximum(no_bin, 1), 0)
+        log_saldo = limites[:, 0:1] + (posicao + fracao) * largura / contagens.shape[1]
+        resultado['P{}'.format(q)] = np.exp(log_saldo[:, 0])
+    return resultado
+
+
+# Monte Carlo do investidor passivo em blocos de tamanho fixo.
+# Cada bloco gera uma matriz (bloco x meses) e é acumulado em histogramas
+# logarítmicos por mês, então a memória não cresce com o número de caminhos.
+# Os limites dos histogramas vêm do primeiro bloco, com folga nas pontas.
+# Devolve as faixas de percentis por mês, a probabilidade de atingir a meta
+# e a média do saldo final.
+def monte_carlo_passivo(inicial, mensal, anos, sortear, caminhos=100_000, meta=None,
+                        bloco=2_000, bins=1024, percentis=(5, 25, 50, 75, 95), semente=None):
+    rng = np.random.default_rng(semente)
+    meses = anos * 12
+    minimo = 1e-2
+
+    contagens = None
+    limites = None
+    atingiram = 0
+    soma_final = 0.0
+    restantes = caminhos
+
+    while restantes > 0:
+        n = min(bloco, restantes)
+        restantes -= n
+        log_saldos = np.log(np.maximum(_saldos(inicial, mensal, sortear(rng, (n, meses))), minimo))
+
+        if contagens is None:
+            menor, maior = log_saldos.min(axis=0), log_saldos.max(axis=0)
+            folga = (maior - menor) / 4 + 0.05
+            limites = np.column_stack([menor - folga, maior + folga])
+            contagens = np.zeros((meses + 1, bins), dtype=np.int64)
+
+        largura = (limites[:, 1] - limites[:, 0]) / bins
+        posicoes = np.clip(((log_saldos - limites[:, 0]) / largura).astype(np.int64), 0, bins - 1)
+        posicoes += np.arange(meses + 1) * bins
+        contagens += np.bincount(posicoes.ravel(), minlength=(meses + 1) * bins).reshape(meses + 1, bins)
+
+        finais = np.exp(log_saldos[:, -1])
+        soma_final += finais.sum()
+        if meta is not None:
+            atingiram += int((finais >= meta).sum())
+
+    bandas = pd.DataFrame(_percentis_histograma(contagens, limites, percentis))
+    bandas.index.name = 'Mês'
+    probabilidade = atingiram / caminhos if meta is not None else None
+    return bandas, probabilidade, soma_final / caminhos
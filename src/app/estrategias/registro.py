@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# Linhas acumuladas em memória antes de cada bloco ir para o Parquet
+LINHAS_POR_BLOCO = 65536
+
+# Colunas do registro de operações das estratégias. Preço e quantidade em
+# float32 (sete dígitos bastam para exibir e somar operações); o capital fica
+# em float64 porque acumula ao longo de toda a série. Ativo e operação são
+# categorias: cada linha guarda só o código.
+CAMPOS_OPERACOES = {
+    'execucao': np.int32,
+    'ativo': 'categoria',
+    'data': 'datetime64[D]',
+    'operacao': 'categoria',
+    'preco': np.float32,
+    'quantidade': np.float32,
+    'capital': np.float64,
+}
+
+
+# Registro colunar de operações: uma coluna NumPy pré-alocada por campo,
+# que dobra de tamanho quando enche, em vez de uma tupla ou dicionário por
+# linha. Com `arquivo`, os blocos de `linhas_por_bloco` linhas são gravados
+# em Parquet à medida que chegam e a memória fica limitada a um bloco.
+class RegistroOperacoes:
+    def __init__(self, campos=CAMPOS_OPERACOES, arquivo=None, capacidade=1024, linhas_por_bloco=LINHAS_POR_BLOCO):
+        self.campos = dict(campos)
+        self.arquivo = arquivo
+        self.linhas_por_bloco = linhas_por_bloco
+        self.categorias = {campo: {} for campo, tipo in self.campos.items() if tipo == 'categoria'}
+        self._colunas = {
+            campo: np.empty(capacidade, dtype=np.int32 if tipo == 'categoria' else tipo)
+            for campo, tipo in self.campos.items()
+        }
+        self._linhas = 0
+        self._gravadas = 0
+        self._escritor = None
+
+    def __len__(self):
+        return self._gravadas + self._linhas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    # Códigos das categorias de `rotulos`; rótulos novos ganham o próximo código
+    def codigos(self, campo, rotulos):
+        categorias = self.categorias[campo]
+        unicos, inversos = np.unique(np.asarray(rotulos, dtype=object).astype(str), return_inverse=True)
+        codigos_unicos = np.array([categorias.setdefault(rotulo, len(categorias)) for rotulo in unicos], dtype=np.int32)
+        return codigos_unicos[inversos].reshape(np.shape(rotulos))
+
+    def _garantir(self, linhas):
+        capacidade = len(next(iter(self._colunas.values())))
+        if self._linhas + linhas <= capacidade:
+            return
+        nova = max(capacidade * 2, self._linhas + linhas)
+        for campo, coluna in self._colunas.items():
+            ampliada = np.empty(nova, dtype=coluna.dtype)
+            ampliada[:self._linhas] = coluna[:self._linhas]
+            self._colunas[campo] = ampliada
+
+    # Acrescenta um bloco de linhas. Cada campo recebe um array ou um valor
+    # único repetido em todas as linhas; campos de categoria recebem rótulos
+    # ou um pd.Categorical, cujos códigos são convertidos sem tocar nas linhas.
+    def adicionar(self, **valores):
+        linhas = max((len(v) for v in valores.values() if np.ndim(v)), default=1)
+        self._garantir(linhas)
+        fim = self._linhas + linhas
+        for campo, coluna in self._colunas.items():
+            valor = valores[campo]
+            if campo in self.categorias:
+                if isinstance(valor, pd.Series):
+                    valor = valor.array
+                if isinstance(valor, pd.Categorical):
+                    valor = self.codigos(campo, valor.categories)[valor.codes]
+                else:
+                    valor = self.codigos(campo, np.broadcast_to(np.asarray(valor, dtype=object), linhas))
+            elif coluna.dtype.kind == 'M':
+                # Datas com fuso ficam na data local do pregão
+                datas = pd.DatetimeIndex(np.atleast_1d(valor))
+                valor = (datas.tz_localize(None) if datas.tz is not None else datas).to_numpy()
+            coluna[self._linhas:fim] = valor
+        self._linhas = fim
+        if self.arquivo is not None and self._linhas >= self.linhas_por_bloco:
+            self._descarregar()
+
+    def _tabela_memoria(self):
+        import pyarrow as pa
+
+        colunas = {}
+        for campo, coluna in self._colunas.items():
+            valores = coluna[:self._linhas]
+            if campo in self.categorias:
+                dicionario = pa.array(list(self.categorias[campo]), type=pa.string())
+                colunas[campo] = pa.DictionaryArray.from_arrays(pa.array(valores), dicionario)
+            else:
+                # Colunas numéricas contíguas viram arrays Arrow sem cópia
+                colunas[campo] = pa.array(valores)
+        return pa.table(colunas)
+
+    def _descarregar(self):
+        import pyarrow.parquet as pq
+
+        if not self._linhas:
+            return
+        tabela = self._tabela_memoria()
+        if self._escritor is None:
+            self._escritor = pq.ParquetWriter(self.arquivo, tabela.schema)
+        self._escritor.write_table(tabela)
+        self._gravadas += self._linhas
+        self._linhas = 0
+
+    # Grava o último bloco e fecha o Parquet
+    def fechar(self):
+        if self.arquivo is None:
+            return
+        self._descarregar()
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+    # Tabela Arrow com todas as operações, pronta para o st.dataframe sem
+    # passar pelo pandas. Com `arquivo`, fecha o Parquet e o lê de volta.
+    def tabela(self):
+        if self.arquivo is None or not len(self):
+            return self._tabela_memoria()
+        import pyarrow.parquet as pq
+
+        self.fechar()
+        return pq.read_table(self.arquivo)
+
+    def para_pandas(self):
+        return self.tabela().to_pandas(date_as_object=False)
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+from estrategias.black_scholes import preco_call, preco_put
+from estrategias.opcoes import PREMIO_ITM_PADRAO, PREMIO_OTM_PADRAO, PREMIO_PUT_PADRAO
+
+# Até meados de 2021 as opções de ações da B3 venciam na terceira
+# segunda-feira do mês; desde então vencem na terceira sexta-feira
+INICIO_SEXTA_B3 = pd.Timestamp('2021-07-01')
+
+CICLOS = {
+    'semanal': 'Semanal (toda sexta-feira)',
+    'mensal': 'Mensal (último pregão do mês)',
+    'terceira_sexta': 'Terceira sexta-feira do mês',
+    'b3': 'Calendário da B3',
+}
+
+SEGUNDA, SEXTA = 0, 4
+
+
+# N-ésimo dia da semana (0 = segunda) de cada mês que começa em `meses`
+def _enesimo_dia_semana(meses, dia_semana, n=3):
+    return meses + pd.to_timedelta((dia_semana - meses.weekday) % 7 + 7 * (n - 1), unit='D')
+
+
+# Posições dos pregões de vencimento de um ciclo dentro de `datas`.
+# Vencimentos em feriado vão para o pregão anterior (sextas e fim de mês)
+# ou para o seguinte (segundas da B3). Vencimentos depois do último pregão
+# ainda não aconteceram e ficam de fora.
+def datas_vencimento(datas, ciclo):
+    datas = pd.DatetimeIndex(datas)
+    if datas.tz is not None:
+        datas = datas.tz_localize(None)
+    datas = datas.normalize()
+    meses = pd.date_range(datas[0].to_period('M').to_timestamp(), datas[-1], freq='MS')
+
+    para_frente = None
+    if ciclo == 'semanal':
+        alvos = pd.DatetimeIndex(np.unique(datas + pd.to_timedelta(SEXTA - datas.weekday, unit='D')))
+    elif ciclo == 'mensal':
+        alvos = meses + pd.offsets.MonthEnd(0)
+    elif ciclo == 'terceira_sexta':
+        alvos = _enesimo_dia_semana(meses, SEXTA)
+    elif ciclo == 'b3':
+        sextas = meses >= INICIO_SEXTA_B3
+        alvos = pd.DatetimeIndex(np.where(sextas, _enesimo_dia_semana(meses, SEXTA), _enesimo_dia_semana(meses, SEGUNDA)))
+        para_frente = ~sextas
+    else:
+        raise ValueError("Ciclo de vencimento {} desconhecido. Opções: {}".format(ciclo, list(CICLOS)))
+    if para_frente is None:
+        para_frente = np.zeros(len(alvos), dtype=bool)
+
+    anterior = np.searchsorted(datas, alvos, side='right') - 1
+    seguinte = np.searchsorted(datas, alvos, side='left')
+    posicoes = np.where(para_frente, seguinte, anterior)
+    validos = (alvos >= datas[0]) & (alvos <= datas[-1]) & (posicoes >= 0) & (posicoes < len(datas))
+    return np.unique(posicoes[validos])
+
+
+# Pares (entrada, vencimento) em posições da série diária. Em 'vencimentos'
+# cada opção é rolada no próprio vencimento para o ciclo seguinte (a primeira
+# entra no primeiro pregão); em 'diarias' todo pregão é uma data de entrada.
+# Cada entrada vai para o primeiro vencimento com pelo menos `prazo_minimo`
+# pregões até ele.
+def rolagens(datas, ciclo, entradas='vencimentos', prazo_minimo=1):
+    vencimentos = datas_vencimento(datas, ciclo)
+    if entradas == 'vencimentos':
+        inicio = np.concatenate(([0], vencimentos))
+    elif entradas == 'diarias':
+        inicio = np.arange(len(datas))
+    else:
+        raise ValueError("Modo de entrada {} desconhecido. Opções: vencimentos, diarias".format(entradas))
+
+    proximo = np.searchsorted(vencimentos, inicio + prazo_minimo)
+    validos = proximo < len(vencimentos)
+    inicio = np.unique(inicio[validos]) if entradas == 'vencimentos' else inicio[validos]
+    return inicio, vencimentos[np.searchsorted(vencimentos, inicio + prazo_minimo)]
+
+
+# Menor fechamento entre cada entrada e seu vencimento (inclusive). Os
+# pregões são agrupados pelo próximo vencimento usado; um mínimo acumulado de
+# trás para frente em cada grupo dá o mínimo até o vencimento em uma passada.
+def _minimos_no_caminho(close, entrada, vencimento):
+    vencimentos = np.unique(vencimento)
+    grupos = np.searchsorted(vencimentos, np.arange(len(close)))
+    acumulado = pd.Series(close[::-1]).groupby(grupos[::-1]).cummin().to_numpy()[::-1]
+    seguinte = np.minimum(entrada + 1, vencimento)
+    minimos = np.minimum(close[entrada], acumulado[seguinte])
+    # Entradas que atravessam um vencimento (prazo mínimo > 1) são refeitas pelo intervalo
+    for i in np.flatnonzero(vencimentos[grupos[seguinte]] != vencimento):
+        minimos[i] = close[entrada[i]:vencimento[i] + 1].min()
+    return minimos
+
+
+def _base_rolagem(close, ciclo, entradas, prazo_minimo):
+    precos = close.to_numpy(dtype=float)
+    entrada, vencimento = rolagens(close.index, ciclo, entradas, prazo_minimo)
+    dias = (close.index[vencimento] - close.index[entrada]).days.to_numpy()
+    return precos, entrada, vencimento, dias / 365
+
+
+def _tabela_rolagem(close, entrada, vencimento, colunas):
+    tabela = pd.DataFrame(colunas, index=close.index[entrada])
+    tabela.index.name = 'Entrada'
+    tabela.insert(0, 'Vencimento', close.index[vencimento])
+    tabela.insert(1, 'Pregões', vencimento - entrada)
+    custo, valor = tabela['Custo Total'].to_numpy(), tabela['Valor Final'].to_numpy()
+    tabela['Lucro Líquido'] = valor - custo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tabela['Rentabilidade (%)'] = np.where(custo > 0, (valor - custo) / custo * 100, np.nan)
+    return tabela
+
+
+# Protective Put na série diária: em cada entrada compra `aporte // preço`
+# ações e uma put com strike `strike_pct`% abaixo do preço, vencendo no
+# ciclo escolhido; no vencimento vende as ações e exerce a put se estiver
+# dentro do dinheiro. O prêmio é percentual (`premio_pct`) ou, com `taxa`
+# e `volatilidade` (anuais, decimais; volatilidade alinhada a `close`),
+# Black-Scholes com o prazo real até o vencimento. As colunas de caminho
+# mostram a maior queda do preço antes do vencimento, com e sem a put.
+def rolar_protective_put(close, aporte, strike_pct, ciclo='mensal', entradas='vencimentos',
+                         premio_pct=PREMIO_PUT_PADRAO, taxa=None, volatilidade=None, prazo_minimo=1):
+    precos, entrada, vencimento, prazo = _base_rolagem(close, ciclo, entradas, prazo_minimo)
+    compra, venda = precos[entrada], precos[vencimento]
+    strike = compra * (100 - strike_pct) / 100
+    if volatilidade is None:
+        premio = compra * premio_pct / 100
+    else:
+        premio = preco_put(compra, strike, prazo, taxa, np.asarray(volatilidade, dtype=float)[entrada])
+
+    qtd = aporte // compra
+    minimo = _minimos_no_caminho(precos, entrada, vencimento)
+    return _tabela_rolagem(close, entrada, vencimento, {
+        'Preço de Compra': compra,
+        'Strike': strike,
+        'Prêmio': premio,
+        'Qtd Ações': qtd,
+        'Custo Total': qtd * (compra + premio),
+        'Preço no Vencimento': venda,
+        'Valor Final': qtd * (venda + np.maximum(strike - venda, 0)),
+        'Queda Máxima Ações (%)': (minimo / compra - 1) * 100,
+        # Ações + put valem pelo menos max(preço, strike) a qualquer momento
+        'Queda Máxima Protegida (%)': (np.maximum(minimo, strike) / (compra + premio) - 1) * 100,
+    })
+
+
+# Bull Call Spread na série diária: compra a call ITM (`strike_compra_pct`%
+# abaixo do preço) e vende a call OTM (`strike_venda_pct`% acima), vencendo
+# no ciclo escolhido. Prêmios percentuais sobre o strike, como no simulador
+# mensal, ou Black-Scholes com `taxa` e `volatilidade`. Entradas com custo
+# da estratégia <= 0 não são operáveis e ficam com quantidade zero.
+def rolar_bull_call(close, aporte, strike_venda_pct, strike_compra_pct, ciclo='mensal', entradas='vencimentos',
+                    premio_itm_pct=PREMIO_ITM_PADRAO, premio_otm_pct=PREMIO_OTM_PADRAO, taxa=None, volatilidade=None, prazo_minimo=1):
+    precos, entrada, vencimento, prazo = _base_rolagem(close, ciclo, entradas, prazo_minimo)
+    compra, venda = precos[entrada], precos[vencimento]
+    strike_otm = compra * (100 + strike_venda_pct) / 100
+    strike_itm = compra * (100 - strike_compra_pct) / 100
+    if volatilidade is None:
+        premio_itm = strike_itm * premio_itm_pct / 100
+        premio_otm = strike_otm * premio_otm_pct / 100
+    else:
+        volatilidade = np.asarray(volatilidade, dtype=float)[entrada]
+        premio_itm = preco_call(compra, strike_itm, prazo, taxa, volatilidade)
+        premio_otm = preco_call(compra, strike_otm, prazo, taxa, volatilidade)
+
+    custo = premio_itm - premio_otm
+    with np.errstate(divide='ignore', invalid='ignore'):
+        qtd = np.where(custo > 0, aporte // (custo * 100), 0)
+    return _tabela_rolagem(close, entrada, vencimento, {
+        'Preço de Compra': compra,
+        'Strike ITM': strike_itm,
+        'Strike OTM': strike_otm,
+        'Prêmio ITM': premio_itm,
+        'Prêmio OTM': premio_otm,
+        'Qtd Contratos': qtd,
+        'Custo Total': qtd * custo * 100,
+        'Preço no Vencimento': venda,
+        'Valor Final': np.clip(venda - strike_itm, 0, strike_otm - strike_itm) * 100 * qtd,
+        'Queda Máxima Ações (%)': (_minimos_no_caminho(precos, entrada, vencimento) / compra - 1) * 100,
+    })
+
+
+# Resumo de uma rolagem: totais e distribuição da rentabilidade por entrada
+def resumo_rolagem(tabela):
+    custo = tabela['Custo Total'].sum()
+    lucro = tabela['Lucro Líquido'].sum()
+    rentabilidade = tabela['Rentabilidade (%)'].dropna()
+    return {
+        'Operações': len(tabela),
+        'Custo Total': custo,
+        'Valor Final': tabela['Valor Final'].sum(),
+        'Lucro Líquido': lucro,
+        'Rentabilidade (%)': lucro / custo * 100 if custo else 0.0,
+        'Operações com Lucro (%)': (rentabilidade > 0).mean() * 100 if len(rentabilidade) else 0.0,
+        'Pior Operação (%)': rentabilidade.min() if len(rentabilidade) else np.nan,
+        'Pior Queda no Caminho (%)': tabela['Queda Máxima Ações (%)'].min() if len(tabela) else np.nan,
+    }
@@ -0,0 +1,120 @@
+import pandas as pd
+import streamlit as st
+
+from graficos.reducao import PONTOS_MAXIMOS, reduzir
+
+# O Altair (com o jsonschema) leva ~0,3 s para importar: cada função o importa
+# no primeiro gráfico, para não atrasar a primeira pintura das páginas
+
+ALTURA = 400
+
+
+def _eixo_x(indice, titulo):
+    import altair as alt
+    if isinstance(indice, pd.DatetimeIndex):
+        return alt.X('x:T', title=titulo, axis=alt.Axis(format='%m/%Y'))
+    return alt.X('x:Q', title=titulo)
+
+
+def _sem_fuso(indice):
+    # O Vega interpreta datas sem fuso; o fuso do yfinance só deslocaria os pontos
+    if isinstance(indice, pd.DatetimeIndex) and indice.tz is not None:
+        return indice.tz_localize(None)
+    return indice
+
+
+# Gráfico de linhas de um DataFrame (uma linha por coluna) com índice de
+# datas ou numérico. Cada série é reduzida a `pontos` pontos antes de ir
+# para o navegador. `estilos` mapeia coluna -> {'cor': ..., 'tracejado': bool}.
+def grafico_linhas(df, titulo, eixo_y, eixo_x='', estilos=None, rotulos=None,
+                   pontos=PONTOS_MAXIMOS, metodo='lttb', marcadores=False):
+    import altair as alt
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    df = df.set_axis(_sem_fuso(df.index))
+    estilos = estilos or {}
+    series = reduzir(df, pontos, metodo)
+    longo = pd.concat([
+        pd.DataFrame({'x': serie.index, 'Série': str(coluna), 'valor': serie.to_numpy()})
+        for coluna, serie in series.items()
+    ], ignore_index=True)
+
+    nomes = [str(coluna) for coluna in df.columns]
+    cores = [estilos.get(coluna, {}).get('cor') for coluna in df.columns]
+    tracejados = [[6, 4] if estilos.get(coluna, {}).get('tracejado') else [1, 0] for coluna in df.columns]
+    cor = alt.Color('Série:N', scale=alt.Scale(domain=nomes, range=cores) if all(cores) else alt.Undefined,
+                    legend=alt.Legend(orient='top', title=None) if len(nomes) > 1 else None)
+
+    grafico = alt.Chart(longo).mark_line(point=marcadores).encode(
+        x=_eixo_x(df.index, eixo_x),
+        y=alt.Y('valor:Q', title=eixo_y, scale=alt.Scale(zero=False)),
+        color=cor,
+        strokeDash=alt.StrokeDash('Série:N', scale=alt.Scale(domain=nomes, range=tracejados), legend=None),
+        tooltip=[alt.Tooltip('x', title=eixo_x or 'x'), 'Série:N', alt.Tooltip('valor:Q', format=',.2f')],
+    )
+
+    if rotulos is not None:
+        # Valores escritos sobre alguns pontos (ex.: saldo ao fim de cada ano)
+        rotulos = rotulos.set_axis(_sem_fuso(rotulos.index))
+        texto = pd.DataFrame({'x': rotulos.index, 'valor': rotulos.to_numpy(),
+                              'texto': ['{:,.2f}'.format(v) for v in rotulos.to_numpy()]})
+        grafico = grafico + alt.Chart(texto).mark_text(align='left', baseline='top', dx=3, fontSize=10).encode(
+            x=_eixo_x(df.index, eixo_x), y='valor:Q', text='texto:N')
+
+    return grafico.properties(title=titulo, height=ALTURA)
+
+
+# Faixas de percentis (P5-P95 e P25-P75), mediana e uma linha de meta
+def grafico_faixas(bandas, titulo, eixo_y, eixo_x='', meta=None, cor='green', pontos=PONTOS_MAXIMOS):
+    import altair as alt
+    if len(bandas) > pontos:
+        bandas = bandas.iloc[::-(-len(bandas) // pontos)]
+    dados = bandas.rename_axis('x').reset_index()
+    base = alt.Chart(dados).encode(x=alt.X('x:Q', title=eixo_x))
+    camadas = [
+        base.mark_area(opacity=0.15, color=cor).encode(
+            y=alt.Y('P5:Q', title=eixo_y), y2='P95:Q', tooltip=[alt.Tooltip('P5:Q', format=',.2f'), alt.Tooltip('P95:Q', format=',.2f')]),
+        base.mark_area(opacity=0.3, color=cor).encode(y='P25:Q', y2='P75:Q'),
+        base.mark_line(color=cor).encode(y='P50:Q', tooltip=['x:Q', alt.Tooltip('P50:Q', format=',.2f')]),
+    ]
+    if meta is not None:
+        camadas.append(alt.Chart(pd.DataFrame({'meta': [meta]})).mark_rule(color='gray', strokeDash=[6, 4]).encode(y='meta:Q'))
+    return alt.layer(*camadas).properties(title=titulo, height=ALTURA)
+
+
+# Mapa de calor de uma tabela (índice no eixo y, colunas no eixo x).
+# `destaque` = (x, y) marca a combinação selecionada pelo usuário.
+def mapa_calor(tabela, titulo, eixo_x, eixo_y, legenda, esquema='redyellowgreen', destaque=None):
+    import altair as alt
+    dados = tabela.rename_axis(index='y', columns='x').stack(future_stack=True).rename('valor').reset_index()
+    grafico = alt.Chart(dados).mark_rect().encode(
+        x=alt.X('x:O', title=eixo_x, axis=alt.Axis(labelOverlap=True)),
+        y=alt.Y('y:O', title=eixo_y, sort='descending', axis=alt.Axis(labelOverlap=True)),
+        color=alt.Color('valor:Q', title=legenda, scale=alt.Scale(scheme=esquema)),
+        tooltip=[alt.Tooltip('x:O', title=eixo_x), alt.Tooltip('y:O', title=eixo_y),
+                 alt.Tooltip('valor:Q', title=legenda, format=',.2f')],
+    )
+    if destaque is not None:
+        marca = pd.DataFrame({'x': [destaque[0]], 'y': [destaque[1]]})
+        grafico = grafico + alt.Chart(marca).mark_point(shape='cross', color='black', size=120).encode(
+            x='x:O', y=alt.Y('y:O', sort='descending'))
+    return grafico.properties(title=titulo, height=ALTURA)
+
+
+# Histograma de uma série, com a mediana marcada
+def histograma(serie, titulo, eixo_x, cor='steelblue', faixas=30):
+    import altair as alt
+    dados = pd.DataFrame({'valor': serie.to_numpy()})
+    barras = alt.Chart(dados).mark_bar(color=cor, opacity=0.8).encode(
+        x=alt.X('valor:Q', bin=alt.Bin(maxbins=faixas), title=eixo_x),
+        y=alt.Y('count():Q', title='Frequência'),
+        tooltip=[alt.Tooltip('count():Q', title='Frequência')],
+    )
+    mediana = alt.Chart(pd.DataFrame({'mediana': [serie.median()]})).mark_rule(color='black', strokeDash=[6, 4]).encode(
+        x='mediana:Q', tooltip=[alt.Tooltip('mediana:Q', title='Mediana', format=',.2f')])
+    return (barras + mediana).properties(title=titulo, height=ALTURA)
+
+
+# Substitui st.pyplot: o Vega desenha no navegador, sem layout do matplotlib no servidor
+def exibir(grafico):
+    st.altair_chart(grafico, use_container_width=True)
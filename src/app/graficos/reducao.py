@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# Pontos por série: cerca de um por pixel na largura do layout 'centered'
+PONTOS_MAXIMOS = 800
+
+
+def _eixo_numerico(indice):
+    if isinstance(indice, pd.DatetimeIndex):
+        return indice.asi8.astype(float)
+    return np.asarray(indice, dtype=float)
+
+
+# Largest-Triangle-Three-Buckets: mantém o primeiro e o último ponto e, em
+# cada balde, o ponto que forma o maior triângulo com o escolhido no balde
+# anterior e a média do balde seguinte. Devolve as posições escolhidas.
+def lttb(x, y, pontos):
+    n = len(y)
+    if pontos >= n or pontos < 3:
+        return np.arange(n)
+
+    limites = np.linspace(1, n - 1, pontos - 1).astype(int)
+    escolhidos = np.empty(pontos, dtype=int)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for balde in range(pontos - 2):
+        inicio, fim = limites[balde], limites[balde + 1]
+        proximo_fim = limites[balde + 2] if balde + 2 < len(limites) else n
+        media_x = x[fim:proximo_fim].mean()
+        media_y = y[fim:proximo_fim].mean()
+        areas = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                       - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[balde + 1] = anterior
+    return escolhidos
+
+
+# Mínimo e máximo de cada balde, na ordem em que aparecem: preserva os
+# picos e vales que o LTTB pode suavizar em séries muito ruidosas
+def min_max(y, pontos):
+    n = len(y)
+    baldes = pontos // 2
+    if pontos >= n or baldes < 1:
+        return np.arange(n)
+
+    tamanho = -(-n // baldes)
+    baldes = -(-n // tamanho)
+    completo = np.full(baldes * tamanho, np.nan)
+    completo[:n] = y
+    blocos = completo.reshape(baldes, tamanho)
+    base = np.arange(baldes) * tamanho
+    minimos = base + np.nanargmin(blocos, axis=1)
+    maximos = base + np.nanargmax(blocos, axis=1)
+    return np.unique(np.concatenate([minimos, maximos, [0, n - 1]]))
+
+
+# Reduz cada coluna de `df` a no máximo `pontos` pontos. O índice (datas ou
+# números) é preservado, e colunas diferentes podem ficar com pontos diferentes.
+def reduzir(df, pontos=PONTOS_MAXIMOS, metodo='lttb'):
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    x = _eixo_numerico(df.index)
+    series = {}
+    for coluna in df.columns:
+        valores = df[coluna].to_numpy(dtype=float)
+        validos = np.flatnonzero(~np.isnan(valores))
+        if metodo == 'lttb':
+            posicoes = lttb(x[validos], valores[validos], pontos)
+        elif metodo == 'min_max':
+            posicoes = min_max(valores[validos], pontos)
+        else:
+            raise ValueError("Método de redução {} desconhecido.".format(metodo))
+        series[coluna] = df[coluna].iloc[validos[posicoes]]
+    return series
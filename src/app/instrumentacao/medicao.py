@@ -0,0 +1,153 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+from dados.armazenamento import DIRETORIO_CACHE
+
+ARQUIVO_LOG = DIRETORIO_CACHE / 'medicoes.jsonl'
+
+# Execução atual (uma por rerun do Streamlit, que roda em sua própria thread)
+_execucao = contextvars.ContextVar('execucao', default=None)
+_trava_log = threading.Lock()
+
+log = logging.getLogger(__name__)
+
+# Sessão com a medição de memória ligada que fica esse tempo sem executar
+# (aba fechada) deixa de contar para manter o tracemalloc ligado
+ABANDONO_MEMORIA = 10 * 60
+
+# Sessões com a medição de memória ligada e a última execução de cada uma
+_sessoes_memoria = {}
+_trava_memoria = threading.Lock()
+_rastreamento_proprio = False
+
+
+# O tracemalloc deixa as alocações de todo o processo mais lentas: fica
+# ligado só enquanto alguma sessão pede a medição de memória e é desligado
+# quando a última sai (seletor desligado ou sessão abandonada).
+#
+# Os picos só são confiáveis com uma única sessão medindo: o tracemalloc é
+# do processo, os picos incluem as alocações das sessões simultâneas e o
+# reset_peak() de uma fase zera o pico que outra sessão estava medindo.
+def _ajustar_memoria(sessao, ligada):
+    global _rastreamento_proprio
+    agora = time.time()
+    with _trava_memoria:
+        if ligada:
+            _sessoes_memoria[sessao] = agora
+        else:
+            _sessoes_memoria.pop(sessao, None)
+        for outra, ultima in list(_sessoes_memoria.items()):
+            if agora - ultima > ABANDONO_MEMORIA:
+                del _sessoes_memoria[outra]
+        if _sessoes_memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _rastreamento_proprio = True
+        elif not _sessoes_memoria and _rastreamento_proprio:
+            # Não desliga um rastreamento iniciado fora daqui (PYTHONTRACEMALLOC)
+            tracemalloc.stop()
+            _rastreamento_proprio = False
+
+
+def ativar_memoria(sessao):
+    _ajustar_memoria(sessao, True)
+
+
+def desativar_memoria(sessao):
+    _ajustar_memoria(sessao, False)
+
+
+def iniciar(pagina, sessao=None):
+    execucao = {
+        'pagina': pagina,
+        'sessao': sessao or uuid.uuid4().hex[:8],
+        'medicoes': [],
+        'pilha': [],
+    }
+    _execucao.set(execucao)
+    return execucao
+
+
+# Mede o tempo (e o pico de memória, se o tracemalloc estiver ativo) de
+# uma fase da página. Sem `iniciar` antes, não registra nada.
+@contextmanager
+def medir(fase):
+    execucao = _execucao.get()
+    if execucao is None:
+        yield
+        return
+
+    memoria = tracemalloc.is_tracing()
+    if memoria:
+        inicio_memoria = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    quadro = {'pico': 0}
+    execucao['pilha'].append(quadro)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        execucao['pilha'].pop()
+        medicao = {'fase': fase, 'duracao_s': duracao, 'pico_memoria_kb': None}
+        # Se a última sessão desligou o rastreamento durante a fase, fica sem pico
+        if memoria and tracemalloc.is_tracing():
+            # Fases internas zeram o pico, então o maior pico delas também conta
+            pico = max(tracemalloc.get_traced_memory()[1], quadro['pico'])
+            medicao['pico_memoria_kb'] = max(pico - inicio_memoria, 0) / 1024
+            if execucao['pilha']:
+                execucao['pilha'][-1]['pico'] = max(execucao['pilha'][-1]['pico'], pico)
+        execucao['medicoes'].append(medicao)
+
+
+# Encerra a execução atual, acrescenta as medições ao log JSONL e as devolve
+def finalizar(gravar=True):
+    execucao = _execucao.get()
+    if execucao is None:
+        return []
+    _execucao.set(None)
+
+    medicoes = execucao['medicoes']
+    if gravar and medicoes:
+        agora = time.time()
+        linhas = ''.join(
+            json.dumps({'momento': agora, 'pagina': execucao['pagina'], 'sessao': execucao['sessao'], **m}) + '\n'
+            for m in medicoes
+        )
+        try:
+            with _trava_log:
+                ARQUIVO_LOG.parent.mkdir(parents=True, exist_ok=True)
+                with open(ARQUIVO_LOG, 'a', encoding='utf-8') as arquivo:
+                    arquivo.write(linhas)
+        except OSError as e:
+            log.warning('Erro ao gravar medições: %s', e)
+    return medicoes
+
+
+# Agrega o log em p50/p99 da duração e do pico de memória por página e fase
+def resumo(arquivo=ARQUIVO_LOG):
+    if not arquivo.exists():
+        return pd.DataFrame()
+    log = pd.read_json(arquivo, lines=True)
+    if log.empty:
+        return log
+    agrupado = log.groupby(['pagina', 'fase'])
+    return pd.DataFrame({
+        'Execuções': agrupado.size(),
+        'p50 (s)': agrupado['duracao_s'].quantile(0.5),
+        'p99 (s)': agrupado['duracao_s'].quantile(0.99),
+        'p50 memória (KB)': agrupado['pico_memoria_kb'].quantile(0.5),
+        'p99 memória (KB)': agrupado['pico_memoria_kb'].quantile(0.99),
+    })
+
+
+if __name__ == '__main__':
+    with pd.option_context('display.width', 200, 'display.max_rows', None):
+        print(resumo().round(4))
@@ -0,0 +1,48 @@
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+from estrategias.cache_resultados import CACHE
+from instrumentacao import medicao
+
+
+# Deve ser chamado logo após o st.set_page_config: cria o seletor na barra
+# lateral e começa a medir a execução da página
+def iniciar_medicoes(pagina):
+    if 'id_sessao' not in st.session_state:
+        st.session_state.id_sessao = uuid.uuid4().hex[:8]
+    mostrar = st.sidebar.toggle('Medições de desempenho', key='mostrar_medicoes',
+                                help='Tempo e pico de memória de cada fase da página')
+    if mostrar:
+        medicao.ativar_memoria(st.session_state.id_sessao)
+    else:
+        medicao.desativar_memoria(st.session_state.id_sessao)
+    medicao.iniciar(pagina, st.session_state.id_sessao)
+
+
+# Deve ser chamado no fim da página: grava as medições e, se o seletor
+# estiver ligado, mostra o painel na barra lateral
+def exibir_medicoes():
+    medicoes = medicao.finalizar()
+    if not st.session_state.get('mostrar_medicoes'):
+        return
+
+    with st.sidebar:
+        st.subheader('Desempenho desta execução')
+        if medicoes:
+            tabela = pd.DataFrame(medicoes).rename(columns={
+                'fase': 'Fase', 'duracao_s': 'Duração (s)', 'pico_memoria_kb': 'Pico de memória (KB)',
+            })
+            st.dataframe(tabela.round(4), hide_index=True)
+        else:
+            st.caption('Nenhuma fase medida nesta execução.')
+
+        cache = CACHE.estatisticas()
+        st.caption('Cache de resultados: {} acertos ({} do disco), {} faltas, taxa de acerto de {:.0%}; '
+                   '{} itens ocupando {:.1f} MB, {} despejos.'.format(
+                       cache['acertos'] + cache['acertos_disco'], cache['acertos_disco'], cache['faltas'],
+                       cache['taxa_acerto'], cache['itens'], cache['bytes'] / 2 ** 20, cache['despejos']))
+
+        with st.expander('Histórico (p50/p99 por fase)'):
+            st.dataframe(medicao.resumo().round(4))
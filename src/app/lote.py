@@ -0,0 +1,261 @@
+"""Execução em lote das estratégias, sem Streamlit.
+
+Uso:
+    python src/app/lote.py jobs.yaml --saida resultados.parquet [--processos 8] [--operacoes operacoes.parquet]
+
+Arquivo YAML:
+    periodo: 5y                  # padrão para todos os jobs
+    jobs:
+      - estrategia: cruzamento
+        tickers: [PETR4.SA, VALE3.SA]
+        parametros: {capital_inicial: 1000, curta: [10, 20], longa: [50, 100]}
+      - estrategia: momentum
+        tickers: [PETR4.SA, VALE3.SA, ITUB4.SA, WEGE3.SA]
+        parametros: {capital_inicial: 500, k: 2}
+
+Arquivo CSV: uma linha por job com as colunas estrategia, tickers
+(separados por ';'), periodo e uma coluna por parâmetro.
+
+Listas nos parâmetros geram o produto cartesiano das combinações. Cada
+ticker vira um job separado, exceto no momentum, em que a lista inteira
+é o universo de ativos.
+
+Com --operacoes, as operações de cada simulação do cruzamento são gravadas em
+um Parquet à parte (uma linha por operação, com o número da execução), em
+blocos, à medida que os processos terminam.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import product
+from pathlib import Path
+
+import pandas as pd
+
+from dados.armazenamento import historico_precos
+from dados.download import baixar_varios
+from estrategias.cruzamento import estrategia_cruzamento
+from estrategias.momentum import simular_momentum
+from estrategias.opcoes import (
+    PREMIO_ITM_PADRAO, PREMIO_OTM_PADRAO, PREMIO_PUT_PADRAO, protective_put, simular_bull_call,
+)
+from estrategias.passivo import simular_passivo
+from estrategias.registro import RegistroOperacoes
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+PERIODO_PADRAO = '2y'
+
+
+def _mensal(ticker, periodo):
+    return pd.DataFrame(historico_precos(ticker, periodo)['Close'].resample('ME').last())
+
+
+def rodar_passivo(tickers, periodo, inicial=500, mensal=500, anos=10, taxa=5):
+    saldo = simular_passivo(inicial, mensal, anos, taxa)
+    investido = inicial + mensal * anos * 12
+    return {'saldo_final': saldo[-1], 'total_investido': investido,
+            'rentabilidade': (saldo[-1] - investido) / investido * 100}
+
+
+def rodar_cruzamento(tickers, periodo, capital_inicial=500, curta=20, longa=50):
+    df = historico_precos(tickers[0], periodo)
+    _, historico, capital = estrategia_cruzamento(df, capital_inicial, curta, longa)
+    return {'capital_final': capital, 'num_operacoes': len(historico),
+            'rentabilidade': (capital - capital_inicial) / capital_inicial * 100,
+            '_operacoes': historico}
+
+
+def rodar_momentum(tickers, periodo, capital_inicial=500, k=2, janela=2, manutencao=1):
+    precos = pd.DataFrame({
+        ticker: historico_precos(ticker, periodo)['Close'].resample('ME').last().iloc[:-1]
+        for ticker in tickers
+    })
+    historico, _ = simular_momentum(precos, capital_inicial, k, janela, manutencao)
+    if historico.empty:
+        raise ValueError("Período curto demais para a janela e a manutenção escolhidas.")
+    aportado = historico['Alocação'].sum()
+    valor_final = historico['Saldo Final'].sum()
+    return {'aporte_total': aportado, 'valor_final': valor_final,
+            'rentabilidade': (valor_final - aportado) / aportado * 100}
+
+
+def rodar_protective_put(tickers, periodo, aporte_mensal=500, strike_pct=5, premio_pct=PREMIO_PUT_PADRAO):
+    df = protective_put(_mensal(tickers[0], periodo), aporte_mensal, '', strike_pct, premio_pct)
+    custo = df['Custo_Total'].sum()
+    lucro = df['Lucro_Liquido'].sum()
+    return {'custo_total': custo, 'valor_final': df['Valor_Final'].sum(), 'lucro_liquido': lucro,
+            'rentabilidade': lucro / custo * 100 if custo else 0}
+
+
+def rodar_bull_call(tickers, periodo, aporte_mensal=500, strike_venda_pct=5, strike_compra_pct=5,
+                    premio_itm_pct=PREMIO_ITM_PADRAO, premio_otm_pct=PREMIO_OTM_PADRAO):
+    df = simular_bull_call(_mensal(tickers[0], periodo), aporte_mensal, '', strike_venda_pct,
+                           strike_compra_pct, premio_itm_pct, premio_otm_pct)
+    custo = df['Custo_Total'].sum()
+    bruto = df['Lucro_Bruto'].sum()
+    return {'custo_total': custo, 'lucro_bruto': bruto, 'lucro_liquido': bruto - custo,
+            'rentabilidade': (bruto - custo) / custo * 100 if custo else 0}
+
+
+ESTRATEGIAS = {
+    'passivo': rodar_passivo,
+    'cruzamento': rodar_cruzamento,
+    'momentum': rodar_momentum,
+    'protective_put': rodar_protective_put,
+    'bull_call': rodar_bull_call,
+}
+
+# Estratégias que não leem preços: os tickers desses jobs não são baixados
+SEM_PRECOS = {'passivo'}
+
+
+def _lista(valor):
+    if valor is None:
+        return []
+    if isinstance(valor, str):
+        return [v.strip() for v in valor.replace(',', ';').split(';') if v.strip()]
+    return list(valor)
+
+
+def _numero(valor):
+    for tipo in (int, float):
+        try:
+            return tipo(valor)
+        except (TypeError, ValueError):
+            pass
+    return valor
+
+
+def ler_jobs(caminho):
+    caminho = Path(caminho)
+    if caminho.suffix.lower() in ('.yaml', '.yml'):
+        if yaml is None:
+            raise ValueError("Instale o PyYAML para ler arquivos .yaml (pip install pyyaml).")
+        conteudo = yaml.safe_load(caminho.read_text(encoding='utf-8')) or {}
+        periodo = conteudo.get('periodo', PERIODO_PADRAO)
+        jobs = conteudo.get('jobs', [])
+        for job in jobs:
+            job.setdefault('periodo', periodo)
+        return jobs
+
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        jobs = []
+        for linha in csv.DictReader(arquivo):
+            linha = {chave: valor for chave, valor in linha.items() if valor not in (None, '')}
+            jobs.append({
+                'estrategia': linha.pop('estrategia'),
+                'tickers': linha.pop('tickers', None),
+                'periodo': linha.pop('periodo', PERIODO_PADRAO),
+                'parametros': {chave: [_numero(v) for v in _lista(valor)] for chave, valor in linha.items()},
+            })
+        return jobs
+
+
+# Expande cada job em execuções individuais (tickers x combinações de parâmetros)
+def expandir_jobs(jobs):
+    execucoes = []
+    for job in jobs:
+        estrategia = job['estrategia']
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError("Estratégia {} desconhecida. Opções: {}".format(estrategia, list(ESTRATEGIAS)))
+        tickers = [t.upper() for t in _lista(job.get('tickers'))]
+        grupos = [tickers] if estrategia in ('momentum', 'passivo') else [[t] for t in tickers]
+
+        parametros = job.get('parametros') or {}
+        nomes = list(parametros)
+        valores = [v if isinstance(v, list) else [v] for v in parametros.values()]
+        for grupo, combinacao in product(grupos, product(*valores)):
+            execucoes.append((estrategia, grupo, job.get('periodo', PERIODO_PADRAO), dict(zip(nomes, combinacao))))
+    return execucoes
+
+
+# `operacoes`: devolve também o histórico de operações em '_operacoes'
+def executar(execucao, operacoes=False):
+    estrategia, tickers, periodo, parametros = execucao
+    resultado = {
+        'estrategia': estrategia,
+        'tickers': ';'.join(tickers),
+        'periodo': periodo,
+        'parametros': json.dumps(parametros, sort_keys=True),
+        'erro': None,
+    }
+    inicio = time.perf_counter()
+    try:
+        resultado.update(ESTRATEGIAS[estrategia](tickers, periodo, **parametros))
+    except Exception as e:
+        resultado['erro'] = str(e) or e.__class__.__name__
+    resultado['duracao_s'] = time.perf_counter() - inicio
+    if not operacoes:
+        resultado.pop('_operacoes', None)
+    return resultado
+
+
+# Acrescenta ao registro as operações devolvidas por uma execução
+def _registrar(registro, numero, resultado):
+    historico = resultado.pop('_operacoes', None)
+    if registro is None or historico is None or historico.empty:
+        return
+    registro.adicionar(execucao=numero, ativo=resultado['tickers'], data=historico['Data'],
+                       operacao=historico['Operação'], preco=historico['Preço'].to_numpy(),
+                       quantidade=historico['Quantidade de Ações'].to_numpy(),
+                       capital=historico['Capital Atual'].to_numpy())
+
+
+# `registro`: RegistroOperacoes que recebe as operações de cada execução
+# (coluna 'execucao' = posição da execução na lista) assim que ela termina
+def rodar_lote(execucoes, processos=None, registro=None):
+    # Baixa os tickers antes, em paralelo, para que os processos encontrem
+    # os históricos já no armazenamento local
+    tickers = sorted({t for estrategia, grupo, _, _ in execucoes if estrategia not in SEM_PRECOS for t in grupo})
+    if tickers:
+        _, _, falhas = baixar_varios(tickers, 'max')
+        for ticker, erro in falhas.items():
+            print('Erro ao baixar {}: {}'.format(ticker, erro), file=sys.stderr)
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        resultados = []
+        for numero, resultado in enumerate(executor.map(partial(executar, operacoes=registro is not None),
+                                                        execucoes, chunksize=max(1, len(execucoes) // 256))):
+            _registrar(registro, numero, resultado)
+            resultados.append(resultado)
+    return pd.DataFrame(resultados)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Executa simulações em lote e grava os resultados em Parquet.')
+    parser.add_argument('jobs', help='arquivo .yaml ou .csv com a lista de jobs')
+    parser.add_argument('--saida', default='resultados.parquet', help='arquivo Parquet de saída')
+    parser.add_argument('--processos', type=int, default=None, help='número de processos (padrão: núcleos)')
+    parser.add_argument('--operacoes', default=None, help='arquivo Parquet para as operações do cruzamento (opcional)')
+    args = parser.parse_args(argumentos)
+
+    execucoes = expandir_jobs(ler_jobs(args.jobs))
+    print('{} simulações a executar'.format(len(execucoes)))
+    if not execucoes:
+        return
+    inicio = time.perf_counter()
+    registro = RegistroOperacoes(arquivo=args.operacoes) if args.operacoes else None
+    try:
+        resultados = rodar_lote(execucoes, args.processos, registro)
+    finally:
+        if registro is not None:
+            registro.fechar()
+    resultados.to_parquet(args.saida, index=False)
+    if registro is not None:
+        print('{} operações -> {}'.format(len(registro), args.operacoes))
+
+    erros = resultados['erro'].notna().sum()
+    print('{} simulações em {:.1f}s ({} com erro) -> {}'.format(
+        len(resultados), time.perf_counter() - inicio, erros, args.saida))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,25 @@
 import streamlit as st
-import matplotlib.pyplot as plt
+from componentes.ticker import campo_ticker
+import pandas as pd
+from dados.armazenamento import historico_precos
+from estrategias.passivo import (simular_passivo, grade_passivo, monte_carlo_passivo,
+                                 retornos_normais, retornos_lognormais, retornos_bootstrap)
+from estrategias.cache_resultados import obter_resultado
+from graficos.exibicao import grafico_linhas, grafico_faixas, mapa_calor, exibir
+from instrumentacao.medicao import medir
+from instrumentacao.painel import iniciar_medicoes, exibir_medicoes
 
 
-# Função de cálculo de juros compostos
-def simular_passivo(inicial, mensal, anos, taxa):
-    taxa_mensal = (1 + taxa / 100) ** (1 / 12) - 1
-    saldo = [inicial]
-    for _ in range(anos * 12):
-        resultado = saldo[-1] * (1 + taxa_mensal) + mensal
-        saldo.append(round(resultado, 2))
-    return saldo
-
 def criar_grafico(resultado):
-    tempo = list(range(len(resultado)))
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(tempo, resultado, color='green')
+    saldo = pd.Series(resultado, name='Saldo')
     # Adicionando rotulos nos resultados anuais
-    for i in range(len(resultado)):
-        if i > 0 and i % 12 == 0:
-            ax.text(
-                x=tempo[i],
-                y=resultado[i],
-                s='R${:,.2f}'.format(round(resultado[i], 2)),
-                va='top',
-                ha='left'
-            )
-    ax.set_title("Evolução do Saldo - Investidor Passivo")
-    ax.set_xlabel("Meses")
-    ax.set_ylabel("Saldo acumulado (R$)")
-    ax.grid(True)
-    return fig
+    rotulos = saldo.iloc[12::12]
+    return grafico_linhas(saldo, "Evolução do Saldo - Investidor Passivo", "Saldo acumulado (R$)",
+                          eixo_x="Meses", estilos={'Saldo': {'cor': 'green'}}, rotulos=rotulos)
 
 # --------- Streamlit
 st.set_page_config(page_title="Simulador Passivo", layout="centered")
+iniciar_medicoes('Simulador Passivo')
 st.title("Simulador - Investidor Passivo")
 
 
@@ -49,7 +36,11 @@ anos = st.slider("Período da Simulação (anos)", 1, 40, 10)
 taxa_anual = st.slider("Retorno Anual (%)", 1, 20, 5)
 
 if st.button("Simular"):
-    resultado = simular_passivo(aporte_inicial, aporte_mensal, anos, taxa_anual)
+    with medir('estrategia'):
+        resultado = obter_resultado(
+            'passivo', lambda: simular_passivo(aporte_inicial, aporte_mensal, anos, taxa_anual),
+            parametros={'inicial': aporte_inicial, 'mensal': aporte_mensal, 'anos': anos, 'taxa': taxa_anual},
+        )
 
     # Explicação textual dos resultados
     total_aportado = aporte_inicial + aporte_mensal * (anos * 12)
@@ -74,7 +65,109 @@ if st.button("Simular"):
         disciplina nos aportes e o tempo são elementos-chave para alcançar bons resultados financeiros no longo prazo.
             """)
     st.subheader("A seguir, temos um gráfico ilustrando o progresso dessa estratégia:")
-    grafico = criar_grafico(resultado)
-    st.pyplot(grafico)
+    with medir('grafico'):
+        grafico = criar_grafico(resultado)
+        exibir(grafico)
 else:
     st.info("Preencha os parâmetros e clique em Simular para visualizar o resultado.")
+
+# --------- Análise de sensibilidade
+st.markdown("---")
+st.subheader("Análise de Sensibilidade")
+st.markdown("""
+Compare de uma só vez todos os cenários de retorno anual, período e aporte mensal.
+O aporte inicial é o mesmo definido acima.
+""")
+
+faixa_taxas = st.slider("Faixa de retorno anual (%)", 1, 20, (1, 20))
+faixa_anos = st.slider("Faixa de período (anos)", 1, 40, (1, 40))
+opcoes_aporte = sorted({100, 250, 500, 1000, 2000, 5000, aporte_mensal})
+aportes = st.multiselect("Aportes mensais comparados", opcoes_aporte, default=[aporte_mensal])
+
+if st.button("Comparar Cenários"):
+    if not aportes:
+        st.warning("Escolha pelo menos um aporte mensal.")
+    else:
+        taxas = range(faixa_taxas[0], faixa_taxas[1] + 1)
+        periodos = range(faixa_anos[0], faixa_anos[1] + 1)
+        with medir('sensibilidade'):
+            grade = obter_resultado(
+                'grade_passivo', lambda: grade_passivo(aporte_inicial, taxas, periodos, aportes),
+                parametros={'inicial': aporte_inicial, 'taxas': taxas, 'anos': periodos, 'mensais': tuple(aportes)},
+            )
+
+        abas = st.tabs(['Aporte de R$ {:,.2f}'.format(aporte) for aporte in aportes])
+        for aba, aporte in zip(abas, aportes):
+            with aba:
+                tabela = grade[grade['Aporte Mensal'] == aporte].pivot(
+                    index='Anos', columns='Taxa Anual (%)', values='Saldo Final'
+                )
+                grafico = mapa_calor(tabela, "Saldo Final por Retorno Anual e Período", "Retorno anual (%)",
+                                     "Período (anos)", 'Saldo final (R$)', esquema='greens')
+                with medir('grafico'):
+                    exibir(grafico)
+                st.dataframe(tabela.round(2))
+
+# --------- Monte Carlo
+st.markdown("---")
+st.subheader("Simulação de Monte Carlo")
+st.markdown("""
+Em vez de um retorno fixo, cada mês recebe um retorno sorteado. São simulados milhares de caminhos
+possíveis para o saldo, e o resultado é mostrado como faixas de percentis (P5, P50, P95).
+Os parâmetros de aporte e período são os mesmos definidos acima.
+""")
+
+distribuicao = st.radio("Distribuição dos retornos mensais:",
+                        ['Lognormal', 'Normal', 'Bootstrap histórico'], horizontal=True)
+if distribuicao == 'Bootstrap histórico':
+    indice = campo_ticker("Índice ou ativo de referência (ex: ^BVSP, ^GSPC, BOVA11.SA):", valor='^BVSP')
+else:
+    volatilidade = st.slider("Volatilidade Anual (%)", 1, 50, 15)
+caminhos = st.select_slider("Número de caminhos simulados:",
+                            options=[10_000, 50_000, 100_000, 250_000, 500_000], value=100_000)
+meta = st.number_input("Meta de saldo final (R$)", min_value=0, value=100_000, step=10_000)
+
+if st.button("Simular Monte Carlo", disabled=distribuicao == 'Bootstrap histórico' and indice is None):
+    with st.spinner("Simulando caminhos..."):
+        try:
+            if distribuicao == 'Bootstrap histórico':
+                with medir('historico'):
+                    fechamento = historico_precos(indice.upper(), 'max')['Close'].resample('ME').last()
+                sortear = retornos_bootstrap(fechamento.pct_change().dropna().to_numpy())
+                tickers, dados, parametros_retornos = [indice], fechamento, {}
+            elif distribuicao == 'Normal':
+                sortear = retornos_normais(taxa_anual, volatilidade)
+                tickers, dados, parametros_retornos = [], None, {'taxa': taxa_anual, 'volatilidade': volatilidade}
+            else:
+                sortear = retornos_lognormais(taxa_anual, volatilidade)
+                tickers, dados, parametros_retornos = [], None, {'taxa': taxa_anual, 'volatilidade': volatilidade}
+
+            with medir('monte_carlo'):
+                bandas, probabilidade, media_final = obter_resultado(
+                    'monte_carlo_passivo',
+                    lambda: monte_carlo_passivo(aporte_inicial, aporte_mensal, anos, sortear, caminhos=caminhos, meta=meta),
+                    tickers=tickers, dados=dados,
+                    parametros={'distribuicao': distribuicao, 'inicial': aporte_inicial, 'mensal': aporte_mensal,
+                                'anos': anos, 'caminhos': caminhos, 'meta': meta, **parametros_retornos},
+                )
+            final = bandas.iloc[-1]
+            total_aportado = aporte_inicial + aporte_mensal * (anos * 12)
+
+            st.markdown(f"""
+            **Resultados ({caminhos:,} caminhos):**
+            - Total investido no período: R$ {total_aportado:,.2f}
+            - Saldo final pessimista (P5): R$ {final['P5']:,.2f}
+            - Saldo final mediano (P50): R$ {final['P50']:,.2f}
+            - Saldo final otimista (P95): R$ {final['P95']:,.2f}
+            - Saldo final médio: R$ {media_final:,.2f}
+            - Probabilidade de atingir a meta de R$ {meta:,.2f}: **{probabilidade * 100:.1f}%**
+            """)
+
+            grafico = grafico_faixas(bandas, "Leque de Saldos - Monte Carlo (faixas P5-P95 e P25-P75, mediana e meta)",
+                                     "Saldo acumulado (R$)", eixo_x="Meses", meta=meta)
+            with medir('grafico'):
+                exibir(grafico)
+        except Exception as e:
+            st.error(f"Erro ao executar a simulação de Monte Carlo: {e}")
+
+exibir_medicoes()
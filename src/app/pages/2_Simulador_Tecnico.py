@@ -1,58 +1,50 @@
 import streamlit as st
-import yfinance as yf
+from componentes.ticker import campo_ticker
 import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
+from dados import metadados, provedores, simbolos
+from dados.armazenamento import historico_precos
+from dados.download import ATIVOS_PADRAO, baixar_varios
+from estrategias.cruzamento import estrategia_cruzamento, varrer_janelas, melhores_pares, inicios_moveis, varrer_universo
+from estrategias.cache_resultados import obter_resultado
+from estrategias.registro import RegistroOperacoes
+from graficos.exibicao import grafico_linhas, mapa_calor, histograma, exibir
+from instrumentacao.medicao import medir
+from instrumentacao.painel import iniciar_medicoes, exibir_medicoes
 
 # Lista de périodo predefinidas
 opcao = ['6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
 legenda = ['6 meses', '2 anos', '5 anos', '10 anos', 'máximo']
 opcoes_dic = dict(zip(legenda, opcao))
 
-# Função para aplicar estratégia
-def estrategia_cruzamento(df):
-    df['MM20'] = df['Close'].rolling(window=20).mean()
-    df['MM50'] = df['Close'].rolling(window=50).mean()
-    df.dropna(inplace=True)
-    
-    comprado = False
-    capital = capital_inicial
-    qtd_acoes = 0
-    historico = []
-
-    for i in range(1, len(df)):
-        if not comprado and df['MM20'].iloc[i] > df['MM50'].iloc[i] and df['MM20'].iloc[i-1] <= df['MM50'].iloc[i-1]:
-            preco = df['Close'].iloc[i]
-            qtd_acoes = capital // preco
-            capital -= qtd_acoes * preco
-            historico.append((df.index[i], "Compra", preco, qtd_acoes, capital))
-            comprado = True
-        elif comprado and df['MM20'].iloc[i] < df['MM50'].iloc[i] and df['MM20'].iloc[i-1] >= df['MM50'].iloc[i-1]:
-            preco = df['Close'].iloc[i]
-            capital += qtd_acoes * preco
-            historico.append((df.index[i], "Venda", preco, qtd_acoes, capital))
-            qtd_acoes = 0
-            comprado = False
-
-    if comprado:
-        preco = df['Close'].iloc[-1]
-        capital += qtd_acoes * preco
-        historico.append((df.index[-1], "Venda Final", preco, qtd_acoes, capital))
-
-    return df, historico, capital
-
 def baixar_dados(ticker):
     try:
-        dados = yf.Ticker(ticker)
-        moeda = dados.get_info()['currency']
+        dados = provedores.ticker(ticker)
+        moeda = metadados.moeda(ticker)
     except:
         raise ValueError("Erro ao procurar o ativo {}. Confira o nome ou substitua por outro.".format(ticker))
     
     return dados
 
 
+# Histórico de operações para exibição: data "dd/mm/aaaa" e moeda nas colunas de valor
+def formatar_operacoes(df_op, moeda):
+    return df_op.assign(Data=df_op['Data'].dt.strftime('%d/%m/%Y')).rename(columns={
+        'Preço': 'Preço ({})'.format(moeda),
+        'Capital Atual': 'Capital Atual ({})'.format(moeda),
+    })
+
+
+# Tickers de um CSV enviado: coluna 'ticker' (ou 'sigla'), senão a primeira coluna
+def ler_universo(arquivo):
+    tabela = pd.read_csv(arquivo)
+    colunas = {str(c).strip().lower(): c for c in tabela.columns}
+    coluna = colunas.get('ticker', colunas.get('sigla', tabela.columns[0]))
+    return [str(t).strip().upper() for t in tabela[coluna].dropna() if str(t).strip()]
+
+
 # ---- Streamlit
 st.set_page_config(page_title="Simulador Técnico", layout="centered")
+iniciar_medicoes('Simulador Técnico')
 st.title("Simulador - Investidor Técnico (Médias Móveis)")
 
 st.markdown("""
@@ -64,10 +56,13 @@ Esta simulação utiliza a estratégia de cruzamento de médias móveis:
 - Escolha de ativo (ticker)
 - Aporte inicial
 - Período de simulação
+- Modo de varredura: testa todas as combinações de janelas (curta x longa) e mostra as melhores
+- Modo de início móvel: repete a simulação a partir de cada mês (ou a cada N pregões) para ver quanto o resultado depende da data de início
+- Modo de universo: roda o cruzamento MM20 x MM50 em uma lista de ativos (ou em um CSV enviado) e classifica os ativos pelo retorno
 """)
 
 # Entradas do usuário
-ticker = st.text_input("Ticker da Ação (ex: PETR4.SA, VALE3.SA, AAPL)", value="PETR4.SA")
+ticker = campo_ticker("Ticker da Ação (ex: PETR4.SA, VALE3.SA, AAPL)", valor="PETR4.SA")
 
 # Criando o select_slider
 periodo = st.select_slider(
@@ -78,14 +73,208 @@ periodo = st.select_slider(
 
 capital_inicial = st.number_input("Aporte Mensal", min_value=500, value=500, step=500)
 
+modo = st.radio('Modo de simulação:', ['Simulação única (MM20 x MM50)', 'Varredura de janelas', 'Início móvel',
+                                        'Universo de ativos'], horizontal=True)
+if modo == 'Universo de ativos':
+    texto_universo = st.text_area('Ativos do universo (um por linha ou separados por vírgula):',
+                                  value='\n'.join(st.session_state.get('acoes', ATIVOS_PADRAO)))
+    arquivo_universo = st.file_uploader('Ou envie um CSV com uma coluna "ticker":', type='csv')
+if modo == 'Início móvel':
+    frequencia = st.radio('Datas de início:', ['Todo mês', 'A cada N pregões'], horizontal=True)
+    passo_inicio = None
+    if frequencia == 'A cada N pregões':
+        passo_inicio = st.number_input('Intervalo entre inícios (pregões):', min_value=1, value=5, step=1)
+if modo == 'Varredura de janelas':
+    faixa_curta = st.slider('Faixa da média curta (dias):', 2, 200, (5, 100))
+    faixa_longa = st.slider('Faixa da média longa (dias):', 10, 400, (20, 300))
+    passo = st.number_input('Passo entre janelas (dias):', min_value=1, value=1, step=1)
+
 # Simulação
-if st.button("Simular Estratégia"):
+simular = st.button("Simular Estratégia", disabled=ticker is None and modo != 'Universo de ativos')
+if simular and modo == 'Varredura de janelas':
+    with st.spinner("Carregando dados e executando a varredura de janelas..."):
+        try:
+            with medir('download'):
+                dados = baixar_dados(ticker)
+            with medir('informacoes'):
+                moeda = metadados.moeda(ticker)
+            with medir('historico'):
+                df_dados_historicos = historico_precos(ticker, opcoes_dic[periodo])
+
+            curtas = range(faixa_curta[0], faixa_curta[1] + 1, passo)
+            longas = range(faixa_longa[0], faixa_longa[1] + 1, passo)
+            with medir('varredura'):
+                resultado = obter_resultado(
+                    'varredura_cruzamento',
+                    lambda: varrer_janelas(df_dados_historicos['Close'].to_numpy(), capital_inicial, curtas, longas),
+                    tickers=[ticker], dados=df_dados_historicos['Close'],
+                    parametros={'capital_inicial': capital_inicial, 'curtas': curtas, 'longas': longas},
+                )
+            retornos = (resultado / capital_inicial - 1) * 100
+
+            st.subheader("Mapa de Calor - Rentabilidade (%) por Par de Médias")
+            grafico = mapa_calor(retornos, f"{ticker} - Varredura de Médias Móveis ({periodo})",
+                                 "Média longa (dias)", "Média curta (dias)", 'Rentabilidade (%)')
+            with medir('grafico'):
+                exibir(grafico)
+
+            st.subheader("Melhores Pares")
+            pares = melhores_pares(resultado, capital_inicial).rename(columns={
+                'Curta': 'Média Curta', 'Longa': 'Média Longa',
+                'Capital Final': 'Capital Final ({})'.format(moeda),
+            })
+            st.dataframe(pares.round(2))
+
+            st.markdown(f"""
+            - Pares avaliados: **{int(resultado.notna().sum().sum())}**
+            - Capital inicial: **{moeda} {capital_inicial:,.2f}**
+            - Rentabilidade média: **{retornos.stack().mean():.2f}%**
+            """)
+        except Exception as e:
+            st.error(f"Erro ao executar varredura: {e}")
+elif simular and modo == 'Início móvel':
+    with st.spinner("Carregando dados e simulando a partir de cada data de início..."):
+        try:
+            with medir('download'):
+                dados = baixar_dados(ticker)
+            with medir('informacoes'):
+                moeda = metadados.moeda(ticker)
+            with medir('historico'):
+                df_dados_historicos = historico_precos(ticker, opcoes_dic[periodo])
+
+            with medir('estrategia'):
+                inicios = obter_resultado(
+                    'inicios_moveis_cruzamento',
+                    lambda: inicios_moveis(df_dados_historicos['Close'], capital_inicial, passo=passo_inicio),
+                    tickers=[ticker], dados=df_dados_historicos['Close'],
+                    parametros={'capital_inicial': capital_inicial, 'passo': passo_inicio},
+                )
+            if inicios.empty:
+                raise ValueError("Período curto demais: são necessários pelo menos 50 pregões para as médias mais um mês de operação.")
+
+            st.subheader("Distribuição dos Resultados por Data de Início")
+            with medir('grafico'):
+                exibir(histograma(inicios['Retorno (%)'], "Retorno até o fim do período", "Retorno (%)"))
+                exibir(histograma(inicios['Drawdown Máximo (%)'], "Drawdown máximo", "Drawdown máximo (%)", cor='indianred'))
+                exibir(grafico_linhas(inicios[['Retorno (%)', 'Drawdown Máximo (%)']],
+                                      f"{ticker} - Resultado conforme a data de início", "%", eixo_x="Data de início",
+                                      estilos={'Retorno (%)': {'cor': 'green'},
+                                               'Drawdown Máximo (%)': {'cor': 'indianred', 'tracejado': True}}))
+
+            percentis = inicios[['Retorno (%)', 'Drawdown Máximo (%)', 'Operações']].quantile([0.05, 0.25, 0.5, 0.75, 0.95])
+            percentis.index = ['P5', 'P25', 'P50', 'P75', 'P95']
+            st.dataframe(percentis.round(2))
+
+            tabela = inicios.rename(columns={'Capital Final': 'Capital Final ({})'.format(moeda)})
+            tabela.index = tabela.index.strftime('%d/%m/%Y')
+            with st.expander("Resultado de cada data de início"):
+                st.dataframe(tabela.round(2))
+
+            st.markdown(f"""
+            - Datas de início avaliadas: **{len(inicios)}**
+            - Capital inicial: **{moeda} {capital_inicial:,.2f}**
+            - Retornos positivos: **{(inicios['Retorno (%)'] > 0).mean() * 100:.1f}%** das datas de início
+            - Retorno mediano: **{inicios['Retorno (%)'].median():.2f}%** (pior **{inicios['Retorno (%)'].min():.2f}%**, melhor **{inicios['Retorno (%)'].max():.2f}%**)
+            - Drawdown máximo mediano: **{inicios['Drawdown Máximo (%)'].median():.2f}%**
+
+            As médias MM20 e MM50 são calculadas uma única vez sobre todo o período, então cada data
+            de início já começa a operar com as médias definidas.
+            """)
+        except Exception as e:
+            st.error(f"Erro ao executar simulação com início móvel: {e}")
+elif modo == 'Universo de ativos' and (simular or 'universo' in st.session_state):
+    if simular:
+        with st.spinner("Baixando os históricos e rodando o cruzamento em cada ativo..."):
+            try:
+                if arquivo_universo is not None:
+                    tickers = ler_universo(arquivo_universo)
+                else:
+                    tickers = [t.strip().upper() for t in texto_universo.replace(',', '\n').splitlines() if t.strip()]
+                # Tickers fora da lista local de ativos nem chegam ao provedor
+                indice = simbolos.obter_indice()
+                for ativo in [t for t in tickers if not indice.valido(t)]:
+                    sugestoes = indice.sugerir(ativo, 3)
+                    st.warning("Ativo {} ignorado: não está na lista de ativos da B3 e dos EUA.{}".format(
+                        ativo, " Você quis dizer: {}?".format(', '.join(sugestoes)) if sugestoes else ''))
+                tickers = [t for t in tickers if indice.valido(t)]
+                if not tickers:
+                    raise ValueError("Informe pelo menos um ativo.")
+
+                with medir('download'):
+                    historicos, moedas, falhas = baixar_varios(tickers, opcoes_dic[periodo])
+                for ativo, erro in falhas.items():
+                    st.warning("Ativo {} ignorado: {}".format(ativo, erro))
+
+                precos = {ativo: df['Close'] for ativo, df in historicos.items()}
+
+                # Ranking e operações de todos os ativos, em uma tabela Arrow colunar
+                def varrer():
+                    registro = RegistroOperacoes()
+                    ranking = varrer_universo(precos, capital_inicial, registro=registro)
+                    return ranking, registro.tabela()
+
+                with medir('estrategia'):
+                    ranking, operacoes_universo = obter_resultado(
+                        'universo_cruzamento', varrer,
+                        tickers=list(precos), dados=list(precos.values()),
+                        parametros={'capital_inicial': capital_inicial},
+                    )
+                if ranking.empty:
+                    raise ValueError("Nenhum ativo com pregões suficientes para as médias de 50 dias.")
+                ranking.insert(0, 'Moeda', [moedas[ativo] for ativo in ranking.index])
+
+                # Guardado na sessão para o detalhamento sobreviver às novas execuções da página
+                st.session_state.universo = {'ranking': ranking, 'operacoes': operacoes_universo, 'periodo': periodo,
+                                             'capital': capital_inicial, 'total': len(tickers)}
+            except Exception as e:
+                st.session_state.pop('universo', None)
+                st.error(f"Erro ao executar a varredura do universo: {e}")
+
+    universo = st.session_state.get('universo')
+    if universo is not None:
+        ranking = universo['ranking']
+        st.subheader("Ranking do Universo (MM20 x MM50)")
+        st.dataframe(ranking.round(2))
+        st.markdown(f"""
+        - Ativos simulados: **{len(ranking)}** de **{universo['total']}**
+        - Período: **{universo['periodo']}**, capital inicial de **{universo['capital']:,.2f}** na moeda de cada ativo
+        - Ativos com retorno positivo: **{(ranking['Retorno (%)'] > 0).mean() * 100:.1f}%**
+        - Retorno mediano: **{ranking['Retorno (%)'].median():.2f}%**
+        """)
+        with st.expander("Operações de todos os ativos ({})".format(universo['operacoes'].num_rows)):
+            # A tabela Arrow vai direto para o navegador, sem conversão para pandas
+            st.dataframe(universo['operacoes'])
+
+        # Detalhamento de um ativo do ranking
+        escolhido = st.selectbox('Detalhar ativo:', ranking.index)
+        try:
+            moeda = ranking.loc[escolhido, 'Moeda']
+            with medir('historico'):
+                df_dados_historicos = historico_precos(escolhido, opcoes_dic[universo['periodo']])
+            with medir('estrategia'):
+                df, df_op, capital_final = obter_resultado(
+                    'cruzamento', lambda: estrategia_cruzamento(df_dados_historicos, universo['capital']),
+                    tickers=[escolhido], dados=df_dados_historicos,
+                    parametros={'capital_inicial': universo['capital']},
+                )
+            with medir('formatacao'):
+                df_op = formatar_operacoes(df_op, moeda)
+            st.dataframe(df_op)
+            with medir('grafico'):
+                exibir(grafico_linhas(df[['Close', 'MM20', 'MM50']].rename(columns={'Close': 'Preço'}),
+                                      f"{escolhido} - Estratégia Técnica (MM20 x MM50)", "Valor ({})".format(moeda),
+                                      estilos={'MM20': {'tracejado': True}, 'MM50': {'tracejado': True}}))
+        except Exception as e:
+            st.error(f"Erro ao detalhar {escolhido}: {e}")
+elif simular:
     with st.spinner("Carregando dados e executando simulação..."):
         try:
-            dados = baixar_dados(ticker) 
+            with medir('download'):
+                dados = baixar_dados(ticker) 
 
              # Informações Gerais
-            info = dados.get_info()
+            with medir('informacoes'):
+                info = metadados.info_ticker(ticker)
 
             st.write('**Nome da Empresa:**', info.get('longName', 'N/A'))
             col1, col2, col3 = st.columns(3)
@@ -95,20 +284,23 @@ if st.button("Simular Estratégia"):
                 st.write('**Site:**', info.get('website', 'N/A'))
             with col3:
                 #Preço atual
-                historico = dados.history('5d')
+                with medir('historico'):
+                    historico = historico_precos(ticker, '5d')
                 preco = historico['Close'].iloc[-1]
-                moeda = dados.get_info()['currency']   
+                with medir('informacoes'):
+                    moeda = metadados.moeda(ticker)   
                 st.write('**Cotação Atual ({}):** {}'.format(moeda, round(preco, 2)))
 
-            df_dados_historicos = dados.history(opcoes_dic[periodo])
-            df, operacoes, capital_final = estrategia_cruzamento(df_dados_historicos)
+            with medir('historico'):
+                df_dados_historicos = historico_precos(ticker, opcoes_dic[periodo])
+            with medir('estrategia'):
+                df, df_op, capital_final = obter_resultado(
+                    'cruzamento', lambda: estrategia_cruzamento(df_dados_historicos, capital_inicial),
+                    tickers=[ticker], dados=df_dados_historicos, parametros={'capital_inicial': capital_inicial},
+                )
            
-            # Formatar a data como "dd/mm/aaaa"
-            operacoes = [
-                (op[0].strftime('%d/%m/%Y'), *op[1:]) for op in operacoes
-            ]
-            df_op = pd.DataFrame(operacoes, columns=["Data", "Operação", "Preço ({})".format(moeda), 
-                                                     "Quantidade de Ações", "Capital Atual ({})".format(moeda)])
+            with medir('formatacao'):
+                df_op = formatar_operacoes(df_op, moeda)
 
             # Resumo explicativo
             st.subheader("Explicação dos Resultados")
@@ -152,14 +344,11 @@ if st.button("Simular Estratégia"):
 
             # Geração de gráfico
             st.subheader("A seguir, temos um gráfico ilustrando o progresso dessa estratégia:")
-            fig, ax = plt.subplots(figsize=(12, 5))
-            ax.plot(df.index, df['Close'], label='Preço')
-            ax.plot(df.index, df['MM20'], label='MM20', linestyle='--')
-            ax.plot(df.index, df['MM50'], label='MM50', linestyle=':')
-            ax.set_title(f"{ticker} - Estratégia Técnica (MM20 x MM50)")
-            ax.legend()
-            ax.grid(True)
-            st.pyplot(fig)
+            grafico = grafico_linhas(df[['Close', 'MM20', 'MM50']].rename(columns={'Close': 'Preço'}),
+                                     f"{ticker} - Estratégia Técnica (MM20 x MM50)", "Valor ({})".format(moeda),
+                                     estilos={'MM20': {'tracejado': True}, 'MM50': {'tracejado': True}})
+            with medir('grafico'):
+                exibir(grafico)
 
             st.markdown("""
                 ---
@@ -175,3 +364,5 @@ if st.button("Simular Estratégia"):
             st.error(f"Erro ao executar simulação: {e}")
 else:
     st.info("Preencha os parâmetros e clique em 'Simular Estratégia' para ver os resultados.")
+
+exibir_medicoes()
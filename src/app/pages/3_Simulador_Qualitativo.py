@@ -1,10 +1,16 @@
 import streamlit as st
-import yfinance as yf
+from componentes.ticker import exibir_sugestoes, forcar_ticker
 import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
+from dados import simbolos
+from dados.download import ATIVOS_PADRAO, baixar_varios
+from estrategias.momentum import simular_momentum
+from estrategias.cache_resultados import obter_resultado
+from graficos.exibicao import grafico_linhas, exibir
+from instrumentacao.medicao import medir
+from instrumentacao.painel import iniciar_medicoes, exibir_medicoes
 
 st.set_page_config(page_title='Simulador Qualitativo (Momentum)', layout='centered')
+iniciar_medicoes('Simulador Qualitativo')
 st.title('Simulador - Estratégia de Momentum (Qualitativa)')
 
 st.markdown('''
@@ -17,17 +23,14 @@ o processo no mês seguinte.
 - Escolha dos ativos (tickers)
 - Aporte inicial e mensal
 - Período de simulação
+- Número de ativos escolhidos, janela de retorno e tempo de manutenção (2 ativos, 2 meses e 1 mês por padrão)
 ''')
 
 
 # Iniciar a lista no session_state
 # st.session_state = Cache
 if 'acoes' not in st.session_state:
-    st.session_state.acoes = ['PETR4.SA', 'VALE3.SA', 
-                              'ITUB4.SA', 'WEGE3.SA', 
-                              'BBDC3.SA', 'ABEV3.SA',
-                              'BBAS3.SA', 'BPAC11.SA',
-                              'SANB11.SA', 'ITSA4.SA']
+    st.session_state.acoes = list(ATIVOS_PADRAO)
                             
 # Campo para adicionar nova ação
 if "novo_ativo" not in st.session_state:
@@ -39,8 +42,18 @@ def submit():
 
 st.text_input("Adicionar novo ativo:", key="input", on_change=submit, placeholder='Novo ativo')
 
-# Atualiza a lista se o usuário teclar Enter
+# Callback das sugestões: adiciona o ativo escolhido na próxima execução
+def escolher(sugestao):
+    st.session_state.novo_ativo = sugestao
+
+# Atualiza a lista se o usuário teclar Enter. Ativos fora da lista local
+# de ativos só entram se o usuário confirmar: aparecem sugestões e a opção
+# de adicionar assim mesmo (o ativo fica pendente até lá).
 novo_ativo = st.session_state.novo_ativo
+if novo_ativo and not simbolos.obter_indice().valido(novo_ativo.upper()):
+    exibir_sugestoes(novo_ativo.upper(), escolher, 'novo_ativo')
+    if not forcar_ticker(novo_ativo.upper(), 'novo_ativo_{}'.format(novo_ativo.upper())):
+        novo_ativo = ''
 if novo_ativo and novo_ativo.upper() not in st.session_state.acoes:
     st.session_state.acoes.append(novo_ativo.upper())
     st.success('{} adicionado a lista'.format(novo_ativo.upper()))
@@ -71,66 +84,26 @@ periodo = st.select_slider(
 
 capital_inicial = st.number_input('Aporte Mensal', value=500, step=500)
 
+col1, col2, col3 = st.columns(3)
+with col1:
+    qtd_escolhidos = st.number_input('Ativos escolhidos por mês', min_value=1, value=2, step=1)
+with col2:
+    janela = st.number_input('Janela do retorno (meses)', min_value=2, value=2, step=1)
+with col3:
+    manutencao = st.number_input('Manutenção (meses)', min_value=1, value=1, step=1)
+
 # Função de simulação
 @st.cache_data
 def baixar_dados(tickers, periodo):
     data = {}
-    moedas = []
-    
-    for ticker in tickers:
-        try:
-            ticker = ticker.upper()
-            dados = yf.Ticker(ticker)
-            moedas.append(dados.get_info()['currency'])
-            df_dados_historicos = dados.history(periodo)['Close'].resample('ME').last()
-            data[ticker] = df_dados_historicos.iloc[:-1]
-        except:
-            raise ValueError("Erro ao procurar o ativo {}. Confira o nome ou substitua por outro.".format(ticker))
-    return pd.DataFrame(data), moedas
-
-def simular_momentum(df, capital_inicial):
-    saldo = capital_inicial
-    historico = []
-
-    for i in range(2, len(df)):
-        retornos = df.iloc[i-2:i].pct_change().dropna().add(1).prod() - 1
-        top2 = retornos.sort_values(ascending=False).head(2).index.tolist()
-
-        if i+1 < len(df):
-            saldo = capital_inicial
-            investimento_total = saldo
-
-            saldo = 0
-            saldo_venda = 0
-
-            for ativo in top2:
-                alocacao = investimento_total / 2
-                preco_compra = df[ativo].iloc[i]
-                qtd = alocacao // preco_compra
-                restante = alocacao - (qtd * preco_compra)
-                preco_venda = df[ativo].iloc[i+1]
-                saldo_venda = qtd * preco_venda
-                saldo_final = restante + saldo_venda
-                
-                historico.append({
-                    'Data': df.index[i],
-                    'Ativo': ativo,
-                    'Alocação': round(investimento_total / 2, 2),
-                    'Preço Compra': round(preco_compra, 2),
-                    'Investimento Real': round(qtd * preco_compra, 2),
-                    'Qtd': qtd,
-                    'Restante Alocação': round(restante, 2),
-                    'Preço Venda': round(preco_venda, 2),
-                    'Saldo Venda': round(qtd * preco_venda, 2),
-                    'Rendimento (em %)':round((preco_venda - preco_compra)/preco_compra * 100, 2),
-                    'Saldo Final': round(saldo_final, 2)
-                })
-        else:
-            data = df.index[i].strftime('%d/%m/%Y')
-            st.success('A recomendação para o dia {} foram: {}'.format(data, top2))
-
-    df_historico = pd.DataFrame(historico)
-    return df_historico
+    historicos, moedas, falhas = baixar_varios(tickers, periodo)
+    if not historicos:
+        raise ValueError("Erro ao procurar os ativos {}. Confira os nomes ou substitua por outros.".format(list(falhas)))
+
+    for ticker, df_dados_historicos in historicos.items():
+        df_dados_historicos = df_dados_historicos['Close'].resample('ME').last()
+        data[ticker] = df_dados_historicos.iloc[:-1]
+    return pd.DataFrame(data), list(moedas.values()), falhas
 
 # Executar simulação
 if st.button('Simular Estratégia'):
@@ -139,11 +112,30 @@ if st.button('Simular Estratégia'):
     else:
         with st.spinner('Baixando dados e executando simulação...'):
             try:
-                df_precos, moedas = baixar_dados(ativos, opcoes_dic[periodo])
+                with medir('download'):
+                    df_precos, moedas, falhas = baixar_dados(ativos, opcoes_dic[periodo])
+                for ticker, erro in falhas.items():
+                    st.warning("Erro ao procurar o ativo {}: {}. Ele foi ignorado na simulação.".format(ticker, erro))
+                if df_precos.shape[1] < 3:
+                    raise ValueError("São necessários pelo menos 3 ativos válidos para a simulação.")
 
                 if len(set(moedas)) == 1: # Significando que a unidade monetaria entre as empresass são as mesmas:
                     moeda = moedas[0]
-                    df_resultado = simular_momentum(df_precos, capital_inicial)
+                    with medir('estrategia'):
+                        df_resultado, recomendacao = obter_resultado(
+                            'momentum',
+                            lambda: simular_momentum(df_precos, capital_inicial, k=qtd_escolhidos,
+                                                     janela=janela, manutencao=manutencao),
+                            tickers=list(df_precos.columns), dados=df_precos,
+                            parametros={'capital_inicial': capital_inicial, 'k': qtd_escolhidos,
+                                        'janela': janela, 'manutencao': manutencao},
+                        )
+                    if recomendacao is not None:
+                        data = recomendacao[0].strftime('%d/%m/%Y')
+                        st.success('A recomendação para o dia {} foram: {}'.format(data, recomendacao[1]))
+                    if df_resultado.empty:
+                        raise ValueError("Período curto demais para a janela e a manutenção escolhidas.")
+                    qtd_escolhidos = df_resultado['Data'].value_counts().iloc[0]
 
                     # Tabela de Alocações
                     st.subheader('Histórico de Alocações')
@@ -180,7 +172,7 @@ if st.button('Simular Estratégia'):
                     - Capital inicial: **{moeda} {capital_inicial:,.2f}**
                     - Período analisado: **{periodo}**
                     - Ativos utilizados: **{ativos_usados}** ativos
-                    - Alocações mensais realizadas: **{num_meses}** (**{num_meses*2}** alocações inviduais)
+                    - Alocações mensais realizadas: **{num_meses}** (**{num_meses*qtd_escolhidos}** alocações inviduais)
                     """)
 
                     try:
@@ -209,7 +201,7 @@ if st.button('Simular Estratégia'):
 
                         st.dataframe(resumo_ativos.round(2))
 
-                        total_ciclos = df_resultado.shape[0] // 2
+                        total_ciclos = df_resultado.shape[0] // qtd_escolhidos
                         valor_final = df_resultado["Saldo Final ({})".format(moeda)].sum()
                         aporte_total_df = df_resultado["Alocação ({})".format(moeda)].sum()
                         rentabilidade_total = (valor_final - aporte_total_df) / aporte_total_df * 100
@@ -218,7 +210,7 @@ if st.button('Simular Estratégia'):
                         pior = df_resultado.loc[df_resultado["Rendimento (em %)"].idxmin()]
 
                         st.markdown(f"""
-                    - **Total de ciclos de investimento:** {total_ciclos} ({total_ciclos*2} alocações individuais)  
+                    - **Total de ciclos de investimento:** {total_ciclos} ({total_ciclos*qtd_escolhidos} alocações individuais)  
                     - **Aporte total (somado da alocação):** {moeda} {aporte_total_df:,.2f}  
                     - **Valor final acumulado:** {moeda} {valor_final:,.2f}  
                     - **Rentabilidade acumulada:** {rentabilidade_total:.2f}%  
@@ -255,13 +247,13 @@ if st.button('Simular Estratégia'):
                     df_mensal['Data'] = df_mensal['Data'].dt.to_timestamp()
 
                     # Plotar o gráfico
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    ax.plot(df_mensal['Data'], df_mensal['Saldo Final ({})'.format(moeda)], marker='o', linestyle='-', color='royalblue')
-                    ax.set_title('Evolução do Capital - Estratégia de Momentum')
-                    ax.set_ylabel('Saldo Final ({})'.format(moeda))
-                    ax.grid(True)         
+                    coluna_saldo = 'Saldo Final ({})'.format(moeda)
+                    grafico = grafico_linhas(df_mensal.set_index('Data')[[coluna_saldo]],
+                                             'Evolução do Capital - Estratégia de Momentum', coluna_saldo,
+                                             estilos={coluna_saldo: {'cor': 'royalblue'}}, marcadores=True)
 
-                    st.pyplot(fig)
+                    with medir('grafico'):
+                        exibir(grafico)
 
 
                     st.markdown("""
@@ -286,3 +278,5 @@ if st.button('Simular Estratégia'):
                 st.error(f'Erro na simulação: {e}')
 else:
     st.info('Configure os parâmetros acima e clique em "Simular Estratégia" para começar.')
+
+exibir_medicoes()
@@ -1,42 +1,21 @@
 import streamlit as st
-import yfinance as yf
+from componentes.ticker import campo_ticker
 import pandas as pd
-import matplotlib.pyplot as plt
-
-
-# Simulação da estratégia Protective Put
-def protective_put(df, aporte_mensal, moeda):
-    df['Strike'] = df['Close'] * (100 - strikes_dic[valor_strike])/100
-    df['Premio'] = df['Close'] * (premio_dic[valor_premio])/100
-    df['Qtd_Acoes'] = aporte_mensal // df['Close']
-    df['Custo_Acoes'] = df['Qtd_Acoes'] * df['Close']
-    df['Custo_Put'] = df['Qtd_Acoes'] * df['Premio']
-    df['Custo_Total'] = df['Custo_Acoes'] + df['Custo_Put']
-    df['Preço de Venda ({})'.format(moeda)] = 1.0
-
-    valor_final = []
-    for i in range(len(df) - 2):
-        preco_venda = df.loc[df.index[i+1], 'Close']
-        df.loc[df.index[i], 'Preço de Venda ({})'.format(moeda)] = round(preco_venda, 2)
-        strike = df.loc[df.index[i], 'Strike']
-        qtd = df.loc[df.index[i], 'Qtd_Acoes']
-
-        # Se ação caiu abaixo do strike, put gera lucro
-        lucro_put = max(0, strike - preco_venda) * qtd
-        valor_acoes = preco_venda * qtd
-        valor_final.append(valor_acoes + lucro_put)
-
-    df = df.iloc[:-2].copy()
-    
-    df['Valor_Final'] = valor_final
-    df['Lucro_Liquido'] = df['Valor_Final'] - df['Custo_Total']
-    
-    return df
+from dados import metadados, provedores
+from dados.armazenamento import historico_precos
+from estrategias.opcoes import protective_put, grade_protective_put, PREMIO_PUT_PADRAO
+from estrategias.black_scholes import preco_put, volatilidade_ticker, volatilidade_nas_datas, PRAZO_MENSAL
+from estrategias.rolagem import CICLOS, rolar_protective_put, resumo_rolagem
+from estrategias.cache_resultados import obter_resultado
+from graficos.exibicao import grafico_linhas, mapa_calor, exibir
+from instrumentacao.medicao import medir
+from instrumentacao.painel import iniciar_medicoes, exibir_medicoes
+
 
 def baixar_dados(ticker):
     try:
-        dados = yf.Ticker(ticker)
-        moeda = dados.get_info()['currency']
+        dados = provedores.ticker(ticker)
+        moeda = metadados.moeda(ticker)
     except:
         raise ValueError("Erro ao procurar o ativo {}. Confira o nome ou substitua por outro.".format(ticker))
     
@@ -45,6 +24,7 @@ def baixar_dados(ticker):
 
 # --- Streamlit
 st.set_page_config(page_title='Simulador Opções', layout='centered')
+iniciar_medicoes('Protective Put')
 st.title('Simulador - Estratégia com Opções: Protective Put')
 
 st.markdown('''
@@ -60,10 +40,11 @@ Esta simulação demonstra a estratégia **Protective Put**, onde o investidor c
 - Período de simulação
 - Porcentagem do Strike da put (5% abaixo do preço da ação por padrão)
 - Porcentagem do prêmio da put (2% do valor da ação por padrão)
+- Rolagem diária: vencimentos semanais, mensais, na terceira sexta-feira ou no calendário da B3, rolando em cada vencimento ou entrando em todo pregão
 ''')
 
 # Entradas do usuário
-ticker = st.text_input('Ticker da Ação (ex: PETR4.SA, VALE3.SA, AAPL)', value='PETR4.SA')
+ticker = campo_ticker('Ticker da Ação (ex: PETR4.SA, VALE3.SA, AAPL)', valor='PETR4.SA')
 
 # Lista de périodo predefinidas
 opcao = ['6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
@@ -96,29 +77,67 @@ premio_dic = dict(zip(legenda_premio, premios))
 valor_premio = st.select_slider(
     'Selecione a porcentagem (%) do prêmio:',
     options=legenda_strike,
-    value='2' # Valor Inicial
+    value=str(PREMIO_PUT_PADRAO) # Valor Inicial
 )
 
+# Modelo de precificação do prêmio
+modelo_premio = st.radio('Modelo do prêmio:', ['Percentual fixo', 'Black-Scholes'], horizontal=True)
+if modelo_premio == 'Black-Scholes':
+    st.caption('O prêmio é calculado por Black-Scholes com a volatilidade histórica do ativo; os sliders de prêmio são ignorados.')
+    taxa_livre = st.number_input('Taxa livre de risco (% ao ano):', min_value=0.0, value=10.0, step=0.25)
+    janela_volatilidade = st.slider('Janela da volatilidade histórica (pregões):', 10, 252, 21)
+
+# Rolagem diária com vencimentos configuráveis
+ciclo = st.selectbox('Vencimentos da rolagem diária:', list(CICLOS), index=list(CICLOS).index('b3'), format_func=CICLOS.get)
+modo_entrada = st.radio('Entradas da rolagem diária:', ['Rolar em cada vencimento', 'Todo pregão'], horizontal=True)
+entradas_dic = {'Rolar em cada vencimento': 'vencimentos', 'Todo pregão': 'diarias'}
 
 
 # Execução da simulação
-if st.button('Simular Estratégia'):
+if st.button('Simular Estratégia', disabled=ticker is None):
     with st.spinner('Executando simulação da estratégia Protective Put...'):
         try:
             ticker = ticker.upper()
-            dados = baixar_dados(ticker)
-            df_dados_historicos = dados.history(opcoes_dic[periodo])['Close'].resample('ME').last()
-            moeda = dados.get_info()['currency']   
+            with medir('download'):
+                dados = baixar_dados(ticker)
+            with medir('historico'):
+                diario = historico_precos(ticker, opcoes_dic[periodo])['Close']
+                df_dados_historicos = diario.resample('ME').last()
+            with medir('informacoes'):
+                moeda = metadados.moeda(ticker)   
             # Converter para Dataframe
             df_dados_historicos = pd.DataFrame(df_dados_historicos)
-            df_resultado = protective_put(df_dados_historicos, aporte_mensal, moeda)
+
+            premio = None
+            rotulo_premio = 'Prêmio de {}%'.format(premio_dic[valor_premio])
+            descricao_premio = '{}% do valor da ação'.format(valor_premio)
+            if modelo_premio == 'Black-Scholes':
+                close = df_dados_historicos['Close'].to_numpy()
+                with medir('volatilidade'):
+                    volatilidade = volatilidade_nas_datas(volatilidade_ticker(ticker, janela_volatilidade),
+                                                          df_dados_historicos.index)
+                premio = preco_put(close, close * (100 - strikes_dic[valor_strike])/100,
+                                   PRAZO_MENSAL, taxa_livre/100, volatilidade)
+                rotulo_premio = 'Prêmio (Black-Scholes)'
+                descricao_premio = 'Black-Scholes, taxa livre de {}% a.a. e volatilidade de {} pregões'.format(
+                    taxa_livre, janela_volatilidade)
+
+            with medir('estrategia'):
+                df_resultado = obter_resultado(
+                    'protective_put',
+                    lambda: protective_put(df_dados_historicos, aporte_mensal, moeda,
+                                           strikes_dic[valor_strike], premio_dic[valor_premio], premio=premio),
+                    tickers=[ticker], dados=(df_dados_historicos, premio),
+                    parametros={'aporte_mensal': aporte_mensal, 'moeda': moeda,
+                                'strike': strikes_dic[valor_strike], 'premio': premio_dic[valor_premio]},
+                )
 
             # Tabela de resultados
             # Renomeando colunas para impressão da tabela
             df_resultado = df_resultado.rename(columns={
                 'Close': 'Preço de Compra ({})'.format(moeda),
                 'Strike': 'Strike de {}%'.format(strikes_dic[valor_strike]),
-                'Premio': 'Prêmio de {}%'.format(premio_dic[valor_premio]),
+                'Premio': rotulo_premio,
                 'Custo_Acoes': 'Custo das Ações',
                 'Custo_Put': 'Custo da Put',
                 'Custo_Total': 'Custo Total',
@@ -129,6 +148,7 @@ if st.button('Simular Estratégia'):
 
             st.subheader('Resultado por Mês')
             df_resultado.index.names = ['Data']
+            datas = df_resultado.index
             df_resultado.index = df_resultado.index.strftime('%d/%m/%Y')
             
             st.dataframe(df_resultado.round(2))
@@ -163,7 +183,7 @@ if st.button('Simular Estratégia'):
             - Período: **{periodo}**
             - Número de meses simulados: **{num_meses}**
             - Strike da Put: **{valor_strike}% abaixo do preço**
-            - Prêmio da Put: **{valor_premio}% do valor da ação**
+            - Prêmio da Put: **{descricao_premio}**
 
             **Resultados Obtidos:**
             - Valor total acumulado: **{moeda} {valor_acumulado:,.2f}**
@@ -190,15 +210,15 @@ if st.button('Simular Estratégia'):
 
             # Geração de gráfico
             st.subheader("A seguir, temos um gráfico ilustrando o progresso dessa estratégia:")
-            fig, ax = plt.subplots(figsize=(10,6))
-            ax.plot(df_resultado.index, df_resultado['Valor Final ({})'.format(moeda)].cumsum(), label='Valor Final Acumulado', color='green')
-            ax.plot(df_resultado.index, df_resultado['Custo Total'].cumsum(), label='Investimento Total', color='gray', linestyle='--')
-            ax.set_title('Simulação - Estratégia Protective Put')
-            ax.set_ylabel('{}'.format(moeda))
-            ax.legend()
-            ax.grid(True)
-            plt.xticks(rotation=45)
-            st.pyplot(fig)
+            evolucao = pd.DataFrame({
+                'Valor Final Acumulado': df_resultado['Valor Final ({})'.format(moeda)].cumsum().to_numpy(),
+                'Investimento Total': df_resultado['Custo Total'].cumsum().to_numpy(),
+            }, index=datas)
+            grafico = grafico_linhas(evolucao, 'Simulação - Estratégia Protective Put', '{}'.format(moeda),
+                                     estilos={'Valor Final Acumulado': {'cor': 'green'},
+                                              'Investimento Total': {'cor': 'gray', 'tracejado': True}})
+            with medir('grafico'):
+                exibir(grafico)
 
             # Melhor e pior mês
             try:
@@ -217,6 +237,65 @@ if st.button('Simular Estratégia'):
             except:
                 st.warning("Não foi possível calcular o melhor e pior mês.")
 
+            # Panorama de todas as combinações de strike e prêmio
+            st.subheader("Panorama dos Parâmetros (Strike x Prêmio)")
+            with medir('panorama'):
+                grade = obter_resultado(
+                    'grade_protective_put',
+                    lambda: grade_protective_put(df_dados_historicos['Close'], aporte_mensal, strikes, premios),
+                    tickers=[ticker], dados=df_dados_historicos['Close'],
+                    parametros={'aporte_mensal': aporte_mensal, 'strikes': strikes, 'premios': premios},
+                )
+            tabela = grade.pivot(index='Strike (%)', columns='Prêmio (%)', values='Rentabilidade (%)')
+            grafico = mapa_calor(tabela, 'Rentabilidade acumulada por Strike e Prêmio (x = seleção atual)',
+                                 'Prêmio da put (%)', 'Strike da put (% abaixo do preço)', 'Rentabilidade (%)',
+                                 destaque=(premio_dic[valor_premio], strikes_dic[valor_strike]))
+            with medir('grafico'):
+                exibir(grafico)
+            st.dataframe(tabela.round(2))
+
+            # Rolagem diária: cada opção do ciclo escolhido avaliada sobre os pregões,
+            # sem a amostragem mensal que esconde as quedas no meio do caminho
+            st.subheader("Rolagem Diária ({})".format(CICLOS[ciclo]))
+            taxa, volatilidade_diaria = None, None
+            if modelo_premio == 'Black-Scholes':
+                taxa = taxa_livre/100
+                with medir('volatilidade'):
+                    volatilidade_diaria = volatilidade_nas_datas(volatilidade_ticker(ticker, janela_volatilidade),
+                                                                 diario.index)
+            with medir('rolagem'):
+                rolagem = obter_resultado(
+                    'rolagem_protective_put',
+                    lambda: rolar_protective_put(diario, aporte_mensal, strikes_dic[valor_strike], ciclo,
+                                                 entradas_dic[modo_entrada], premio_dic[valor_premio],
+                                                 taxa, volatilidade_diaria),
+                    tickers=[ticker], dados=(diario, volatilidade_diaria),
+                    parametros={'aporte_mensal': aporte_mensal, 'strike': strikes_dic[valor_strike],
+                                'premio': premio_dic[valor_premio], 'ciclo': ciclo,
+                                'entradas': entradas_dic[modo_entrada], 'taxa': taxa},
+                )
+            if rolagem.empty:
+                st.warning("Período curto demais para uma operação no ciclo escolhido.")
+            else:
+                resumo = resumo_rolagem(rolagem)
+                st.markdown(f"""
+                - Operações avaliadas: **{resumo['Operações']}** ({modo_entrada.lower()})
+                - Total investido: **{moeda} {resumo['Custo Total']:,.2f}**
+                - Lucro líquido: **{moeda} {resumo['Lucro Líquido']:,.2f}**
+                - Rentabilidade acumulada: **{resumo['Rentabilidade (%)']:.2f}%**
+                - Operações com lucro: **{resumo['Operações com Lucro (%)']:.1f}%** (pior operação: **{resumo['Pior Operação (%)']:.2f}%**)
+                - Maior queda da ação entre uma entrada e o vencimento: **{resumo['Pior Queda no Caminho (%)']:.2f}%**
+                """)
+                with medir('grafico'):
+                    exibir(grafico_linhas(rolagem[['Rentabilidade (%)', 'Queda Máxima Ações (%)', 'Queda Máxima Protegida (%)']],
+                                          'Resultado por data de entrada', '%', eixo_x='Data de entrada',
+                                          estilos={'Rentabilidade (%)': {'cor': 'green'},
+                                                   'Queda Máxima Ações (%)': {'cor': 'indianred', 'tracejado': True},
+                                                   'Queda Máxima Protegida (%)': {'cor': 'steelblue', 'tracejado': True}}))
+                tabela_rolagem = rolagem.assign(Vencimento=rolagem['Vencimento'].dt.strftime('%d/%m/%Y'))
+                tabela_rolagem.index = tabela_rolagem.index.strftime('%d/%m/%Y')
+                with st.expander("Todas as operações da rolagem"):
+                    st.dataframe(tabela_rolagem.round(2))
 
             st.markdown("""
                 ---
@@ -239,4 +318,4 @@ if st.button('Simular Estratégia'):
 else:
     st.info('Defina os parâmetros acima e clique em Simular Estratégia.')
 
-
+exibir_medicoes()
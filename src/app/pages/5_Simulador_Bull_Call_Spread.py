@@ -1,56 +1,20 @@
 import streamlit as st
+from componentes.ticker import campo_ticker
 import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
-
-import yfinance as yf
-
-# Cálculos
-# Strike Venda - OTM - Superior
-# Strike Compra - ITM - Inferior
-# Definindo strikes superiores e inferiores da Bull Call Spread
-# strike_compra = preco_compra * 0.95 # ITM - 5% a menos
-# strike_venda = preco_compra * 1.05  # OTM - 5% a mais
-def simular_bull_call(df, aporte_mensal, moeda):
-    df['Strike_OTM'] = df['Close'] * ((100 + strikes_dic[valor_strike_venda])/100)
-    df['Strike_ITM'] = df['Close'] * ((100 - strikes_dic[valor_strike_compra])/100)
-    df['Spread'] = df['Strike_OTM'] - df['Strike_ITM']
-    df['Premio_ITM'] = df['Strike_ITM'] * (premio_dic[valor_premio_itm])/100
-    df['Premio_OTM'] = df['Strike_OTM'] * (premio_dic[valor_premio_otm])/100
-    df['Custo_Estrategia'] = (df['Premio_ITM'] - df['Premio_OTM'])
-    df['Qtd_Contratos'] = aporte_mensal // (df['Custo_Estrategia'] * 100)
-    df['Custo_Total'] = df['Qtd_Contratos'] * df['Custo_Estrategia'] * 100
-    df['Preco_Venda'] = -1.0
-    df['Lucro_Bruto'] = -1.0
-
-
-    valor_final = []
-    for i in range(len(df) - 2):
-        preco_venda = df.loc[df.index[i+1], 'Close']
-        df.loc[df.index[i], 'Preco_Venda'] = round(preco_venda, 2)
-        index = df.index[i]
-        if preco_venda >= df.loc[index, 'Strike_OTM']:
-            df.loc[index, 'Lucro_Bruto'] = df.loc[
-                index, 'Spread'] * 100 * df.loc[
-                    index, 'Qtd_Contratos']
-        elif preco_venda > df.loc[index, 'Strike_ITM']:
-            # df['Spread'] = preco_venda - df['Strike_ITM']
-            df.loc[index, 'Lucro_Bruto'] = (preco_venda - df.loc[
-                index, 'Strike_ITM']) * 100 * df.loc[
-                    index, 'Qtd_Contratos']
-        else:
-            df.loc[index, 'Lucro_Bruto'] = float(0)
-        
-    df['Lucro_Liquido'] = df['Lucro_Bruto'] - df['Custo_Total']
-
-    df = df.iloc[:-2].copy()
-
-    return df
+from dados import metadados, provedores
+from dados.armazenamento import historico_precos
+from estrategias.opcoes import simular_bull_call, grade_bull_call, PREMIO_ITM_PADRAO, PREMIO_OTM_PADRAO
+from estrategias.black_scholes import preco_call, volatilidade_ticker, volatilidade_nas_datas, PRAZO_MENSAL
+from estrategias.rolagem import CICLOS, rolar_bull_call, resumo_rolagem
+from estrategias.cache_resultados import obter_resultado
+from graficos.exibicao import grafico_linhas, mapa_calor, exibir
+from instrumentacao.medicao import medir
+from instrumentacao.painel import iniciar_medicoes, exibir_medicoes
 
 def baixar_dados(ticker):
     try:
-        dados = yf.Ticker(ticker)
-        moeda = dados.get_info()['currency']
+        dados = provedores.ticker(ticker)
+        moeda = metadados.moeda(ticker)
     except:
         raise ValueError("Erro ao procurar o ativo {}. Confira o nome ou substitua por outro.".format(ticker))
     
@@ -58,6 +22,7 @@ def baixar_dados(ticker):
 
 # --- Streamlit
 st.set_page_config(page_title='Simulador Bull Call Spread', layout='centered')
+iniciar_medicoes('Bull Call Spread')
 st.title('Simulador - Estratégia com Opções: Bull Call Spread')
 
 st.markdown('''
@@ -81,10 +46,11 @@ A estratégia busca lucro com **alta moderada do ativo**, limitando tanto o lucr
 - Porcentagem do strike de compra (limite inferior, ITM) (5% abaixo do preço da ação, por padrão)        
 - Porcentagem do prêmio ITM (8% do valor da ação, por padrão)
 - Porcentagem do prêmio OTM (3% do valor da ação, por padrão)
+- Rolagem diária: vencimentos semanais, mensais, na terceira sexta-feira ou no calendário da B3, rolando em cada vencimento ou entrando em todo pregão
 ''')
 
 # Entradas do usuário
-ticker = st.text_input('Ticker da Ação (ex: PETR4.SA, VALE3.SA, AAPL)', value='PETR4.SA')
+ticker = campo_ticker('Ticker da Ação (ex: PETR4.SA, VALE3.SA, AAPL)', valor='PETR4.SA')
 
 # Lista de périodo predefinidas
 opcao = ['6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
@@ -128,37 +94,83 @@ premio_dic = dict(zip(legenda_premio, premios))
 valor_premio_itm = st.select_slider(
     'Selecione a porcentagem (%) do prêmio ITM:',
     options=legenda_strike,
-    value='8' # Valor Inicial
+    value=str(PREMIO_ITM_PADRAO) # Valor Inicial
 )
 
 valor_premio_otm = st.select_slider(
     'Selecione a porcentagem (%) do prêmio OTM:',
     options=legenda_strike,
-    value='3' # Valor Inicial
+    value=str(PREMIO_OTM_PADRAO) # Valor Inicial
 )
 
+# Modelo de precificação do prêmio
+modelo_premio = st.radio('Modelo do prêmio:', ['Percentual fixo', 'Black-Scholes'], horizontal=True)
+if modelo_premio == 'Black-Scholes':
+    st.caption('O prêmio é calculado por Black-Scholes com a volatilidade histórica do ativo; os sliders de prêmio são ignorados.')
+    taxa_livre = st.number_input('Taxa livre de risco (% ao ano):', min_value=0.0, value=10.0, step=0.25)
+    janela_volatilidade = st.slider('Janela da volatilidade histórica (pregões):', 10, 252, 21)
 
+# Rolagem diária com vencimentos configuráveis
+ciclo = st.selectbox('Vencimentos da rolagem diária:', list(CICLOS), index=list(CICLOS).index('b3'), format_func=CICLOS.get)
+modo_entrada = st.radio('Entradas da rolagem diária:', ['Rolar em cada vencimento', 'Todo pregão'], horizontal=True)
+entradas_dic = {'Rolar em cada vencimento': 'vencimentos', 'Todo pregão': 'diarias'}
 
 
-if st.button('Simular Estratégia'):
+
+if st.button('Simular Estratégia', disabled=ticker is None):
     with st.spinner('Executando simulação da estratégia Bull Call Spread...'):
         try:
             ticker = ticker.upper()
-            dados = baixar_dados(ticker)
-            df_dados_historicos = dados.history(opcoes_dic[periodo])['Close'].resample('ME').last()
-            moeda = dados.get_info()['currency']   
+            with medir('download'):
+                dados = baixar_dados(ticker)
+            with medir('historico'):
+                diario = historico_precos(ticker, opcoes_dic[periodo])['Close']
+                df_dados_historicos = diario.resample('ME').last()
+            with medir('informacoes'):
+                moeda = metadados.moeda(ticker)   
             # Converter para Dataframe
             df_dados_historicos = pd.DataFrame(df_dados_historicos)
 
-            df_resultado = simular_bull_call(df_dados_historicos, aporte_mensal, moeda)
+            premios_bs = None
+            rotulos_premio = ('Prêmio ITM {}%'.format(premio_dic[valor_premio_itm]),
+                              'Prêmio OTM {}%'.format(premio_dic[valor_premio_otm]))
+            descricoes_premio = ('{}% do preço da ação'.format(valor_premio_itm),
+                                 '{}% do preço da ação'.format(valor_premio_otm))
+            if modelo_premio == 'Black-Scholes':
+                close = df_dados_historicos['Close'].to_numpy()
+                with medir('volatilidade'):
+                    volatilidade = volatilidade_nas_datas(volatilidade_ticker(ticker, janela_volatilidade),
+                                                          df_dados_historicos.index)
+                # Os dois strikes são precificados em uma única chamada vetorizada
+                strikes_bs = close * [[(100 - strikes_dic[valor_strike_compra])/100],
+                                      [(100 + strikes_dic[valor_strike_venda])/100]]
+                premios_bs = preco_call(close, strikes_bs, PRAZO_MENSAL, taxa_livre/100, volatilidade)
+                rotulos_premio = ('Prêmio ITM (Black-Scholes)', 'Prêmio OTM (Black-Scholes)')
+                descricoes_premio = ('Black-Scholes (taxa livre de {}% a.a., volatilidade de {} pregões)'.format(
+                    taxa_livre, janela_volatilidade),) * 2
+
+            with medir('estrategia'):
+                df_resultado = obter_resultado(
+                    'bull_call',
+                    lambda: simular_bull_call(
+                        df_dados_historicos, aporte_mensal, moeda,
+                        strikes_dic[valor_strike_venda], strikes_dic[valor_strike_compra],
+                        premio_dic[valor_premio_itm], premio_dic[valor_premio_otm], premios=premios_bs,
+                    ),
+                    tickers=[ticker], dados=(df_dados_historicos, premios_bs),
+                    parametros={'aporte_mensal': aporte_mensal, 'moeda': moeda,
+                                'strike_venda': strikes_dic[valor_strike_venda],
+                                'strike_compra': strikes_dic[valor_strike_compra],
+                                'premio_itm': premio_dic[valor_premio_itm], 'premio_otm': premio_dic[valor_premio_otm]},
+                )
 
             # Tabela de Operações# Renomeando colunas para impressão da tabela
             df_resultado = df_resultado.rename(columns={
                 'Close': 'Preço de Compra ({})'.format(moeda),
                 'Strike_ITM': 'Strike Inferior(ITM) {}%'.format(strikes_dic[valor_strike_compra]),
                 'Strike_OTM': 'Strike Superior(OTM) {}%'.format(strikes_dic[valor_strike_venda]),
-                'Premio_ITM': 'Prêmio ITM {}%'.format(premio_dic[valor_premio_itm]),
-                'Premio_OTM': 'Prêmio OTM {}%'.format(premio_dic[valor_premio_otm]),
+                'Premio_ITM': rotulos_premio[0],
+                'Premio_OTM': rotulos_premio[1],
                 'Custo_Estrategia': 'Custo da Estratégia',
                 'Qtd_Contratos':'# de Contratos',
                 'Custo_Total': 'Custo Total',
@@ -168,6 +180,7 @@ if st.button('Simular Estratégia'):
             })
 
             df_resultado.index.names = ['Data']
+            datas = df_resultado.index
             df_resultado.index = df_resultado.index.strftime('%d/%m/%Y')
             st.subheader('Resultado da Simulação - Bull Call Spread')
             st.dataframe(df_resultado.round(2))
@@ -201,8 +214,8 @@ if st.button('Simular Estratégia'):
             - Estratégia utilizada: **Bull Call Spread**
             - Strike de compra (ITM): **{valor_strike_compra}% abaixo** do preço da ação
             - Strike de venda (OTM): **{valor_strike_venda}% acima** do preço da ação
-            - Prêmio ITM: **{valor_premio_itm}%** do preço da ação
-            - Prêmio OTM: **{valor_premio_otm}%** do preço da ação
+            - Prêmio ITM: **{descricoes_premio[0]}**
+            - Prêmio OTM: **{descricoes_premio[1]}**
 
             **Resumo do desempenho:**
             - Meses com **lucro líquido positivo**: **{meses_lucrativos}**
@@ -244,18 +257,83 @@ if st.button('Simular Estratégia'):
             )
 
              # Gráfico
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.plot(df_resultado.index, df_resultado['Lucro_Bruto'].cumsum(),
-                    label='Saldo Acumulado', color='green')
-            ax.plot(df_resultado.index, df_resultado['Custo_Total'].cumsum(),
-                    label='Investimento Total', color='gray', linestyle='--')
-            ax.set_title('Simulação - Estratégia Bull Call Spread')
-            ax.set_ylabel('{}'.format(moeda))
-            ax.grid(True)
-            ax.legend()
-            st.pyplot(fig)
-
-
+            evolucao = pd.DataFrame({
+                'Saldo Acumulado': df_resultado['Lucro Bruto ({})'.format(moeda)].cumsum().to_numpy(),
+                'Investimento Total': df_resultado['Custo Total'].cumsum().to_numpy(),
+            }, index=datas)
+            grafico = grafico_linhas(evolucao, 'Simulação - Estratégia Bull Call Spread', '{}'.format(moeda),
+                                     estilos={'Saldo Acumulado': {'cor': 'green'},
+                                              'Investimento Total': {'cor': 'gray', 'tracejado': True}})
+            with medir('grafico'):
+                exibir(grafico)
+
+            # Panorama de todas as combinações dos quatro parâmetros
+            st.subheader("Panorama dos Parâmetros")
+            with medir('panorama'):
+                grade = obter_resultado(
+                    'grade_bull_call',
+                    lambda: grade_bull_call(df_dados_historicos['Close'], aporte_mensal, strikes, strikes, premios, premios),
+                    tickers=[ticker], dados=df_dados_historicos['Close'],
+                    parametros={'aporte_mensal': aporte_mensal, 'strikes': strikes, 'premios': premios},
+                )
+            selecao = grade[(grade['Prêmio ITM (%)'] == premio_dic[valor_premio_itm]) &
+                            (grade['Prêmio OTM (%)'] == premio_dic[valor_premio_otm])]
+            tabela = selecao.pivot(index='Strike Compra (%)', columns='Strike Venda (%)', values='Rentabilidade (%)')
+            grafico = mapa_calor(tabela, 'Rentabilidade por Strike (prêmios ITM {}% e OTM {}%, x = seleção atual)'.format(
+                                     valor_premio_itm, valor_premio_otm),
+                                 'Strike de venda (% acima do preço, OTM)', 'Strike de compra (% abaixo do preço, ITM)',
+                                 'Rentabilidade (%)',
+                                 destaque=(strikes_dic[valor_strike_venda], strikes_dic[valor_strike_compra]))
+            with medir('grafico'):
+                exibir(grafico)
+
+            st.markdown("**Melhores combinações entre todas as {} avaliadas:**".format(grade['Lucro Líquido'].notna().sum()))
+            st.dataframe(grade.dropna().sort_values('Rentabilidade (%)', ascending=False).head(10).round(2))
+
+            # Rolagem diária: cada opção do ciclo escolhido avaliada sobre os pregões,
+            # sem a amostragem mensal que esconde as quedas no meio do caminho
+            st.subheader("Rolagem Diária ({})".format(CICLOS[ciclo]))
+            taxa, volatilidade_diaria = None, None
+            if modelo_premio == 'Black-Scholes':
+                taxa = taxa_livre/100
+                with medir('volatilidade'):
+                    volatilidade_diaria = volatilidade_nas_datas(volatilidade_ticker(ticker, janela_volatilidade),
+                                                                 diario.index)
+            with medir('rolagem'):
+                rolagem = obter_resultado(
+                    'rolagem_bull_call',
+                    lambda: rolar_bull_call(diario, aporte_mensal, strikes_dic[valor_strike_venda],
+                                            strikes_dic[valor_strike_compra], ciclo, entradas_dic[modo_entrada],
+                                            premio_dic[valor_premio_itm], premio_dic[valor_premio_otm],
+                                            taxa, volatilidade_diaria),
+                    tickers=[ticker], dados=(diario, volatilidade_diaria),
+                    parametros={'aporte_mensal': aporte_mensal,
+                                'strike_venda': strikes_dic[valor_strike_venda],
+                                'strike_compra': strikes_dic[valor_strike_compra],
+                                'premio_itm': premio_dic[valor_premio_itm], 'premio_otm': premio_dic[valor_premio_otm],
+                                'ciclo': ciclo, 'entradas': entradas_dic[modo_entrada], 'taxa': taxa},
+                )
+            if rolagem.empty:
+                st.warning("Período curto demais para uma operação no ciclo escolhido.")
+            else:
+                resumo = resumo_rolagem(rolagem)
+                st.markdown(f"""
+                - Operações avaliadas: **{resumo['Operações']}** ({modo_entrada.lower()})
+                - Total investido: **{moeda} {resumo['Custo Total']:,.2f}**
+                - Lucro líquido: **{moeda} {resumo['Lucro Líquido']:,.2f}**
+                - Rentabilidade acumulada: **{resumo['Rentabilidade (%)']:.2f}%**
+                - Operações com lucro: **{resumo['Operações com Lucro (%)']:.1f}%** (pior operação: **{resumo['Pior Operação (%)']:.2f}%**)
+                - Maior queda da ação entre uma entrada e o vencimento: **{resumo['Pior Queda no Caminho (%)']:.2f}%**
+                """)
+                with medir('grafico'):
+                    exibir(grafico_linhas(rolagem[['Rentabilidade (%)', 'Queda Máxima Ações (%)']],
+                                          'Resultado por data de entrada', '%', eixo_x='Data de entrada',
+                                          estilos={'Rentabilidade (%)': {'cor': 'green'},
+                                                   'Queda Máxima Ações (%)': {'cor': 'indianred', 'tracejado': True}}))
+                tabela_rolagem = rolagem.assign(Vencimento=rolagem['Vencimento'].dt.strftime('%d/%m/%Y'))
+                tabela_rolagem.index = tabela_rolagem.index.strftime('%d/%m/%Y')
+                with st.expander("Todas as operações da rolagem"):
+                    st.dataframe(tabela_rolagem.round(2))
 
 
             st.markdown("""
@@ -282,3 +360,5 @@ if st.button('Simular Estratégia'):
 
 else:
     st.info('Defina os parâmetros acima e clique em Simular Estratégia.')
+
+exibir_medicoes()
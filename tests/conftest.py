@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Os módulos do app são importados como no `streamlit run src/app/Home.py`.
+# O cache vai para um diretório temporário e as coletas em segundo plano
+# (earnings, lista de ativos) ficam desligadas: os testes não usam a rede.
+# As variáveis precisam estar definidas antes da primeira importação.
+os.environ['SIMULADOR_CACHE'] = tempfile.mkdtemp(prefix='simulador-testes-')
+os.environ['SIMULADOR_ATUALIZACOES'] = '0'
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src' / 'app'))
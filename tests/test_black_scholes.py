@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dados import provedores
+from estrategias import black_scholes
+from estrategias.black_scholes import preco_call, preco_put, volatilidade_ticker
+
+
+def _historico(fator):
+    datas = pd.bdate_range('2020-01-01', periods=300)
+    close = 10 * np.exp(np.cumsum(np.random.default_rng(3).normal(0, 0.02, len(datas))))
+    # Nova base de ajuste: preços antigos mudam, o último pregão não
+    close[:-1] *= np.linspace(fator, 1, len(datas) - 1)
+    return pd.DataFrame({'Close': close}, index=datas)
+
+
+@pytest.fixture
+def historicos(monkeypatch):
+    atuais = {}
+    monkeypatch.setattr(black_scholes, 'historico_precos', lambda ticker, periodo: atuais[ticker])
+    monkeypatch.setattr(black_scholes, '_volatilidades', black_scholes.OrderedDict())
+    return atuais
+
+
+def test_volatilidade_recalculada_com_nova_base_de_ajuste(historicos):
+    historicos['PETR4.SA'] = _historico(1.0)
+    antes = volatilidade_ticker('PETR4.SA')
+    assert volatilidade_ticker('PETR4.SA') is antes
+
+    historicos['PETR4.SA'] = _historico(0.5)
+    depois = volatilidade_ticker('PETR4.SA')
+    esperado = black_scholes.volatilidade_historica(historicos['PETR4.SA']['Close'], 21, 5).fillna(0.30)
+    pd.testing.assert_series_equal(depois, esperado)
+    assert not np.allclose(depois, antes)
+
+
+def test_volatilidade_separada_por_provedor(historicos, monkeypatch):
+    historicos['VALE3.SA'] = _historico(1.0)
+    monkeypatch.setattr(provedores, '_provedor', provedores.ProvedorSintetico())
+    sintetico = volatilidade_ticker('VALE3.SA')
+    monkeypatch.setattr(provedores, '_provedor', provedores.ProvedorGravacao(reproduzir=True))
+    assert volatilidade_ticker('VALE3.SA') is not sintetico
+    assert len(black_scholes._volatilidades) == 2
+
+
+def test_cache_de_volatilidade_limitado(historicos):
+    for i in range(black_scholes.HISTORICOS_EM_MEMORIA + 5):
+        historicos['T{}'.format(i)] = _historico(1.0)
+        volatilidade_ticker('T{}'.format(i))
+    assert len(black_scholes._volatilidades) == black_scholes.HISTORICOS_EM_MEMORIA
+    assert ('T0' not in {chave[1] for chave in black_scholes._volatilidades})
+
+
+def test_paridade_put_call():
+    preco, strike = np.array([80.0, 100.0, 120.0]), 100.0
+    call = preco_call(preco, strike, 0.25, 0.10, 0.3)
+    put = preco_put(preco, strike, 0.25, 0.10, 0.3)
+    np.testing.assert_allclose(call - put, preco - strike * np.exp(-0.10 * 0.25))
+    # Sem volatilidade o prêmio é o valor intrínseco descontado
+    np.testing.assert_allclose(preco_call(preco, strike, 0.25, 0.10, 0.0),
+                               np.maximum(preco - strike * np.exp(-0.10 * 0.25), 0))
@@ -0,0 +1,49 @@
+import pickle
+
+import pandas as pd
+
+from estrategias.cache_resultados import CacheResultados
+
+
+class _Executa:
+    def __reduce__(self):
+        return (pd.DataFrame, ({'invadido': [1]},))
+
+
+def _cache(tmp_path):
+    # Um item só na memória: o segundo resultado despeja o primeiro no disco
+    return CacheResultados(max_itens=1, max_bytes_disco=2 ** 20, diretorio=tmp_path)
+
+
+def test_resultado_despejado_volta_do_disco(tmp_path):
+    cache = _cache(tmp_path)
+    resultado = pd.DataFrame({'Capital': [1.0, 2.0]})
+    cache.obter('teste', lambda: resultado, parametros={'n': 1})
+    cache.obter('teste', lambda: 0, parametros={'n': 2})
+
+    obtido = cache.obter('teste', lambda: None, parametros={'n': 1})
+    pd.testing.assert_frame_equal(obtido, resultado)
+    assert cache.estatisticas()['acertos_disco'] == 1
+
+
+def test_arquivos_alheios_nao_sao_lidos(tmp_path):
+    cache = _cache(tmp_path)
+    cache.obter('teste', lambda: 1, parametros={'n': 1})
+    cache.obter('teste', lambda: 2, parametros={'n': 2})
+    outro = _cache(tmp_path)
+
+    # Arquivo adulterado depois da gravação e arquivo de outro processo
+    # com a mesma chave: os dois são recalculados, sem pickle.loads
+    for arquivo in tmp_path.glob('*.pkl'):
+        arquivo.write_bytes(pickle.dumps(_Executa()))
+    assert cache.obter('teste', lambda: 'novo', parametros={'n': 1}) == 'novo'
+    assert outro.obter('teste', lambda: 'novo', parametros={'n': 1}) == 'novo'
+    assert cache.estatisticas()['acertos_disco'] == 0
+
+
+def test_orcamento_de_disco(tmp_path):
+    cache = CacheResultados(max_itens=1, max_bytes_disco=3000, diretorio=tmp_path)
+    for n in range(10):
+        cache.obter('teste', lambda: b'x' * 1000, parametros={'n': n})
+    assert sum(a.stat().st_size for a in tmp_path.glob('*.pkl')) <= 3000
+    assert len(list(tmp_path.glob('*.pkl'))) == 2
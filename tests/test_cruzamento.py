@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from estrategias.cruzamento import (
+    COMPRA, VENDA, _capitais_bloco, estrategia_cruzamento, inicios_moveis, resumo_cruzamento,
+    sinais_cruzamento,
+)
+
+
+# Laço da versão original da página (pages/2_Simulador_Tecnico.py), com as
+# janelas como parâmetros
+def _referencia(df, capital_inicial, curta=20, longa=50):
+    df = df.copy()
+    df['MM{}'.format(curta)] = df['Close'].rolling(window=curta).mean()
+    df['MM{}'.format(longa)] = df['Close'].rolling(window=longa).mean()
+    df.dropna(inplace=True)
+    mm_curta, mm_longa = df['MM{}'.format(curta)], df['MM{}'.format(longa)]
+
+    comprado = False
+    capital = capital_inicial
+    qtd_acoes = 0
+    historico = []
+    for i in range(1, len(df)):
+        if not comprado and mm_curta.iloc[i] > mm_longa.iloc[i] and mm_curta.iloc[i-1] <= mm_longa.iloc[i-1]:
+            preco = df['Close'].iloc[i]
+            qtd_acoes = capital // preco
+            capital -= qtd_acoes * preco
+            historico.append((df.index[i], "Compra", preco, qtd_acoes, capital))
+            comprado = True
+        elif comprado and mm_curta.iloc[i] < mm_longa.iloc[i] and mm_curta.iloc[i-1] >= mm_longa.iloc[i-1]:
+            preco = df['Close'].iloc[i]
+            capital += qtd_acoes * preco
+            historico.append((df.index[i], "Venda", preco, qtd_acoes, capital))
+            qtd_acoes = 0
+            comprado = False
+
+    if comprado:
+        preco = df['Close'].iloc[-1]
+        capital += qtd_acoes * preco
+        historico.append((df.index[-1], "Venda Final", preco, qtd_acoes, capital))
+
+    return df, historico, capital
+
+
+# Passeio aleatório com trechos de preço constante: as médias se encostam
+# (diferença zero) e voltam a se afastar para o mesmo lado, gerando
+# cruzamentos repetidos na mesma direção
+def _precos(pregoes, semente):
+    aleatorio = np.random.default_rng(semente)
+    close = 30 * np.exp(np.cumsum(aleatorio.normal(0, 0.02, pregoes)))
+    for inicio in aleatorio.choice(pregoes - 120, 4, replace=False):
+        close[inicio:inicio + 80] = close[inicio]
+    return pd.DataFrame({'Close': np.round(close, 2), 'Volume': aleatorio.integers(1, 1000, pregoes)},
+                        index=pd.bdate_range('2005-01-03', periods=pregoes))
+
+
+@pytest.mark.parametrize('semente', range(6))
+@pytest.mark.parametrize('curta,longa', [(20, 50), (5, 12), (3, 4)])
+def test_igual_ao_laco_original(semente, curta, longa):
+    df = _precos(1500, semente)
+    original = df.copy()
+    df_esperado, historico, capital_esperado = _referencia(df, 10_000, curta, longa)
+    df_obtido, operacoes, capital = estrategia_cruzamento(df, 10_000, curta, longa)
+
+    pd.testing.assert_frame_equal(df, original)
+    pd.testing.assert_frame_equal(df_obtido, df_esperado, check_freq=False)
+    assert list(operacoes.itertuples(index=False, name=None)) == historico
+    assert capital == capital_esperado
+
+    resumo = resumo_cruzamento(df['Close'], 10_000, curta, longa)
+    assert resumo[0] == capital_esperado and resumo[1] == len(historico)
+
+
+# Estado inicial zerado: um cruzamento para baixo antes de qualquer compra
+# não gera venda, e cruzamentos repetidos para cima só compram uma vez
+def test_sinais_a_partir_de_zerado():
+    curta = np.array([2, 1, 1, 2, 2, 3, 1, 0, 2, 3, 1, 2, 0], dtype=float)
+    longa = np.array([1, 1, 2, 2, 1, 2, 2, 2, 1, 1, 1, 1, 1], dtype=float)
+    # diferença: 1, 0, -1, 0, 1, 1, -1, -2, 1, 2, 0, 1, -1
+    indices, tipos = sinais_cruzamento(curta, longa)
+    assert indices.tolist() == [4, 6, 8, 12]
+    assert tipos.tolist() == [COMPRA, VENDA, COMPRA, VENDA]
+
+    # Sem nenhum cruzamento para cima, nada acontece
+    indices, tipos = sinais_cruzamento(longa[::-1] - 5, longa[::-1])
+    assert len(indices) == 0
+
+
+def test_varredura_igual_a_cada_par():
+    close = _precos(800, 11)['Close']
+    curtas, longas = [3, 5, 10], [4, 10, 30, 900]
+    capitais = _capitais_bloco(close.to_numpy(), curtas, longas, 1000)
+    for i, curta in enumerate(curtas):
+        for j, longa in enumerate(longas):
+            if longa <= curta or longa > len(close):
+                assert np.isnan(capitais[i, j])
+            else:
+                assert capitais[i, j] == _referencia(close.to_frame(), 1000, curta, longa)[2]
+
+
+def test_inicios_moveis_igual_ao_laco_em_cada_inicio():
+    df = _precos(700, 3)
+    resultado = inicios_moveis(df['Close'], 1000, 5, 12, passo=97)
+    medias = df['Close'].rolling(12).mean()
+    for inicio, linha in resultado.iterrows():
+        # A partir do início as médias já vêm da série inteira
+        trecho = df.loc[inicio:]
+        posicao = df.index.get_loc(inicio)
+        mm_curta = df['Close'].rolling(5).mean().iloc[posicao:]
+        assert not np.isnan(medias.iloc[posicao])
+        comprado, capital, qtd, operacoes = False, 1000, 0, 0
+        for i in range(1, len(trecho)):
+            cima = mm_curta.iloc[i] > medias.iloc[posicao + i] and mm_curta.iloc[i-1] <= medias.iloc[posicao + i - 1]
+            baixo = mm_curta.iloc[i] < medias.iloc[posicao + i] and mm_curta.iloc[i-1] >= medias.iloc[posicao + i - 1]
+            if not comprado and cima:
+                qtd = capital // trecho['Close'].iloc[i]
+                capital -= qtd * trecho['Close'].iloc[i]
+                comprado, operacoes = True, operacoes + 1
+            elif comprado and baixo:
+                capital += qtd * trecho['Close'].iloc[i]
+                comprado, operacoes = False, operacoes + 1
+        if comprado:
+            capital += qtd * trecho['Close'].iloc[-1]
+            operacoes += 1
+        assert linha['Capital Final'] == pytest.approx(capital)
+        assert linha['Operações'] == operacoes
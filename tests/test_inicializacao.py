@@ -0,0 +1,16 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('streamlit')
+
+SCRIPT = Path(__file__).resolve().parents[1] / 'benchmarks' / 'inicializacao.py'
+
+
+# Orçamento da primeira pintura (300 ms no container aquecido) para todas as
+# páginas; o script sai com código 1 se alguma passar
+def test_primeira_pintura_dentro_do_orcamento():
+    execucao = subprocess.run([sys.executable, str(SCRIPT)], capture_output=True, text=True, timeout=600)
+    assert execucao.returncode == 0, execucao.stdout + execucao.stderr
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from estrategias.momentum import simular_momentum
+
+
+# Laço da versão original da página, generalizado para k, janela e
+# manutenção: retorno da janela pelos fechamentos (com o último preço
+# conhecido), ativos sem preço na janela de fora e o capital dividido
+# entre os escolhidos
+def _referencia(df, capital_inicial, k, janela, manutencao):
+    historico = []
+    cheio = df.ffill()
+    for i in range(janela, len(df) - manutencao, manutencao):
+        retornos = cheio.iloc[i - 1] / cheio.iloc[i - janela] - 1
+        escolhidos = retornos.dropna().sort_values(ascending=False).head(k).index.tolist()
+        for ativo in escolhidos:
+            alocacao = capital_inicial / len(escolhidos)
+            preco_compra = df[ativo].iloc[i]
+            qtd = alocacao // preco_compra
+            restante = alocacao - (qtd * preco_compra)
+            preco_venda = df[ativo].iloc[i + manutencao]
+            historico.append({
+                'Data': df.index[i],
+                'Ativo': ativo,
+                'Alocação': round(alocacao, 2),
+                'Preço Compra': round(preco_compra, 2),
+                'Investimento Real': round(qtd * preco_compra, 2),
+                'Qtd': qtd,
+                'Restante Alocação': round(restante, 2),
+                'Preço Venda': round(preco_venda, 2),
+                'Saldo Venda': round(qtd * preco_venda, 2),
+                'Rendimento (em %)': round((preco_venda - preco_compra) / preco_compra * 100, 2),
+                'Saldo Final': round(restante + qtd * preco_venda, 2),
+            })
+    return pd.DataFrame(historico)
+
+
+def _precos(meses, ativos, semente):
+    aleatorio = np.random.default_rng(semente)
+    retornos = aleatorio.normal(0.01, 0.08, (meses, ativos))
+    return pd.DataFrame(20 * np.exp(np.cumsum(retornos, axis=0)),
+                        index=pd.date_range('2010-01-31', periods=meses, freq='ME'),
+                        columns=['ATIVO{}'.format(i) for i in range(ativos)])
+
+
+@pytest.mark.parametrize('k,janela,manutencao', [(2, 2, 1), (1, 3, 1), (3, 2, 2), (4, 6, 3), (10, 2, 1)])
+def test_igual_ao_laco_original(k, janela, manutencao):
+    df = _precos(60, 6, k * 100 + janela * 10 + manutencao)
+    historico, recomendacao = simular_momentum(df, 500, k, janela, manutencao)
+    esperado = _referencia(df, 500, k, janela, manutencao)
+    pd.testing.assert_frame_equal(historico, esperado, check_dtype=False)
+
+    # A recomendação usa a janela que termina no penúltimo fechamento
+    cheio = df.ffill()
+    ultimos = (cheio.iloc[-2] / cheio.iloc[-1 - janela] - 1).sort_values(ascending=False)
+    assert recomendacao == (df.index[-1], ultimos.head(k).index.tolist())
+
+
+# Ativos que só começam a ser negociados no meio do período: enquanto menos
+# de k têm preço na janela, o capital vai todo para os que têm
+def test_menos_ativos_com_preco_que_k():
+    df = _precos(36, 4, 7)
+    df.iloc[:12, 1] = np.nan
+    df.iloc[:20, 2:] = np.nan
+    historico, recomendacao = simular_momentum(df, 1000, k=3, janela=2, manutencao=1)
+
+    assert np.isfinite(historico.select_dtypes('number').to_numpy()).all()
+    pd.testing.assert_frame_equal(historico, _referencia(df, 1000, 3, 2, 1), check_dtype=False)
+    por_data = historico.groupby('Data')['Alocação']
+    assert np.allclose(por_data.sum(), 1000, atol=0.02)
+    assert por_data.size().iloc[0] == 1 and por_data.size().iloc[-1] == 3
+    assert len(recomendacao[1]) == 3
+
+    # Nenhum ativo com preço na janela: os meses ficam sem operações até a
+    # primeira janela completa (fechamentos 3 e 4, compra no 5)
+    df.iloc[:3] = np.nan
+    historico, _ = simular_momentum(df, 1000, k=3, janela=2, manutencao=1)
+    assert historico['Data'].min() == df.index[5]
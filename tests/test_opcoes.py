@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from estrategias.opcoes import grade_bull_call, grade_protective_put, protective_put, simular_bull_call
+
+
+# Laços da versão original das páginas 4 e 5, com os percentuais como
+# parâmetros no lugar dos dicionários dos sliders
+def _protective_put_original(df, aporte_mensal, moeda, strike_pct, premio_pct):
+    df['Strike'] = df['Close'] * (100 - strike_pct)/100
+    df['Premio'] = df['Close'] * (premio_pct)/100
+    df['Qtd_Acoes'] = aporte_mensal // df['Close']
+    df['Custo_Acoes'] = df['Qtd_Acoes'] * df['Close']
+    df['Custo_Put'] = df['Qtd_Acoes'] * df['Premio']
+    df['Custo_Total'] = df['Custo_Acoes'] + df['Custo_Put']
+    df['Preço de Venda ({})'.format(moeda)] = 1.0
+
+    valor_final = []
+    for i in range(len(df) - 2):
+        preco_venda = df.loc[df.index[i+1], 'Close']
+        df.loc[df.index[i], 'Preço de Venda ({})'.format(moeda)] = round(preco_venda, 2)
+        strike = df.loc[df.index[i], 'Strike']
+        qtd = df.loc[df.index[i], 'Qtd_Acoes']
+        lucro_put = max(0, strike - preco_venda) * qtd
+        valor_acoes = preco_venda * qtd
+        valor_final.append(valor_acoes + lucro_put)
+
+    df = df.iloc[:-2].copy()
+    df['Valor_Final'] = valor_final
+    df['Lucro_Liquido'] = df['Valor_Final'] - df['Custo_Total']
+    return df
+
+
+def _bull_call_original(df, aporte_mensal, strike_venda_pct, strike_compra_pct, premio_itm_pct, premio_otm_pct):
+    df['Strike_OTM'] = df['Close'] * ((100 + strike_venda_pct)/100)
+    df['Strike_ITM'] = df['Close'] * ((100 - strike_compra_pct)/100)
+    df['Spread'] = df['Strike_OTM'] - df['Strike_ITM']
+    df['Premio_ITM'] = df['Strike_ITM'] * (premio_itm_pct)/100
+    df['Premio_OTM'] = df['Strike_OTM'] * (premio_otm_pct)/100
+    df['Custo_Estrategia'] = (df['Premio_ITM'] - df['Premio_OTM'])
+    df['Qtd_Contratos'] = aporte_mensal // (df['Custo_Estrategia'] * 100)
+    df['Custo_Total'] = df['Qtd_Contratos'] * df['Custo_Estrategia'] * 100
+    df['Preco_Venda'] = -1.0
+    df['Lucro_Bruto'] = -1.0
+
+    for i in range(len(df) - 2):
+        preco_venda = df.loc[df.index[i+1], 'Close']
+        df.loc[df.index[i], 'Preco_Venda'] = round(preco_venda, 2)
+        index = df.index[i]
+        if preco_venda >= df.loc[index, 'Strike_OTM']:
+            df.loc[index, 'Lucro_Bruto'] = df.loc[index, 'Spread'] * 100 * df.loc[index, 'Qtd_Contratos']
+        elif preco_venda > df.loc[index, 'Strike_ITM']:
+            df.loc[index, 'Lucro_Bruto'] = (preco_venda - df.loc[index, 'Strike_ITM']) * 100 * df.loc[index, 'Qtd_Contratos']
+        else:
+            df.loc[index, 'Lucro_Bruto'] = float(0)
+
+    df['Lucro_Liquido'] = df['Lucro_Bruto'] - df['Custo_Total']
+    df = df.iloc[:-2].copy()
+    return df
+
+
+# Fechamentos mensais com quedas fortes, para que as puts e os strikes
+# ITM sejam atingidos
+def _mensal(meses, semente):
+    aleatorio = np.random.default_rng(semente)
+    close = 25 * np.exp(np.cumsum(aleatorio.normal(0, 0.12, meses)))
+    return pd.DataFrame({'Close': close}, index=pd.date_range('2015-01-31', periods=meses, freq='ME'))
+
+
+@pytest.mark.parametrize('strike_pct,premio_pct', [(0, 2), (5, 1), (10, 4)])
+def test_protective_put_igual_ao_laco_original(strike_pct, premio_pct):
+    df = _mensal(60, strike_pct)
+    esperado = _protective_put_original(df.copy(), 1000, 'BRL', strike_pct, premio_pct)
+    obtido = protective_put(df.copy(), 1000, 'BRL', strike_pct, premio_pct)
+
+    # Os dois últimos meses ficam de fora
+    assert obtido.index.equals(df.index[:-2])
+    pd.testing.assert_frame_equal(obtido, esperado, check_freq=False)
+    assert (obtido['Valor_Final'] > obtido['Qtd_Acoes'] * obtido['Preço de Venda (BRL)'] + 1e-9).any()
+
+
+@pytest.mark.parametrize('parametros', [(5, 5, 7, 3), (10, 2, 8, 2), (2, 10, 12, 1)])
+def test_bull_call_igual_ao_laco_original(parametros):
+    df = _mensal(60, sum(parametros))
+    esperado = _bull_call_original(df.copy(), 1000, *parametros)
+    obtido = simular_bull_call(df.copy(), 1000, 'BRL', *parametros)
+
+    assert obtido.index.equals(df.index[:-2])
+    pd.testing.assert_frame_equal(obtido, esperado, check_freq=False)
+    # Há meses abaixo do strike ITM, entre os strikes e acima do OTM
+    venda = df['Close'].to_numpy()[1:-1]
+    assert (venda <= obtido['Strike_ITM']).any() and (venda >= obtido['Strike_OTM']).any()
+
+
+def test_grades_iguais_a_cada_simulacao():
+    df = _mensal(48, 1)
+    grade = grade_protective_put(df['Close'], 1000, [0, 5, 10], [1, 3])
+    for linha in grade.itertuples(index=False):
+        simulado = protective_put(df.copy(), 1000, 'BRL', linha[0], linha[1])
+        assert linha[2] == pytest.approx(simulado['Custo_Total'].sum())
+        assert linha[3] == pytest.approx(simulado['Valor_Final'].sum())
+
+    grade = grade_bull_call(df['Close'], 1000, [2, 5], [5, 10], [7, 9], [1, 3])
+    assert len(grade) == 16
+    for linha in grade.itertuples(index=False):
+        simulado = simular_bull_call(df.copy(), 1000, 'BRL', *linha[:4])
+        if (simulado['Custo_Estrategia'] <= 0).any():
+            assert np.isnan(linha[4])
+            continue
+        assert linha[4] == pytest.approx(simulado['Custo_Total'].sum())
+        assert linha[5] == pytest.approx(simulado['Lucro_Bruto'].sum())
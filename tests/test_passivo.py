@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from estrategias.passivo import _saldos, grade_passivo, saldo_passivo, simular_passivo, taxa_mensal
+
+
+# Laço da versão original da página 1: o saldo é arredondado todo mês
+def _simular_passivo_original(inicial, mensal, anos, taxa):
+    taxa_mensal = (1 + taxa / 100) ** (1 / 12) - 1
+    saldo = [inicial]
+    for _ in range(anos * 12):
+        resultado = saldo[-1] * (1 + taxa_mensal) + mensal
+        saldo.append(round(resultado, 2))
+    return saldo
+
+
+# A fórmula fechada arredonda só o resultado. Cada arredondamento mensal do
+# laço erra até meio centavo, e o erro do mês k rende juros até o fim: a
+# diferença fica abaixo de 0,005 vezes a anuidade dos meses restantes, mais
+# o meio centavo do arredondamento final.
+def _tolerancia(anos, taxa):
+    meses = np.arange(anos * 12 + 1)
+    return 0.005 * saldo_passivo(0, 1, meses, taxa) + 0.005 + 1e-9
+
+
+@pytest.mark.parametrize('inicial,mensal,anos,taxa', [
+    (1000, 500, 10, 10), (0, 100, 40, 20), (50_000, 0, 30, 6), (1000, 1000, 5, 0), (10, 3.33, 25, 13.5),
+])
+def test_igual_ao_laco_original(inicial, mensal, anos, taxa):
+    esperado = np.array(_simular_passivo_original(inicial, mensal, anos, taxa))
+    obtido = simular_passivo(inicial, mensal, anos, taxa)
+
+    assert obtido.shape == esperado.shape
+    assert obtido[0] == inicial
+    assert (np.abs(obtido - esperado) <= _tolerancia(anos, taxa)).all()
+    # Sem juros os dois são exatos
+    if taxa == 0:
+        np.testing.assert_array_equal(obtido, esperado)
+
+
+def test_grade_igual_a_cada_cenario():
+    grade = grade_passivo(1000, [0, 8, 15], [1, 10, 30], [0, 250, 1000])
+    assert len(grade) == 27
+    for linha in grade.itertuples(index=False):
+        curva = _simular_passivo_original(1000, linha[2], int(linha[1]), linha[0])
+        assert linha[4] == pytest.approx(curva[-1], abs=_tolerancia(int(linha[1]), linha[0])[-1])
+        assert linha[3] == 1000 + linha[2] * linha[1] * 12
+
+
+# Monte Carlo: a forma fechada dos saldos por caminho é igual à recursão
+# saldo = saldo * (1 + r) + aporte
+def test_saldos_dos_caminhos_iguais_a_recursao():
+    retornos = np.random.default_rng(4).normal(taxa_mensal(10), 0.05, (20, 120))
+    saldos = _saldos(1000, 200, retornos)
+    for caminho, linha in zip(retornos, saldos):
+        saldo = [1000.0]
+        for r in caminho:
+            saldo.append(saldo[-1] * (1 + r) + 200)
+        np.testing.assert_allclose(linha, saldo, rtol=1e-9)
@@ -0,0 +1,70 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from graficos.reducao import lttb, min_max, reduzir
+
+
+# LTTB de referência, ponto a ponto, como no artigo original (Steinarsson, 2013)
+def _lttb_ingenuo(x, y, pontos):
+    n = len(y)
+    tamanho = (n - 2) / (pontos - 2)
+    escolhidos = [0]
+    for balde in range(pontos - 2):
+        inicio = math.floor(balde * tamanho) + 1
+        fim = math.floor((balde + 1) * tamanho) + 1
+        proximo_fim = min(math.floor((balde + 2) * tamanho) + 1, n)
+        media_x = sum(x[fim:proximo_fim]) / (proximo_fim - fim)
+        media_y = sum(y[fim:proximo_fim]) / (proximo_fim - fim)
+        a = escolhidos[-1]
+        areas = [abs((x[a] - media_x) * (y[i] - y[a]) - (x[a] - x[i]) * (media_y - y[a])) for i in range(inicio, fim)]
+        escolhidos.append(inicio + areas.index(max(areas)))
+    return escolhidos + [n - 1]
+
+
+@pytest.fixture(scope='module')
+def serie():
+    aleatorio = np.random.default_rng(3)
+    return np.arange(5000, dtype=float), np.cumsum(aleatorio.normal(0, 1, 5000))
+
+
+@pytest.mark.parametrize('pontos', [3, 10, 800, 4999])
+def test_lttb_igual_a_referencia(serie, pontos):
+    x, y = serie
+    escolhidos = lttb(x, y, pontos)
+
+    assert len(escolhidos) == pontos
+    assert escolhidos[0] == 0 and escolhidos[-1] == len(y) - 1
+    assert np.all(np.diff(escolhidos) > 0)
+    np.testing.assert_array_equal(escolhidos, _lttb_ingenuo(x.tolist(), y.tolist(), pontos))
+
+
+def test_lttb_sem_reducao(serie):
+    x, y = serie
+    np.testing.assert_array_equal(lttb(x[:50], y[:50], 50), np.arange(50))
+    np.testing.assert_array_equal(lttb(x[:50], y[:50], 2), np.arange(50))
+
+
+def test_min_max_preserva_extremos(serie):
+    _, y = serie
+    escolhidos = min_max(y, 100)
+
+    assert len(escolhidos) <= 102
+    assert escolhidos[0] == 0 and escolhidos[-1] == len(y) - 1
+    assert np.argmin(y) in escolhidos and np.argmax(y) in escolhidos
+
+
+def test_reduzir_mantem_extremidades_e_ignora_lacunas():
+    datas = pd.date_range('2020-01-01', periods=3000, freq='D')
+    df = pd.DataFrame({'a': np.sin(np.arange(3000) / 50), 'b': np.nan}, index=datas)
+    df.iloc[2000:, 1] = np.arange(1000.0)
+    df.iloc[0, 0] = np.nan
+
+    series = reduzir(df, pontos=100)
+
+    assert len(series['a']) == 100 and len(series['b']) == 100
+    assert series['a'].index[0] == datas[1] and series['a'].index[-1] == datas[-1]
+    assert series['b'].index[0] == datas[2000] and series['b'].index[-1] == datas[-1]
+    assert not series['a'].isna().any() and not series['b'].isna().any()
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from estrategias.registro import RegistroOperacoes
+
+
+# Lotes de operações de tamanhos variados, com ativos e operações novos
+# aparecendo depois do primeiro bloco gravado
+def _lotes():
+    aleatorio = np.random.default_rng(11)
+    for numero in range(40):
+        linhas = int(aleatorio.integers(1, 60))
+        datas = pd.bdate_range('2020-01-01', periods=linhas, tz='America/Sao_Paulo') + pd.Timedelta(days=numero)
+        yield dict(
+            execucao=numero,
+            ativo='ATIVO{}'.format(numero // 8),
+            data=datas,
+            operacao=pd.Categorical(aleatorio.choice(['Compra', 'Venda'] + (['Venda Final'] if numero > 20 else []),
+                                                     linhas)),
+            preco=aleatorio.uniform(1, 100, linhas),
+            quantidade=aleatorio.integers(0, 1000, linhas).astype(float),
+            capital=aleatorio.uniform(0, 1e6, linhas),
+        )
+
+
+# Referência: uma linha por dicionário, montada sem o registro
+def _esperado():
+    linhas = []
+    for lote in _lotes():
+        for i, data in enumerate(lote['data']):
+            linhas.append({'execucao': lote['execucao'], 'ativo': lote['ativo'], 'data': data.tz_localize(None),
+                           'operacao': str(lote['operacao'][i]), 'preco': np.float32(lote['preco'][i]),
+                           'quantidade': np.float32(lote['quantidade'][i]), 'capital': lote['capital'][i]})
+    return pd.DataFrame(linhas)
+
+
+def _comparar(obtido, esperado):
+    assert len(obtido) == len(esperado)
+    assert obtido['execucao'].tolist() == esperado['execucao'].tolist()
+    assert obtido['ativo'].astype(str).tolist() == esperado['ativo'].tolist()
+    assert obtido['operacao'].astype(str).tolist() == esperado['operacao'].tolist()
+    assert (pd.DatetimeIndex(obtido['data']) == pd.DatetimeIndex(esperado['data'])).all()
+    np.testing.assert_array_equal(obtido['preco'].to_numpy(), esperado['preco'].to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(obtido['quantidade'].to_numpy(), esperado['quantidade'].to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(obtido['capital'].to_numpy(), esperado['capital'].to_numpy())
+
+
+def test_registro_em_memoria():
+    registro = RegistroOperacoes(capacidade=4)
+    for lote in _lotes():
+        registro.adicionar(**lote)
+    _comparar(registro.para_pandas(), _esperado())
+
+
+def test_registro_em_arquivo_grava_em_blocos(tmp_path):
+    arquivo = tmp_path / 'operacoes.parquet'
+    with RegistroOperacoes(arquivo=arquivo, capacidade=4, linhas_por_bloco=100) as registro:
+        for lote in _lotes():
+            registro.adicionar(**lote)
+            # Só o bloco em andamento fica na memória
+            assert registro._linhas < 100
+        total = len(registro)
+
+    esperado = _esperado()
+    assert total == len(esperado)
+    assert pq.ParquetFile(arquivo).metadata.num_row_groups > 1
+    _comparar(pd.read_parquet(arquivo), esperado)
+    _comparar(registro.para_pandas(), esperado)
+
+
+def test_registro_aceita_valores_unicos():
+    registro = RegistroOperacoes()
+    registro.adicionar(execucao=1, ativo='PETR4.SA', data=pd.Timestamp('2024-01-02'), operacao='Compra',
+                       preco=10.0, quantidade=5.0, capital=50.0)
+    tabela = registro.para_pandas()
+    assert len(tabela) == 1
+    assert tabela.loc[0, 'ativo'] == 'PETR4.SA'
+    assert tabela.loc[0, 'capital'] == pytest.approx(50.0)
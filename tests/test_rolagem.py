@@ -0,0 +1,95 @@
+import calendar
+import inspect
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from estrategias.opcoes import PREMIO_ITM_PADRAO, PREMIO_OTM_PADRAO, PREMIO_PUT_PADRAO
+from estrategias.rolagem import (
+    CICLOS, INICIO_SEXTA_B3, _minimos_no_caminho, datas_vencimento, rolagens, rolar_bull_call, rolar_protective_put,
+)
+
+
+# Pregões de 2019 a meados de 2023 (atravessa a mudança do vencimento da
+# B3) com feriados sorteados e alguns vencimentos tirados de propósito
+@pytest.fixture(scope='module')
+def datas():
+    dias = pd.bdate_range('2019-01-02', '2023-06-14')
+    aleatorio = np.random.default_rng(7)
+    feriados = set(dias[aleatorio.random(len(dias)) < 0.04])
+    feriados |= {pd.Timestamp('2019-03-15'), pd.Timestamp('2020-05-18'), pd.Timestamp('2022-09-30'),
+                 pd.Timestamp('2021-12-17'), pd.Timestamp('2020-07-31')}
+    return dias[~dias.isin(list(feriados))]
+
+
+def _enesimo(ano, mes, dia_semana, n=3):
+    dias = [date(ano, mes, d) for d in range(1, calendar.monthrange(ano, mes)[1] + 1)]
+    return [d for d in dias if d.weekday() == dia_semana][n - 1]
+
+
+# Vencimentos de referência, calculados dia a dia no calendário
+def _vencimentos_ingenuos(datas, ciclo):
+    pregoes = [d.date() for d in datas]
+    primeiro, ultimo = pregoes[0], pregoes[-1]
+    alvos = []
+    if ciclo == 'semanal':
+        sexta = primeiro + timedelta(days=4 - primeiro.weekday())
+        while sexta <= ultimo:
+            alvos.append((sexta, False))
+            sexta += timedelta(days=7)
+    else:
+        ano, mes = primeiro.year, primeiro.month
+        while date(ano, mes, 1) <= ultimo:
+            if ciclo == 'mensal':
+                alvos.append((date(ano, mes, calendar.monthrange(ano, mes)[1]), False))
+            elif ciclo == 'terceira_sexta':
+                alvos.append((_enesimo(ano, mes, 4), False))
+            elif date(ano, mes, 1) >= INICIO_SEXTA_B3.date():
+                alvos.append((_enesimo(ano, mes, 4), False))
+            else:
+                alvos.append((_enesimo(ano, mes, 0), True))
+            ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+    posicoes = set()
+    for alvo, para_frente in alvos:
+        if not primeiro <= alvo <= ultimo:
+            continue
+        if para_frente:
+            candidatos = [i for i, d in enumerate(pregoes) if d >= alvo]
+            posicoes.add(candidatos[0])
+        else:
+            posicoes.add(max(i for i, d in enumerate(pregoes) if d <= alvo))
+    return np.array(sorted(posicoes))
+
+
+@pytest.mark.parametrize('ciclo', list(CICLOS))
+def test_datas_vencimento_igual_ao_calendario(datas, ciclo):
+    np.testing.assert_array_equal(datas_vencimento(datas, ciclo), _vencimentos_ingenuos(datas, ciclo))
+
+
+def test_datas_vencimento_com_fuso(datas):
+    fuso = datas.tz_localize('America/Sao_Paulo')
+    np.testing.assert_array_equal(datas_vencimento(fuso, 'b3'), datas_vencimento(datas, 'b3'))
+
+
+@pytest.mark.parametrize('ciclo', list(CICLOS))
+@pytest.mark.parametrize('entradas', ['vencimentos', 'diarias'])
+@pytest.mark.parametrize('prazo_minimo', [1, 5, 30])
+def test_minimos_no_caminho_igual_ao_laco(datas, ciclo, entradas, prazo_minimo):
+    aleatorio = np.random.default_rng(prazo_minimo)
+    close = 50 * np.exp(np.cumsum(aleatorio.normal(0, 0.02, len(datas))))
+    entrada, vencimento = rolagens(datas, ciclo, entradas, prazo_minimo)
+    esperado = np.array([close[e:v + 1].min() for e, v in zip(entrada, vencimento)])
+
+    assert len(entrada)
+    np.testing.assert_array_equal(_minimos_no_caminho(close, entrada, vencimento), esperado)
+
+
+# Os padrões do simulador de rolagem são os mesmos dos sliders das páginas
+def test_premios_padrao_iguais_aos_das_paginas():
+    padroes = inspect.signature(rolar_bull_call).parameters
+    assert padroes['premio_itm_pct'].default == PREMIO_ITM_PADRAO
+    assert padroes['premio_otm_pct'].default == PREMIO_OTM_PADRAO
+    assert inspect.signature(rolar_protective_put).parameters['premio_pct'].default == PREMIO_PUT_PADRAO
@@ -0,0 +1,91 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dados.simbolos import IndiceSimbolos, base, mercado
+
+
+# Distância de Damerau-Levenshtein restrita (inversão de vizinhos conta
+# como uma edição), por programação dinâmica
+def _distancia(a, b):
+    d = np.zeros((len(a) + 1, len(b) + 1), dtype=int)
+    d[:, 0] = range(len(a) + 1)
+    d[0, :] = range(len(b) + 1)
+    for i, j in itertools.product(range(1, len(a) + 1), range(1, len(b) + 1)):
+        d[i, j] = min(d[i - 1, j] + 1, d[i, j - 1] + 1, d[i - 1, j - 1] + (a[i - 1] != b[j - 1]))
+        if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+            d[i, j] = min(d[i, j], d[i - 2, j - 2] + 1)
+    return d[len(a), len(b)]
+
+
+# Diretório sintético: bases curtas sobre um alfabeto pequeno, para que
+# haja muitos vizinhos a uma edição (e pares a duas edições que dividem
+# uma remoção, como ABA e BAB)
+def _tabela():
+    aleatorio = np.random.default_rng(5)
+    bases = {''.join(aleatorio.choice(list('ABC3'), aleatorio.integers(2, 6))) for _ in range(400)}
+    linhas = []
+    for b in sorted(bases):
+        linhas.append((b + '.SA', None, 'B3'))
+        if aleatorio.random() < 0.5:
+            linhas.append((b, 'EMPRESA {} INC'.format(b), 'EUA'))
+    return pd.DataFrame(linhas, columns=['simbolo', 'nome', 'mercado'])
+
+
+@pytest.fixture(scope='module')
+def tabela():
+    return _tabela()
+
+
+@pytest.fixture(scope='module')
+def indice(tabela):
+    return IndiceSimbolos(tabela)
+
+
+def _consultas(tabela):
+    aleatorio = np.random.default_rng(9)
+    textos = list(tabela['simbolo'][::7])
+    textos += [''.join(aleatorio.choice(list('ABC3X'), aleatorio.integers(1, 7))) for _ in range(150)]
+    return textos + [t + '.SA' for t in textos[-50:]] + ['aba', ' bab.sa ']
+
+
+def test_semelhantes_igual_a_busca_exaustiva(tabela, indice):
+    for texto in _consultas(tabela):
+        alvo = base(texto.strip().upper())
+        esperado = {s for s in tabela['simbolo'] if _distancia(alvo, base(s)) <= 1}
+        obtido = indice.semelhantes(texto, limite=len(tabela))
+        assert len(obtido) == len(set(obtido))
+        assert set(obtido) == esperado, texto
+
+
+def test_semelhantes_prioriza_o_mercado_do_texto(tabela, indice):
+    for texto in _consultas(tabela):
+        obtido = indice.semelhantes(texto, limite=len(tabela))
+        alvo = mercado(texto.strip().upper())
+        fora = [mercado(s) != alvo for s in obtido]
+        assert fora == sorted(fora)
+        assert indice.semelhantes(texto, limite=3) == obtido[:3]
+
+
+def test_completar_igual_a_busca_exaustiva(tabela, indice):
+    for prefixo in ['A', 'AB', 'c3', 'EMPRESA', 'INC', 'X', 'AB.S']:
+        p = prefixo.upper()
+        esperado = set()
+        for simbolo, nome in zip(tabela['simbolo'], tabela['nome']):
+            palavras = [simbolo, base(simbolo)] + [w for w in (nome or '').split() if len(w) > 1]
+            if any(w.startswith(p) for w in palavras):
+                esperado.add(simbolo)
+        assert set(indice.completar(prefixo, limite=len(tabela))) == esperado, prefixo
+
+
+def test_valido(tabela, indice):
+    for simbolo in tabela['simbolo']:
+        assert indice.valido(simbolo)
+    assert not indice.valido('ZZZZ.SA')
+    assert not indice.valido('ZZZZ')
+    # Mercados fora do diretório não são validados
+    assert indice.valido('^BVSP')
+    assert indice.valido('BTC-USD')
+    assert IndiceSimbolos(pd.DataFrame(columns=['simbolo', 'nome', 'mercado'])).valido('ZZZZ')